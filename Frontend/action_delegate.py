@@ -0,0 +1,102 @@
+from PyQt6.QtCore import QEvent, QModelIndex, QPersistentModelIndex, QRectF, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QLinearGradient, QPainter, QPainterPath
+from PyQt6.QtWidgets import QStyledItemDelegate
+
+from Frontend.table_models import ROW_ROLE
+
+
+class ActionButtonDelegate(QStyledItemDelegate):
+    """Paints a gradient push button in a table column and reports clicks.
+
+    The button is only drawn, never created as a widget, so a column of
+    buttons costs the same for ten rows as for ten thousand. clicked is
+    emitted with the row tuple of the clicked row.
+    """
+
+    clicked = pyqtSignal(object)
+
+    def __init__(self, view, text, color, visible=None):
+        super().__init__(view)
+        self.view = view
+        self.text = text
+        self.color = color          # (start, stop) gradient like the ColorScheme entries
+        self.visible = visible      # visible(row) -> bool, None shows the button on every row
+        self._hovered = QPersistentModelIndex()
+        self._pressed = QPersistentModelIndex()
+        self.font = QFont()
+        self.font.setBold(True)
+        self.font.setPixelSize(14)
+        view.setMouseTracking(True)
+        view.viewport().installEventFilter(self)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        if not self._is_visible(index):
+            return
+        rect = QRectF(self._button_rect(option.rect))
+        start, stop = self.color
+        if QPersistentModelIndex(index) == self._hovered:
+            start, stop = stop, start
+        gradient = QLinearGradient(rect.topLeft(), rect.bottomRight())
+        gradient.setColorAt(0, QColor(start))
+        gradient.setColorAt(1, QColor(stop))
+        path = QPainterPath()
+        path.addRoundedRect(rect, 8, 8)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillPath(path, gradient)
+        painter.setPen(QColor("white"))
+        painter.setFont(self.font)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, self.text)
+        painter.restore()
+
+    def eventFilter(self, obj, event):
+        # editorEvent only sees events over this column, so leaving it is caught on the viewport
+        if event.type() == QEvent.Type.Leave:
+            self._set_hovered(QModelIndex())
+        elif event.type() == QEvent.Type.MouseMove:
+            index = self.view.indexAt(event.position().toPoint())
+            if not index.isValid() or self.view.itemDelegateForIndex(index) is not self:
+                self._set_hovered(QModelIndex())
+        return False
+
+    def editorEvent(self, event, model, option, index):
+        if not self._is_visible(index):
+            if event.type() == QEvent.Type.MouseMove:
+                self._set_hovered(QModelIndex())
+            return False
+        inside = self._button_rect(option.rect).contains(event.position().toPoint()) \
+            if event.type() in (QEvent.Type.MouseMove, QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease) \
+            else False
+        if event.type() == QEvent.Type.MouseMove:
+            self._set_hovered(index if inside else QModelIndex())
+            return False
+        if event.type() == QEvent.Type.MouseButtonPress and event.button() == Qt.MouseButton.LeftButton and inside:
+            self._pressed = QPersistentModelIndex(index)
+            return True
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            was_pressed = QPersistentModelIndex(index) == self._pressed
+            self._pressed = QPersistentModelIndex()
+            if inside and was_pressed:
+                self.clicked.emit(index.data(ROW_ROLE))
+                return True
+        return False
+
+    def _is_visible(self, index):
+        return self.visible is None or self.visible(index.data(ROW_ROLE))
+
+    def _set_hovered(self, index):
+        hovered = QPersistentModelIndex(index)
+        if hovered == self._hovered:
+            return
+        self._hovered = hovered
+        if index.isValid():
+            self.view.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        else:
+            self.view.viewport().unsetCursor()
+        self.view.viewport().update()
+
+    @staticmethod
+    def _button_rect(rect):
+        return rect.adjusted(6, 6, -6, -6)
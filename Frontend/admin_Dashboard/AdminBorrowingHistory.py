@@ -1,13 +1,14 @@
-from datetime import datetime
-
-import pymysql
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QSpacerItem, QSizePolicy
+    QTableView, QHeaderView, QMessageBox, QSpacerItem, QSizePolicy, QCheckBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from db.db_operations import DatabaseOperations
+from db.events import BookBorrowed, BookReturned
+from db.offline import QUEUED_MESSAGE, get_desk
+from Frontend.action_delegate import ActionButtonDelegate
+from Frontend.loader import PageLoader
+from Frontend.table_models import STATUS_COLORS, Column, RowTableModel
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -22,8 +23,13 @@ class AdminBorrowingHistory(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
+        self.loaded = False
+        self.stacked_widget.changes.history_changed.connect(self.patch_history)
+        self.stacked_widget.changes.reload_required.connect(self.load_borrowing_history)
+        self.stacked_widget.events.on(BookBorrowed, self._on_borrowed_event)
+        self.stacked_widget.events.on(BookReturned, self._on_returned_event)
         self._setup_ui()
-        self.load_borrowing_history()
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -41,6 +47,12 @@ class AdminBorrowingHistory(QWidget):
 
         header_layout.addItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
 
+        # Loans archived by db/archive.py are left out unless asked for
+        self.include_archive = QCheckBox("Include archive")
+        self.include_archive.setStyleSheet("font-size: 14px; color: #4b5563;")
+        self.include_archive.toggled.connect(lambda checked: self.load_borrowing_history())
+        header_layout.addWidget(self.include_archive)
+
         admin_info = QLabel("👩‍💼 Admin User")
         admin_info.setStyleSheet("font-size: 14px; font-weight: bold; color: #4b5563;")
         header_layout.addWidget(admin_info)
@@ -48,7 +60,7 @@ class AdminBorrowingHistory(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))  # Updated to index 2 (LoginPage)
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout())
         header_layout.addWidget(logout_btn)
 
         layout.addWidget(header_frame)
@@ -60,31 +72,41 @@ class AdminBorrowingHistory(QWidget):
         nav_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)  # Center navigation buttons
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 8),
-            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, 9),
-            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, 10),
-            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, 11),
-            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, 12),
-            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, 13),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "admin_dashboard"),
+            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, "admin_add"),
+            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, "admin_update"),
+            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, "admin_view_books"),
+            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, "admin_view_users"),
+            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, "admin_borrowing_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet(self._button_style(ColorScheme.TEAL_GRADIENT) if idx == 13 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+            btn.setStyleSheet(self._button_style(ColorScheme.TEAL_GRADIENT) if route == "admin_borrowing_history" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         layout.addWidget(nav_frame)
 
         # Borrowing History Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([
-            "No.", "User ID", "User Type", "Book Title", "Category", "Borrow Date", "Status", "Action"
-        ])
+        self.model = RowTableModel([
+            Column("No.", lambda record, i: i + 1),
+            Column("User ID", lambda record, i: record[1]),
+            Column("User Type", lambda record, i: record[2]),
+            Column("Book Title", lambda record, i: record[4]),
+            Column("Category", lambda record, i: record[10]),
+            Column("Borrow Date", lambda record, i: record[5]),
+            Column("Status", lambda record, i: record[7], foreground=lambda record: STATUS_COLORS.get(record[7])),
+            Column("Action", lambda record, i: None),
+        ], self)
+        self.model.more_requested.connect(self.load_next_page)
+        self.next_token = None
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #E5E7EB;
                 border: 1px solid #D1D5DB;
@@ -99,12 +121,12 @@ class AdminBorrowingHistory(QWidget):
                 font-weight: bold;
                 font-size: 11pt;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 color: #374151;
                 font-size: 11pt;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0.5,
                     stop:0 #DBEAFE, stop:1 #BFDBFE);
                 color: #1e40af;
@@ -115,77 +137,103 @@ class AdminBorrowingHistory(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(55)  # Increase row height for better visibility
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+
+        # Return button (only for Active or Overdue), painted by a delegate
+        self.return_delegate = ActionButtonDelegate(
+            self.table, "Return", ColorScheme.SUCCESS_GRADIENT,
+            visible=lambda record: record[7] in ["Active", "Overdue"]
+        )
+        self.return_delegate.clicked.connect(lambda record: self.return_book(record[0], record[3], record[1], record[2]))
+        self.table.setItemDelegateForColumn(7, self.return_delegate)
 
         layout.addWidget(self.table)
 
+    def showEvent(self, event):
+        """Load the history the first time the page is shown."""
+        super().showEvent(event)
+        self.stacked_widget.changes.subscribe(self)
+        if not self.loaded:
+            self.loaded = True
+            self.load_borrowing_history()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.stacked_widget.changes.unsubscribe(self)
+
+    def patch_history(self, records):
+        """Apply loans borrowed or returned elsewhere without reloading the table."""
+        self.model.patch_rows(records)
+
+    def _on_borrowed_event(self, event):
+        if event.queued:
+            return  # No record yet; it arrives when the journal is replayed
+        # The event has no title/category, so fetch just the new record
+        self.loader.load_db(
+            f"record:{event.record_id}",
+            lambda db: db.get_borrowing_history_page(event.record_id - 1, page_size=1)[0],
+            self.patch_history
+        )
+
+    def _on_returned_event(self, event):
+        record = self.model.find(event.record_id)
+        if record:
+            # A queued return is settled (and fined) on replay, which publishes it again
+            status = event.return_status or "Returned"
+            fine = record[9] if event.fine is None else event.fine
+            self.patch_history([record[:6] + (event.returned_at, status, record[8], fine) + record[10:]])
+
     def load_borrowing_history(self):
-        """Load borrowing history from database."""
-        db = DatabaseOperations()
-        try:
-            history = db.get_borrowing_history()
-            self.populate_table(history)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load borrowing history: {str(e)}")
-        finally:
-            db.close_connection()
-
-    def populate_table(self, history):
+        """Load the first page of borrowing history from database."""
+        include_archive = self.include_archive.isChecked()
+        self.loader.cancel("history_page")  # A page of the old list must not land on the new one
+        self.loader.load_db(
+            "history",
+            lambda db: db.get_borrowing_history_page(include_archive=include_archive),
+            lambda page: self.populate_table(*page),
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to load borrowing history: {str(e)}")
+        )
+
+    def load_next_page(self):
+        """Fetch the next page once the user scrolls to the bottom of the table."""
+        token = self.next_token
+        include_archive = self.include_archive.isChecked()
+        self.loader.load_db(
+            "history_page",
+            lambda db: db.get_borrowing_history_page(token, include_archive=include_archive),
+            lambda page: self.append_page(*page),
+            lambda e: self.model.fetch_failed()
+        )
+
+    def populate_table(self, history, next_token=None):
         """Populate the table with borrowing history."""
-        self.table.setRowCount(len(history))
-        for row, record in enumerate(history):
-            self.table.setRowHeight(row, 55)  # Increase row height for better visibility
-            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-            self.table.setItem(row, 1, QTableWidgetItem(str(record[1])))  # user_id
-            self.table.setItem(row, 2, QTableWidgetItem(record[2]))  # user_type
-            self.table.setItem(row, 3, QTableWidgetItem(record[4]))  # title
-            self.table.setItem(row, 4, QTableWidgetItem(record[10]))  # category
-            self.table.setItem(row, 5, QTableWidgetItem(str(record[5])))  # date_borrowed
-            status_item = QTableWidgetItem(record[7])
-            if record[7] == "Returned":
-                status_item.setForeground(Qt.GlobalColor.darkGreen)
-            elif record[7] == "Active":
-                status_item.setForeground(Qt.GlobalColor.darkBlue)
-            elif record[7] == "Overdue":
-                status_item.setForeground(Qt.GlobalColor.darkRed)
-            elif record[7] == "Returned Late":
-                status_item.setForeground(Qt.GlobalColor.darkYellow)
-            self.table.setItem(row, 6, status_item)
-
-            # Return button (only for Active or Overdue)
-            if record[7] in ["Active", "Overdue"]:
-                return_btn = QPushButton("Return")
-                return_btn.setStyleSheet(self._button_style(ColorScheme.SUCCESS_GRADIENT))
-                return_btn.clicked.connect(lambda checked, rid=record[0], bid=record[3]: self.return_book(rid, bid))
-                self.table.setCellWidget(row, 7, return_btn)
-
-            # Center align all cells
-            for col in range(7):
-                item = self.table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-
-    def return_book(self, record_id, book_id):
-        """Mark a book as returned."""
-        db = DatabaseOperations()
-        try:
-            cursor = db.conn.cursor()
-            cursor.execute(
-                "UPDATE borrowing_history SET return_status = 'Returned', date_returned = %s WHERE id = %s",
-                (datetime.now(), record_id)
-            )
-            cursor.execute("UPDATE books SET status = 'Available' WHERE id = %s", (book_id,))
-            db.conn.commit()
-            QMessageBox.information(self, "Success", "Book marked as returned.")
-            self.load_borrowing_history()  # Refresh table
-        except pymysql.Error as e:
-            QMessageBox.critical(self, "Error", f"Failed to return book: {str(e)}")
-            db.conn.rollback()
-        finally:
-            cursor.close()
-            db.close_connection()
+        self.next_token = next_token
+        self.model.set_rows(history, has_more=next_token is not None)
+
+    def append_page(self, history, next_token):
+        self.next_token = next_token
+        self.model.append_rows(history, has_more=next_token is not None)
+
+    def return_book(self, record_id, book_id, user_id, user_type):
+        """Mark a book as returned (queued by the desk if the database is unreachable)."""
+        self.loader.load(
+            f"return:{record_id}",
+            lambda: get_desk().return_book(record_id, book_id, user_id, user_type),
+            self._on_book_returned
+        )
+
+    def _on_book_returned(self, result):
+        success, message = result
+        if success:
+            # The BookReturned event updates the row, so the table is not reloaded
+            note = f"\n\n{message}" if message == QUEUED_MESSAGE else ""
+            QMessageBox.information(self, "Success", f"Book marked as returned.{note}")
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to return book: {message}")
 
     def _button_style(self, color):
         return f"""
@@ -214,6 +214,6 @@ class AdminAddBook(QWidget):
     def go_back(self):
         """Return to admin dashboard."""
         if self.stacked_widget is not None:
-            self.stacked_widget.setCurrentIndex(8)  # Go back to admin dashboard (index 8)
+            self.stacked_widget.navigate("admin_dashboard")  # Go back to admin dashboard
         else:
             QMessageBox.information(self, "Navigation", "Back navigation unavailable.")
\ No newline at end of file
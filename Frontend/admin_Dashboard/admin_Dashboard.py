@@ -4,7 +4,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from db.db_operations import DatabaseOperations
+from db.events import BookAdded, BookBorrowed, BookReturned, UserRegistered
+from Frontend.loader import PageLoader
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -26,11 +27,16 @@ class ColorScheme:
         ("#14b8a6", "#0f766e"),  # Education
     ]
 
+CATEGORIES = ["Fiction", "Science", "History", "Technology", "Arts", "Education"]
+
 class AdminDashboard(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
         self._setup_ui()
+        # Counters are a handful of rows, so refreshing them is cheaper than tracking each box
+        self.stacked_widget.events.on((BookAdded, BookBorrowed, BookReturned, UserRegistered), self._on_catalog_event)
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -51,7 +57,7 @@ class AdminDashboard(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout("home"))
         header_layout.addWidget(logout_btn)
 
         layout.addWidget(header_frame)
@@ -62,19 +68,19 @@ class AdminDashboard(QWidget):
         nav_layout.setSpacing(20)
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 8),
-            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, 9),
-            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, 10),
-            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, 11),
-            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, 12),
-            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, 13),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "admin_dashboard"),
+            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, "admin_add"),
+            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, "admin_update"),
+            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, "admin_view_books"),
+            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, "admin_view_users"),
+            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, "admin_borrowing_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet(self._button_style(ColorScheme.PRIMARY_GRADIENT) if idx == 8 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+            btn.setStyleSheet(self._button_style(ColorScheme.PRIMARY_GRADIENT) if route == "admin_dashboard" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         layout.addWidget(nav_frame)
@@ -97,8 +103,7 @@ class AdminDashboard(QWidget):
         stats_layout.addWidget(self.instructor_box, 1, 1)
 
         self.category_boxes = []
-        categories = ["Fiction", "Science", "History", "Technology", "Arts", "Education"]
-        for i, (cat, color) in enumerate(zip(categories, ColorScheme.CATEGORY_COLORS)):
+        for i, (cat, color) in enumerate(zip(CATEGORIES, ColorScheme.CATEGORY_COLORS)):
             box = self._stat_box(f"{cat} Borrowed", "0", color)
             stats_layout.addWidget(box, 2 + i // 3, i % 3)
             self.category_boxes.append(box)
@@ -111,47 +116,23 @@ class AdminDashboard(QWidget):
         self.load_stats()
 
     def load_stats(self):
-        """Fetch and update statistics."""
-        db = DatabaseOperations()
-        cursor = db.conn.cursor()
-        try:
-            # Total Books
-            cursor.execute("SELECT COUNT(*) FROM books")
-            total_books = cursor.fetchone()[0]
-            self.total_books.layout().itemAt(1).widget().setText(str(total_books))
-
-            # Borrowed Books
-            cursor.execute("SELECT COUNT(*) FROM borrowing_history WHERE return_status IN ('Active', 'Overdue')")
-            borrowed_books = cursor.fetchone()[0]
-            self.borrowed_books.layout().itemAt(1).widget().setText(str(borrowed_books))
-
-            # Total Users
-            cursor.execute("SELECT (SELECT COUNT(*) FROM students) + (SELECT COUNT(*) FROM instructors) + (SELECT COUNT(*) FROM admins)")
-            total_users = cursor.fetchone()[0]
-            self.users_box.layout().itemAt(1).widget().setText(str(total_users))
-
-            # Students
-            cursor.execute("SELECT COUNT(*) FROM students")
-            students = cursor.fetchone()[0]
-            self.student_box.layout().itemAt(1).widget().setText(str(students))
-
-            # Instructors
-            cursor.execute("SELECT COUNT(*) FROM instructors")
-            instructors = cursor.fetchone()[0]
-            self.instructor_box.layout().itemAt(1).widget().setText(str(instructors))
-
-            # Categories borrowed
-            categories = ["Fiction", "Science", "History", "Technology", "Arts", "Education"]
-            for i, cat in enumerate(categories):
-                cursor.execute(
-                    "SELECT COUNT(*) FROM borrowing_history bh JOIN books b ON bh.book_id = b.id WHERE b.category = %s AND bh.return_status IN ('Active', 'Overdue')",
-                    (cat,)
-                )
-                count = cursor.fetchone()[0]
-                self.category_boxes[i].layout().itemAt(1).widget().setText(str(count))
-        finally:
-            cursor.close()
-            db.close_connection()
+        """Fetch statistics in the background and update the boxes when they arrive."""
+        self.loader.load_db("stats", lambda db: db.get_dashboard_stats(), self._apply_stats)
+
+    def _on_catalog_event(self, event):
+        if self.isVisible():
+            self.load_stats()
+
+    def _apply_stats(self, stats):
+        if stats is None:
+            return  # Query failed; the error has already been printed
+        self.total_books.layout().itemAt(1).widget().setText(str(stats["total_books"]))
+        self.borrowed_books.layout().itemAt(1).widget().setText(str(stats["borrowed_books"]))
+        self.users_box.layout().itemAt(1).widget().setText(str(stats["total_users"]))
+        self.student_box.layout().itemAt(1).widget().setText(str(stats["students"]))
+        self.instructor_box.layout().itemAt(1).widget().setText(str(stats["instructors"]))
+        for i, cat in enumerate(CATEGORIES):
+            self.category_boxes[i].layout().itemAt(1).widget().setText(str(stats["categories"].get(cat, 0)))
 
     def _button_style(self, color):
         return f"""
@@ -174,7 +174,7 @@ class AdminUpdateBook(QWidget):
     def go_back(self):
         """Go back to the previous screen in the stacked widget."""
         if self.stacked_widget is not None:
-            self.stacked_widget.setCurrentIndex(8)
+            self.stacked_widget.navigate("admin_dashboard")
         else:
             QMessageBox.information(self, "Navigation", "No previous screen found.")
 
@@ -1,13 +1,16 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QLabel, QComboBox, QTableWidget, QTableWidgetItem,
+    QPushButton, QLabel, QComboBox, QTableView,
     QFrame, QHeaderView, QMessageBox, QSpacerItem, QSizePolicy
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 import os
 
-from db.db_operations import DatabaseOperations
+from db.events import BookAdded, BookBorrowed, BookReturned, BookUpdated
+from Frontend.action_delegate import ActionButtonDelegate
+from Frontend.loader import PageLoader
+from Frontend.table_models import Column, RowTableModel
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -22,8 +25,16 @@ class AdminViewAllBooks(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
+        self.loaded = False
+        self.stacked_widget.changes.books_changed.connect(self.patch_books)
+        self.stacked_widget.changes.reload_required.connect(lambda: self.load_first_page(self.current_category))
+        events = self.stacked_widget.events
+        events.on(BookAdded, lambda event: self.patch_books([event.book]))
+        events.on(BookReturned, lambda event: event.book and self.patch_books([event.book]))
+        events.on(BookBorrowed, lambda event: self._set_status(event.book_id, "Borrowed"))
+        events.on(BookUpdated, self._on_book_updated)
         self._setup_ui()
-        self.view_all_books()
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -48,7 +59,7 @@ class AdminViewAllBooks(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))  # Updated to index 2 (LoginPage)
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout())
         header_layout.addWidget(logout_btn)
 
         layout.addWidget(header_frame)
@@ -60,19 +71,19 @@ class AdminViewAllBooks(QWidget):
         nav_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 8),
-            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, 9),
-            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, 10),
-            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, 11),
-            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, 12),
-            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, 13),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "admin_dashboard"),
+            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, "admin_add"),
+            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, "admin_update"),
+            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, "admin_view_books"),
+            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, "admin_view_users"),
+            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, "admin_borrowing_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet(self._active_button_style(ColorScheme.INFO_GRADIENT) if idx == 11 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+            btn.setStyleSheet(self._active_button_style(ColorScheme.INFO_GRADIENT) if route == "admin_view_books" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         layout.addWidget(nav_frame)
@@ -125,13 +136,26 @@ class AdminViewAllBooks(QWidget):
         layout.addWidget(search_frame)
 
         # --- TABLE ---
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "No.", "Category", "Title", "Author", "Edition", "ISBN", "Publication", "Status", "Edit", "View"
-        ])
+        self.model = RowTableModel([
+            Column("No.", lambda book, i: i + 1),
+            Column("Category", lambda book, i: book[1]),
+            Column("Title", lambda book, i: book[2]),
+            Column("Author", lambda book, i: book[4]),
+            Column("Edition", lambda book, i: book[3]),
+            Column("ISBN", lambda book, i: book[5]),
+            Column("Publication", lambda book, i: book[6]),
+            Column("Status", lambda book, i: book[7]),
+            Column("Edit", lambda book, i: None),
+            Column("View", lambda book, i: None),
+        ], self)
+        self.model.more_requested.connect(self.load_next_page)
+        self.next_token = None
+        self.current_category = None
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #E5E7EB;
                 border: 1px solid #D1D5DB;
@@ -146,12 +170,12 @@ class AdminViewAllBooks(QWidget):
                 font-weight: bold;
                 font-size: 11pt;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
                 color: #374151;
                 font-size: 11pt;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0.5,
                     stop:0 #DBEAFE, stop:1 #BFDBFE);
                 color: #1e40af;
@@ -161,9 +185,19 @@ class AdminViewAllBooks(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(50)  # Increase row height for better visibility
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+
+        # Edit and View buttons are painted by delegates, not created per row
+        self.edit_delegate = ActionButtonDelegate(self.table, "Edit", ColorScheme.WARNING_GRADIENT)
+        self.edit_delegate.clicked.connect(lambda book: self.edit_book(book[0]))
+        self.table.setItemDelegateForColumn(8, self.edit_delegate)
+        self.view_delegate = ActionButtonDelegate(self.table, "View", ColorScheme.INFO_GRADIENT)
+        self.view_delegate.clicked.connect(self.view_book)
+        self.table.setItemDelegateForColumn(9, self.view_delegate)
 
         layout.addWidget(self.table)
 
@@ -202,65 +236,78 @@ class AdminViewAllBooks(QWidget):
             }}
         """
 
+    def showEvent(self, event):
+        """Load the books the first time the page is shown."""
+        super().showEvent(event)
+        self.stacked_widget.changes.subscribe(self)
+        if not self.loaded:
+            self.loaded = True
+            self.view_all_books()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.stacked_widget.changes.unsubscribe(self)
+
     def view_all_books(self):
         self.category_combo.setCurrentIndex(0)
-        db = DatabaseOperations()
-        try:
-            books = db.get_all_books()
-            self.populate_table(books)
-        finally:
-            db.close_connection()
+        self.load_first_page(None)
 
     def search_books(self):
         category = self.category_combo.currentText()
         if category == "Select Category":
             self.view_all_books()
             return
-        db = DatabaseOperations()
-        try:
-            books = db.search_books_by_category(category)
-            self.populate_table(books)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to search books: {str(e)}")
-        finally:
-            db.close_connection()
-
-    def populate_table(self, books):
-        self.table.setRowCount(len(books))
-        for row, book in enumerate(books):
-            self.table.setRowHeight(row, 50)  # Increase row height for better visibility
-            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-            self.table.setItem(row, 1, QTableWidgetItem(book[1]))  # category
-            self.table.setItem(row, 2, QTableWidgetItem(book[2]))  # title
-            self.table.setItem(row, 3, QTableWidgetItem(book[4]))  # author
-            self.table.setItem(row, 4, QTableWidgetItem(book[3]))  # edition
-            self.table.setItem(row, 5, QTableWidgetItem(book[5]))  # isbn
-            self.table.setItem(row, 6, QTableWidgetItem(book[6]))  # publication
-            self.table.setItem(row, 7, QTableWidgetItem(book[7]))  # status
-
-            # Edit button
-            edit_btn = QPushButton("Edit")
-            edit_btn.setStyleSheet(self._button_style(ColorScheme.WARNING_GRADIENT))
-            edit_btn.clicked.connect(lambda _, b=book[0]: self.edit_book(b))
-
-            # View button
-            view_btn = QPushButton("View")
-            view_btn.setStyleSheet(self._button_style(ColorScheme.INFO_GRADIENT))
-            view_btn.clicked.connect(lambda _, b=book: self.view_book(b))
-
-            self.table.setCellWidget(row, 8, edit_btn)
-            self.table.setCellWidget(row, 9, view_btn)
-
-            # Center align all cells
-            for col in range(8):
-                item = self.table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.load_first_page(category)
+
+    def load_first_page(self, category):
+        # A category search still in flight would overwrite the new list, so it is superseded here
+        self.current_category = category
+        self.loader.cancel("books_page")  # A page of the old list must not land on the new one
+        self.loader.load_db(
+            "books",
+            lambda db: db.get_books_page(category=category),
+            lambda page: self.populate_table(*page),
+            lambda e: QMessageBox.warning(self, "Error", f"Failed to search books: {str(e)}")
+        )
+
+    def load_next_page(self):
+        """Fetch the next page once the user scrolls to the bottom of the table."""
+        category, token = self.current_category, self.next_token
+        self.loader.load_db(
+            "books_page",
+            lambda db: db.get_books_page(token, category=category),
+            lambda page: self.append_page(*page),
+            lambda e: self.model.fetch_failed()
+        )
+
+    def populate_table(self, books, next_token=None):
+        self.next_token = next_token
+        self.model.set_rows(books, has_more=next_token is not None)
+
+    def append_page(self, books, next_token):
+        self.next_token = next_token
+        self.model.append_rows(books, has_more=next_token is not None)
+
+    def patch_books(self, books):
+        """Apply books changed elsewhere without reloading the table."""
+        category = self.current_category
+        self.model.patch_rows(books, accept=lambda book: not category or book[1] == category)
+
+    def _set_status(self, book_id, status):
+        book = self.model.find(book_id)
+        if book:
+            self.patch_books([book[:7] + (status,) + book[8:]])
+
+    def _on_book_updated(self, event):
+        book = self.model.find(event.book_id)
+        if book:
+            self.patch_books([(event.book_id, event.category, event.title, event.author, event.edition,
+                               event.isbn, event.publication) + book[7:]])
 
     def edit_book(self, book_id):
         # Load book data in update page
-        self.stacked_widget.widget(10).load_book_data(book_id)
-        self.stacked_widget.setCurrentIndex(10)  # Go to update page
+        self.stacked_widget.page("admin_update").load_book_data(book_id)
+        self.stacked_widget.navigate("admin_update")  # Go to update page
 
     def view_book(self, book):
         # Show book information in a message box
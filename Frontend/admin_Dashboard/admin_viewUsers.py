@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from db.db_operations import DatabaseOperations
+from Frontend.loader import PageLoader
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -20,8 +20,9 @@ class AdminViewUsers(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
+        self.loaded = False
         self.init_ui()
-        self.load_all_users()
 
     def init_ui(self):
         # --- Main Layout ---
@@ -48,7 +49,7 @@ class AdminViewUsers(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))  # LoginPage
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout())
         header_layout.addWidget(logout_btn)
 
         main_layout.addWidget(header_frame)
@@ -60,19 +61,19 @@ class AdminViewUsers(QWidget):
         nav_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 8),
-            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, 9),
-            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, 10),
-            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, 11),
-            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, 12),
-            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, 13),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "admin_dashboard"),
+            ("➕ ADD BOOK", ColorScheme.SUCCESS_GRADIENT, "admin_add"),
+            ("✏️ UPDATE BOOK", ColorScheme.WARNING_GRADIENT, "admin_update"),
+            ("📖 VIEW ALL BOOKS", ColorScheme.INFO_GRADIENT, "admin_view_books"),
+            ("👥 VIEW USERS", ColorScheme.PURPLE_GRADIENT, "admin_view_users"),
+            ("📜 BORROWING HISTORY", ColorScheme.TEAL_GRADIENT, "admin_borrowing_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet(self._active_button_style(ColorScheme.PURPLE_GRADIENT) if idx == 12 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+            btn.setStyleSheet(self._active_button_style(ColorScheme.PURPLE_GRADIENT) if route == "admin_view_users" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         main_layout.addWidget(nav_frame)
@@ -184,29 +185,24 @@ class AdminViewUsers(QWidget):
             }}
         """
 
+    def showEvent(self, event):
+        """Load the users the first time the page is shown."""
+        super().showEvent(event)
+        if not self.loaded:
+            self.loaded = True
+            self.load_all_users()
+
     def load_all_users(self):
         """Load all users into the table"""
         self.user_type_combo.setCurrentIndex(0)  # Reset to "All Users"
-        db = DatabaseOperations()
-        try:
-            users = db.get_all_users()
-            self.populate_table(users)
-        finally:
-            db.close_connection()
+        self.loader.load_db("users", lambda db: db.get_all_users(), self.populate_table)
 
     def filter_by_user_type(self):
         """Filter users based on selected user type"""
         user_type = self.user_type_combo.currentText()
-        db = DatabaseOperations()
-        try:
-            users = db.get_all_users()
-            if user_type != "All Users":
-                filtered_users = [user for user in users if user.get("type", "").lower() == user_type.lower()]
-            else:
-                filtered_users = users
-            self.populate_table(filtered_users)
-        finally:
-            db.close_connection()
+        # Let the database filter instead of reading every user and discarding most of them
+        user_type = None if user_type == "All Users" else user_type
+        self.loader.load_db("users", lambda db: db.get_all_users(user_type), self.populate_table)
 
     def populate_table(self, users):
         """Populate table with user data"""
@@ -0,0 +1,58 @@
+import os
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from Frontend.loader import PageLoader
+
+POLL_INTERVAL_MS = int(os.environ.get("INFOCHAN_POLL_INTERVAL_MS", 5000))
+
+
+class ChangePoller(QObject):
+    """Polls DatabaseOperations.get_changes_since while any view is subscribed.
+
+    Views subscribe when they are shown and unsubscribe when hidden, so nothing
+    is polled while only static pages are open. Changed rows are broadcast and
+    each view patches just those rows into its model.
+    """
+
+    books_changed = pyqtSignal(list)    # BOOK_COLUMNS rows
+    history_changed = pyqtSignal(list)  # history rows with book details
+    reload_required = pyqtSignal()      # Too many changes to patch; views should reload
+
+    def __init__(self, parent=None, interval=POLL_INTERVAL_MS):
+        super().__init__(parent)
+        self.token = None
+        self._subscribers = set()
+        self.loader = PageLoader(self, busy_cursor=False)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.poll)
+
+    def subscribe(self, view):
+        self._subscribers.add(view)
+        if not self.timer.isActive():
+            self.timer.start()
+            self.poll()  # Take a starting token straight away
+
+    def unsubscribe(self, view):
+        self._subscribers.discard(view)
+        if not self._subscribers:
+            self.timer.stop()
+
+    def poll(self):
+        if self.loader.is_loading("changes"):
+            return  # The previous poll is still running
+        token = self.token
+        self.loader.load_db("changes", lambda db: db.get_changes_since(token), self._on_changes)
+
+    def _on_changes(self, changes):
+        if changes is None:
+            return  # Query failed; try again on the next tick
+        self.token = changes["token"]
+        if changes["truncated"]:
+            self.reload_required.emit()
+            return
+        if changes["books"]:
+            self.books_changed.emit(changes["books"])
+        if changes["history"]:
+            self.history_changed.emit(changes["history"])
@@ -0,0 +1,29 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from db.events import Event, subscribe
+
+
+class EventBridge(QObject):
+    """Delivers db.events on the GUI thread.
+
+    Database writes publish from loader worker threads; emitting a signal from
+    there queues the call, so pages can touch their widgets in the handlers.
+    """
+
+    received = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._handlers = []  # (event_type, handler)
+        self.received.connect(self._dispatch)
+        unsubscribe = subscribe(Event, self.received.emit)
+        self.destroyed.connect(lambda *_: unsubscribe())
+
+    def on(self, event_type, handler):
+        """Call handler(event) on the GUI thread for every event of event_type."""
+        self._handlers.append((event_type, handler))
+
+    def _dispatch(self, event):
+        for event_type, handler in list(self._handlers):
+            if isinstance(event, event_type):
+                handler(event)
@@ -0,0 +1,118 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+
+from db.db_operations import DatabaseOperations
+
+
+class _WorkerSignals(QObject):
+    # channel, generation, error (None on success), result
+    finished = pyqtSignal(str, int, object, object)
+
+
+class _Worker(QRunnable):
+    """Runs one query on a pool thread and reports back through a signal."""
+
+    def __init__(self, channel, generation, fn):
+        super().__init__()
+        self.channel = channel
+        self.generation = generation
+        self.fn = fn
+        self.cancelled = False
+        self.signals = _WorkerSignals()
+
+    def run(self):
+        result, error = None, None
+        if not self.cancelled:
+            try:
+                result = self.fn()
+            except Exception as e:
+                error = e
+        self.signals.finished.emit(self.channel, self.generation, error, result)
+
+
+class PageLoader(QObject):
+    """Loads page data off the GUI thread.
+
+    Every request goes on a named channel. Submitting a new request on a channel
+    supersedes the previous one: if it has not started it is skipped, and if it has
+    already run its result is dropped instead of being delivered.
+    """
+
+    loading_changed = pyqtSignal(bool)
+
+    def __init__(self, page, pool=None, busy_cursor=True):
+        super().__init__(page)
+        self.page = page
+        self.pool = pool or QThreadPool.globalInstance()
+        self.busy_cursor = busy_cursor  # Background polling should not flash the cursor
+        self._generation = {}  # channel -> latest generation number
+        self._pending = {}     # channel -> (worker, on_result, on_error)
+        self._running = set()  # keep workers alive until they report back
+
+    def load(self, channel, fn, on_result, on_error=None):
+        """Run fn() off-thread and pass its result to on_result on the GUI thread."""
+        generation = self._generation.get(channel, 0) + 1
+        self._generation[channel] = generation
+        previous = self._pending.get(channel)
+        if previous:
+            previous[0].cancelled = True
+
+        worker = _Worker(channel, generation, fn)
+        worker.setAutoDelete(False)
+        worker.signals.finished.connect(self._on_finished)
+        was_loading = self.is_loading()
+        self._pending[channel] = (worker, on_result, on_error)
+        self._running.add(worker)
+        self.pool.start(worker)
+        if not was_loading:
+            self._set_loading(True)
+
+    def load_db(self, channel, query, on_result, on_error=None):
+        """Like load(), but query receives a pooled DatabaseOperations."""
+        def run():
+            db = DatabaseOperations()
+            try:
+                return query(db)
+            finally:
+                db.close_connection()
+        self.load(channel, run, on_result, on_error)
+
+    def cancel(self, channel=None):
+        """Drop the pending request on one channel, or on all of them."""
+        channels = [channel] if channel else list(self._pending)
+        for name in channels:
+            pending = self._pending.pop(name, None)
+            if pending:
+                pending[0].cancelled = True
+                self._generation[name] = self._generation.get(name, 0) + 1
+        if not self._pending:
+            self._set_loading(False)
+
+    def is_loading(self, channel=None):
+        if channel:
+            return channel in self._pending
+        return bool(self._pending)
+
+    def _on_finished(self, channel, generation, error, result):
+        for worker in list(self._running):
+            if worker.channel == channel and worker.generation == generation:
+                self._running.discard(worker)
+        if generation != self._generation.get(channel):
+            return  # Superseded by a newer request
+        _, on_result, on_error = self._pending.pop(channel)
+        if not self._pending:
+            self._set_loading(False)
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"Error loading {channel}: {error}")
+            return
+        on_result(result)
+
+    def _set_loading(self, loading):
+        if self.busy_cursor:
+            if loading:
+                self.page.setCursor(Qt.CursorShape.BusyCursor)
+            else:
+                self.page.unsetCursor()
+        self.loading_changed.emit(loading)
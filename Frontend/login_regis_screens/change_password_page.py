@@ -1,14 +1,15 @@
-import bcrypt
 from PyQt6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QMessageBox
 from PyQt6.QtCore import Qt
 
-from db.db_operations import DatabaseOperations
+from db.hashing import hash_password
+from Frontend.loader import PageLoader
 
 
 class ForgotPasswordPage(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
 
         layout = QVBoxLayout()
         layout.setContentsMargins(150, 60, 150, 60)
@@ -34,7 +35,7 @@ class ForgotPasswordPage(QWidget):
         # ===== BACK TO LOGIN =====
         back_btn = QPushButton("Back to Login")
         back_btn.setStyleSheet("background: transparent; color: #1E4D7B; text-decoration: underline; border: none;")
-        back_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))  # back to login page
+        back_btn.clicked.connect(lambda: self.stacked_widget.navigate("login"))  # back to login page
         layout.addWidget(back_btn, alignment=Qt.AlignmentFlag.AlignCenter)
 
         self.setLayout(layout)
@@ -46,24 +47,40 @@ class ForgotPasswordPage(QWidget):
             QMessageBox.warning(self, "Error", "Please enter your email or ID number.")
             return
         # Implement actual reset logic (e.g., send email or update password)
-        # For now, simulate
-        db = DatabaseOperations()
+        # For now, simulate. Hashing is slow on purpose, so it runs off the GUI thread like login
+        self.loader.load_db(
+            "reset",
+            lambda db: self._reset(db, email_or_id),
+            self._on_reset,
+            self._on_reset_error
+        )
+
+    @staticmethod
+    def _reset(db, email_or_id):
+        # Assume we update password to a new one (in real, send reset link)
+        new_password = "newpass123"  # Placeholder; implement properly
+        # Update based on id_number (assume it's ID)
+        cursor = db.conn.cursor()
         try:
-            # Assume we update password to a new one (in real, send reset link)
-            new_password = "newpass123"  # Placeholder; implement properly
-            # Update based on id_number (assume it's ID)
-            cursor = db.conn.cursor()
             query = "UPDATE students SET password = %s WHERE id_number = %s"  # Adjust table
-            hashed_pw = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed_pw = hash_password(new_password)
             cursor.execute(query, (hashed_pw, email_or_id))
             db.conn.commit()
-            if cursor.rowcount > 0:
-                QMessageBox.information(self, "Reset Success", "Your password has been reset to 'newpass123'. Please change it after login.")
-            else:
-                QMessageBox.warning(self, "Error", "ID not found.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+            return cursor.rowcount > 0
         finally:
-            db.close_connection()
+            cursor.close()
+
+    def _on_reset(self, found):
+        if found:
+            QMessageBox.information(self, "Reset Success", "Your password has been reset to 'newpass123'. Please change it after login.")
+        else:
+            QMessageBox.warning(self, "Error", "ID not found.")
+        self._back_to_login()
+
+    def _on_reset_error(self, e):
+        QMessageBox.critical(self, "Error", str(e))
+        self._back_to_login()
+
+    def _back_to_login(self):
         self.email_input.clear()
-        self.stacked_widget.setCurrentIndex(2)  # Back to login
\ No newline at end of file
+        self.stacked_widget.navigate("login")  # Back to login
\ No newline at end of file
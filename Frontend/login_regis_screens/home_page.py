@@ -1,21 +1,16 @@
-import sys, os
+import sys, os, importlib
 from PyQt6.QtWidgets import QApplication, QStackedWidget, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
 from PyQt6.QtGui import QFont, QPixmap
-from PyQt6.QtCore import Qt
-
-from Frontend.admin_Dashboard.admin_Add import AdminAddBook
-from Frontend.admin_Dashboard.admin_Dashboard import AdminDashboard
-from Frontend.admin_Dashboard.admin_Update import AdminUpdateBook
-from Frontend.admin_Dashboard.admin_ViewAllBooks import AdminViewAllBooks
-from Frontend.admin_Dashboard.admin_viewUsers import AdminViewUsers
-from Frontend.admin_Dashboard.AdminBorrowingHistory import AdminBorrowingHistory
-from Frontend.login_regis_screens.change_password_page import ForgotPasswordPage
-from Frontend.login_regis_screens.login_page import LoginPage
-from Frontend.login_regis_screens.registration_page import RegisterPage
-from Frontend.student_Dashboard.StudentBorrowBook import StudentBorrowBook
-from Frontend.student_Dashboard.student_borrowHistory import StudentBorrowHistory
-from Frontend.student_Dashboard.student_dashboard import StudentDashboard
-from Frontend.student_Dashboard.studentsBorrowed_book import StudentsBorrowedBook
+from PyQt6.QtCore import Qt, QTimer
+
+from db.db_connection import prewarm_pool
+from db.events import BookBorrowed, BookReturned
+from db.offline import get_desk
+from Frontend.change_poller import ChangePoller
+from Frontend.event_bridge import EventBridge
+from Frontend.loader import PageLoader
+
+OFFLINE_SYNC_INTERVAL_MS = int(os.environ.get("INFOCHAN_OFFLINE_SYNC_INTERVAL_MS", 30000))
 
 # ===== FIX IMPORT PATH =====
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -48,9 +43,9 @@ class HomePage(QWidget):
         btn_login = QPushButton("USER LOGIN")
 
         # Connect navigation buttons
-        btn_home.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-        btn_register.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
-        btn_login.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        btn_home.clicked.connect(lambda: self.stacked_widget.navigate("home"))
+        btn_register.clicked.connect(lambda: self.stacked_widget.navigate("register"))
+        btn_login.clicked.connect(lambda: self.stacked_widget.navigate("login"))
 
         for btn in [btn_home, btn_register, btn_login]:
             btn.setStyleSheet("""
@@ -112,48 +107,95 @@ class HomePage(QWidget):
 
         self.setLayout(main_layout)
 
+# ====== PAGE ROUTES ======
+# Route name -> (module, class). Pages are imported and built the first time they are opened.
+ROUTES = {
+    "register": ("Frontend.login_regis_screens.registration_page", "RegisterPage"),
+    "login": ("Frontend.login_regis_screens.login_page", "LoginPage"),
+    "forgot_password": ("Frontend.login_regis_screens.change_password_page", "ForgotPasswordPage"),
+    "student_dashboard": ("Frontend.student_Dashboard.student_dashboard", "StudentDashboard"),
+    "student_borrow": ("Frontend.student_Dashboard.StudentBorrowBook", "StudentBorrowBook"),
+    "student_borrowed": ("Frontend.student_Dashboard.studentsBorrowed_book", "StudentsBorrowedBook"),
+    "student_history": ("Frontend.student_Dashboard.student_borrowHistory", "StudentBorrowHistory"),
+    "admin_dashboard": ("Frontend.admin_Dashboard.admin_Dashboard", "AdminDashboard"),
+    "admin_add": ("Frontend.admin_Dashboard.admin_Add", "AdminAddBook"),
+    "admin_update": ("Frontend.admin_Dashboard.admin_Update", "AdminUpdateBook"),
+    "admin_view_books": ("Frontend.admin_Dashboard.admin_ViewAllBooks", "AdminViewAllBooks"),
+    "admin_view_users": ("Frontend.admin_Dashboard.admin_viewUsers", "AdminViewUsers"),
+    "admin_borrowing_history": ("Frontend.admin_Dashboard.AdminBorrowingHistory", "AdminBorrowingHistory"),
+}
+
 # ====== MAIN APP ======
 class MainApp(QStackedWidget):
     def __init__(self):
         super().__init__()
 
-        # Create page instances
-        self.home_page = HomePage(self)
-        self.register_page = RegisterPage(self)
-        self.login_page = LoginPage(self)
-        self.forgot_page = ForgotPasswordPage(self)
-        self.student_dashboard = StudentDashboard(self)
-        self.student_borrow = StudentBorrowBook(self)
-        self.student_borrowed = StudentsBorrowedBook(self)
-        self.student_history = StudentBorrowHistory(self)
-        self.admin_dashboard = AdminDashboard(self)
-        self.admin_add = AdminAddBook(self)
-        self.admin_update = AdminUpdateBook(self)
-        self.admin_view_books = AdminViewAllBooks(self)
-        self.admin_view_users = AdminViewUsers(self)
-        self.admin_borrowing_history = AdminBorrowingHistory(self)
-
-        # Add to stacked widget
-        self.addWidget(self.home_page)              # index 0
-        self.addWidget(self.register_page)          # index 1
-        self.addWidget(self.login_page)             # index 2
-        self.addWidget(self.forgot_page)            # index 3
-        self.addWidget(self.student_dashboard)      # index 4
-        self.addWidget(self.student_borrow)         # index 5
-        self.addWidget(self.student_borrowed)       # index 6
-        self.addWidget(self.student_history)        # index 7
-        self.addWidget(self.admin_dashboard)        # index 8
-        self.addWidget(self.admin_add)              # index 9
-        self.addWidget(self.admin_update)           # index 10
-        self.addWidget(self.admin_view_books)       # index 11
-        self.addWidget(self.admin_view_users)       # index 12
-        self.addWidget(self.admin_borrowing_history)  # index 13
-
-        self.setCurrentIndex(0)
+        self.session = None  # Set by LoginPage when a user logs in
+
+        # Shared poller for changes made by other kiosks; views subscribe while shown
+        self.changes = ChangePoller(self)
+        self.changes.history_changed.connect(self._on_history_changed)
+
+        # Writes made in this process, delivered on the GUI thread
+        self.events = EventBridge(self)
+        self.events.on((BookBorrowed, BookReturned), self._on_loan_event)
+
+        # Replay borrows/returns queued while the database was down, and keep the offline view fresh.
+        # Runs only while someone is logged in, so the home page still starts without touching the database.
+        self.sync_loader = PageLoader(self, busy_cursor=False)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(OFFLINE_SYNC_INTERVAL_MS)
+        self.sync_timer.timeout.connect(self.sync_offline)
+
+        # Only the home page is built up front; the rest are created on first navigation
+        self.pages = {"home": HomePage(self)}
+        self.addWidget(self.pages["home"])
+        self.navigate("home")
+
+    def page(self, name):
+        """Return the page for a route, building it if it has not been opened yet."""
+        if name not in self.pages:
+            module_name, class_name = ROUTES[name]
+            page_class = getattr(importlib.import_module(module_name), class_name)
+            self.pages[name] = page_class(self)
+            self.addWidget(self.pages[name])
+        return self.pages[name]
+
+    def navigate(self, name):
+        """Show the page for a route."""
+        page = self.page(name)
+        self.setCurrentWidget(page)
+        return page
+
+    def start_session(self, session):
+        """Called by LoginPage after a successful login."""
+        self.session = session
+        self.sync_offline()
+        self.sync_timer.start()
+
+    def logout(self, route="login"):
+        self.session = None
+        self.sync_timer.stop()
+        self.sync_loader.cancel()
+        self.navigate(route)
+
+    def sync_offline(self):
+        if not self.sync_loader.is_loading("sync"):
+            self.sync_loader.load("sync", get_desk().sync, lambda result: None)
+
+    def _on_loan_event(self, event):
+        if self.session and (event.user_id, event.user_type) == (self.session.user_id, self.session.role):
+            self.session.invalidate_loans()
+
+    def _on_history_changed(self, records):
+        # Someone else borrowed or returned for the logged-in user
+        if self.session and any(r[1] == self.session.user_id and r[2] == self.session.role for r in records):
+            self.session.invalidate_loans()
 
 # ====== APP ENTRY POINT ======
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    prewarm_pool()  # Open DB connections in the background while the UI is built
     window = MainApp()
     window.setWindowTitle("Library Information System")
     window.showMaximized()
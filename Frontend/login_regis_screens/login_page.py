@@ -5,13 +5,15 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QIntValidator
 
-from db.db_operations import DatabaseOperations
+from Frontend.loader import PageLoader
+from Frontend.session import Session
 
 class LoginPage(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
         self.user_data = None  # To store logged-in user data
+        self.loader = PageLoader(self)
 
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -31,9 +33,9 @@ class LoginPage(QWidget):
         btn_login = QPushButton("USER LOGIN")
 
         # Connect navigation buttons
-        btn_home.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-        btn_register.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
-        btn_login.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        btn_home.clicked.connect(lambda: self.stacked_widget.navigate("home"))
+        btn_register.clicked.connect(lambda: self.stacked_widget.navigate("register"))
+        btn_login.clicked.connect(lambda: self.stacked_widget.navigate("login"))
 
         for btn in [btn_home, btn_register, btn_login]:
             btn.setStyleSheet("""
@@ -110,7 +112,7 @@ class LoginPage(QWidget):
         # ===== REGISTER LINK =====
         register_btn = QPushButton("Don’t have an account? Register here")
         register_btn.setStyleSheet("background: transparent; color: #1E4D7B; text-decoration: underline; border: none; max-width: 350px;")
-        register_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
+        register_btn.clicked.connect(lambda: self.stacked_widget.navigate("register"))
         form_layout.addWidget(register_btn)
 
         layout.addLayout(form_layout)
@@ -143,18 +145,23 @@ class LoginPage(QWidget):
             return
 
         # === Database Check ===
-        db = DatabaseOperations()
-        try:
-            self.user_data = db.login_user(self.selected_role, user_id, password)
-            if self.user_data:
-                QMessageBox.information(self, "Success", f"Welcome {self.selected_role}! You logged in successfully.")
-                if self.selected_role == "Admin":
-                    self.stacked_widget.setCurrentIndex(8)  # Admin Dashboard
-                else:
-                    self.stacked_widget.setCurrentIndex(4)  # Student Dashboard
+        # Password checking is slow on purpose, so it runs off the GUI thread
+        role = self.selected_role
+        self.loader.load_db(
+            "login",
+            lambda db: db.login_user(role, user_id, password),
+            lambda user_data: self._on_login(role, user_data),
+            lambda e: QMessageBox.critical(self, "Database Error", f"An error occurred:\n{e}")
+        )
+
+    def _on_login(self, role, user_data):
+        self.user_data = user_data
+        if self.user_data:
+            self.stacked_widget.start_session(Session(role, user_data))
+            QMessageBox.information(self, "Success", f"Welcome {role}! You logged in successfully.")
+            if role == "Admin":
+                self.stacked_widget.navigate("admin_dashboard")  # Admin Dashboard
             else:
-                QMessageBox.warning(self, "Login Failed", "Invalid ID number or password.")
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", f"An error occurred:\n{e}")
-        finally:
-            db.close_connection()
\ No newline at end of file
+                self.stacked_widget.navigate("student_dashboard")  # Student Dashboard
+        else:
+            QMessageBox.warning(self, "Login Failed", "Invalid ID number or password.")
\ No newline at end of file
@@ -5,12 +5,13 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QIntValidator
 
-from db.db_operations import DatabaseOperations
+from Frontend.loader import PageLoader
 
 class RegisterPage(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
 
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -30,9 +31,9 @@ class RegisterPage(QWidget):
         btn_login = QPushButton("USER LOGIN")
 
         # Connect navigation buttons
-        btn_home.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(0))
-        btn_register.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(1))
-        btn_login.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        btn_home.clicked.connect(lambda: self.stacked_widget.navigate("home"))
+        btn_register.clicked.connect(lambda: self.stacked_widget.navigate("register"))
+        btn_login.clicked.connect(lambda: self.stacked_widget.navigate("login"))
 
         for btn in [btn_home, btn_register, btn_login]:
             btn.setStyleSheet("""
@@ -156,17 +157,21 @@ class RegisterPage(QWidget):
             return
 
         # ==== Database Insertion ====
-        db = DatabaseOperations()
-        try:
-            success = db.register_user(role, name, user_id, password, strand, grade)
-            if success:
-                QMessageBox.information(self, "Success", f"{role} '{name}' registered successfully!")
-                self.clear_fields()
-                self.stacked_widget.setCurrentIndex(2)  # Go to Login page
-            else:
-                QMessageBox.critical(self, "Error", "Failed to register user.")
-        finally:
-            db.close_connection()
+        # Hashing the password is slow on purpose, so it runs off the GUI thread
+        self.loader.load_db(
+            "register",
+            lambda db: db.register_user(role, name, user_id, password, strand, grade),
+            lambda success: self._on_registered(role, name, success),
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to register user: {e}")
+        )
+
+    def _on_registered(self, role, name, success):
+        if success:
+            QMessageBox.information(self, "Success", f"{role} '{name}' registered successfully!")
+            self.clear_fields()
+            self.stacked_widget.navigate("login")  # Go to Login page
+        else:
+            QMessageBox.critical(self, "Error", "Failed to register user.")
 
     def clear_fields(self):
         """Reset all form fields"""
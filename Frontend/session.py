@@ -0,0 +1,72 @@
+import threading
+
+from db.policy import policy_for
+
+ACTIVE_STATUSES = ("Active", "Overdue")
+
+
+class Session:
+    """The logged-in user's profile plus a cached snapshot of their borrowing history.
+
+    Created by LoginPage when a login succeeds and kept on MainApp.session. The
+    student pages read identity and loans from here instead of querying for them
+    on every show. MainApp calls invalidate_loans() when a BookBorrowed or
+    BookReturned event for this user is published.
+    """
+
+    def __init__(self, role, user_data):
+        self.role = role
+        self.user_id = user_data["id"]
+        self.full_name = user_data["full_name"]
+        self.grade_level = user_data.get("grade_level")
+        self.strand = user_data.get("strand")
+        self._history = None
+        self._generation = 0  # Bumped on every invalidation
+        self._lock = threading.Lock()
+
+    @property
+    def profile_text(self):
+        if self.grade_level:
+            return f"{self.full_name} - {self.grade_level} {self.strand}"
+        return f"{self.full_name} - {self.role}"
+
+    # --- Loans (history() may run on a worker thread) ---
+    def cached_history(self):
+        """The history snapshot, or None if it has to be queried again."""
+        with self._lock:
+            return self._history
+
+    def history(self, db):
+        """Borrowing history with book details, queried only when the snapshot is stale."""
+        with self._lock:
+            if self._history is not None:
+                return self._history
+            generation = self._generation
+        history = db.get_borrowing_history(self.user_id, self.role, with_book_details=True)
+        with self._lock:
+            # A borrow or return that landed while we were querying makes this result stale
+            if generation == self._generation:
+                self._history = history
+        return history
+
+    def active_loans(self, db):
+        return active_loans(self.history(db))
+
+    def counts(self, db):
+        return loan_counts(self.history(db), self.role)
+
+    def invalidate_loans(self):
+        with self._lock:
+            self._history = None
+            self._generation += 1
+
+
+def active_loans(history):
+    return [record for record in history if record[7] in ACTIVE_STATUSES]
+
+
+def loan_counts(history, role):
+    """Borrowed, overdue and free-slot counts for a borrowing history of a user with role."""
+    borrowed = sum(1 for record in history if record[7] in ACTIVE_STATUSES)
+    due = sum(1 for record in history if record[7] == "Overdue")
+    return {"borrowed": borrowed, "due": due, "available": max(0, policy_for(role).max_loans - borrowed)}
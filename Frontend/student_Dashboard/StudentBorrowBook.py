@@ -2,11 +2,15 @@ import os
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+    QTableView, QHeaderView, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from db.db_operations import DatabaseOperations
+from db.events import BookBorrowed, BookReturned
+from db.offline import QUEUED_MESSAGE, get_desk
+from Frontend.action_delegate import ActionButtonDelegate
+from Frontend.loader import PageLoader
+from Frontend.table_models import Column, RowTableModel
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -21,7 +25,12 @@ class StudentBorrowBook(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
         self._setup_ui()
+        self.stacked_widget.changes.books_changed.connect(self.patch_books)
+        self.stacked_widget.changes.reload_required.connect(self.load_available_books)
+        self.stacked_widget.events.on(BookBorrowed, lambda event: self.model.remove(event.book_id))
+        self.stacked_widget.events.on(BookReturned, lambda event: event.book and self.patch_books([event.book]))
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -47,11 +56,22 @@ class StudentBorrowBook(QWidget):
         layout.addWidget(books_header, alignment=Qt.AlignmentFlag.AlignLeft)
 
         # Available Books Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["No.", "Title", "Author", "Category", "ISBN", "Action"])
+        self.model = RowTableModel([
+            Column("No.", lambda book, i: i + 1),
+            Column("Title", lambda book, i: book[2]),
+            Column("Author", lambda book, i: book[3]),
+            Column("Category", lambda book, i: book[1]),
+            Column("ISBN", lambda book, i: book[5]),
+            Column("Action", lambda book, i: None),
+        ], self)
+        # Only the first page is loaded; the rest arrives as the user scrolls
+        self.model.more_requested.connect(self.load_next_page)
+        self.next_token = None
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #E5E7EB;
                 border: 1px solid #D1D5DB;
@@ -66,12 +86,12 @@ class StudentBorrowBook(QWidget):
                 font-weight: bold;
                 font-size: 12pt;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 color: #374151;
                 font-size: 11pt;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0.5,
                     stop:0 #DBEAFE, stop:1 #BFDBFE);
                 color: #1e40af;
@@ -80,87 +100,93 @@ class StudentBorrowBook(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(55)  # Increase row height for better visibility
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+
+        # Borrow button, painted by a delegate
+        self.borrow_delegate = ActionButtonDelegate(self.table, "📖 Borrow", ColorScheme.SUCCESS_GRADIENT)
+        self.borrow_delegate.clicked.connect(lambda book: self.borrow_book(book[0], book[2]))
+        self.table.setItemDelegateForColumn(5, self.borrow_delegate)
         layout.addWidget(self.table)
 
     def showEvent(self, event):
         """Load available books when the widget is shown."""
         super().showEvent(event)
+        self.stacked_widget.changes.subscribe(self)
         self.load_available_books()
 
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.stacked_widget.changes.unsubscribe(self)
+
     def go_back(self):
         """Go to the student dashboard."""
-        self.stacked_widget.setCurrentIndex(4)
+        self.stacked_widget.navigate("student_dashboard")
 
     def load_available_books(self):
-        """Fetch and display available books from the database."""
-        db = DatabaseOperations()
-        try:
-            query = "SELECT id, title, author, category, isbn FROM books WHERE status = 'Available'"
-            cursor = db.conn.cursor()
-            cursor.execute(query)
-            books = cursor.fetchall()
-            self.populate_table(books)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load books: {str(e)}")
-        finally:
-            cursor.close()
-            db.close_connection()
-
-    def populate_table(self, books):
+        """Fetch and display the first page of available books from the database."""
+        self.loader.cancel("books_page")  # A page of the old list must not land on the new one
+        self.loader.load_db(
+            "books",
+            lambda db: db.get_books_page(status="Available"),
+            lambda page: self.populate_table(*page),
+            lambda e: QMessageBox.critical(self, "Error", f"Failed to load books: {str(e)}")
+        )
+
+    def load_next_page(self):
+        """Fetch the next page once the user scrolls to the bottom of the table."""
+        token = self.next_token
+        self.loader.load_db(
+            "books_page",
+            lambda db: db.get_books_page(token, status="Available"),
+            lambda page: self.append_page(*page),
+            lambda e: self.model.fetch_failed()
+        )
+
+    def populate_table(self, books, next_token=None):
         """Populate the table with available books and Borrow buttons."""
-        self.table.setRowCount(len(books))
-        for row, book in enumerate(books):
-            book_id, title, author, category, isbn = book
-            self.table.setRowHeight(row, 55)  # Increase row height for better visibility
-            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-            self.table.setItem(row, 1, QTableWidgetItem(title))
-            self.table.setItem(row, 2, QTableWidgetItem(author))
-            self.table.setItem(row, 3, QTableWidgetItem(category))
-            self.table.setItem(row, 4, QTableWidgetItem(isbn))
-
-            # Borrow button
-            borrow_btn = QPushButton("📖 Borrow")
-            borrow_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            borrow_btn.setStyleSheet(self._button_style(ColorScheme.SUCCESS_GRADIENT))
-            borrow_btn.clicked.connect(lambda checked, bid=book_id, ttl=title: self.borrow_book(bid, ttl))
-            self.table.setCellWidget(row, 5, borrow_btn)
-
-            # Center align all cells
-            for col in range(5):
-                item = self.table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.next_token = next_token
+        self.model.set_rows(books, has_more=next_token is not None)
+
+    def append_page(self, books, next_token):
+        self.next_token = next_token
+        self.model.append_rows(books, has_more=next_token is not None)
+
+    def patch_books(self, books):
+        """Add books returned elsewhere and drop books borrowed elsewhere."""
+        self.model.patch_rows(books, accept=lambda book: book[7] == "Available")
 
     def borrow_book(self, book_id, title):
         """Handle borrowing a book."""
-        if not self.stacked_widget.widget(2).user_data:
+        session = self.stacked_widget.session
+        if not session:
             QMessageBox.warning(self, "Not Logged In", "Please log in to borrow a book.")
             return
 
-        user_id = self.stacked_widget.widget(2).user_data['id']
-        db = DatabaseOperations()
-        try:
-            # Check borrowing limit
-            history = db.get_borrowing_history(user_id, self.stacked_widget.widget(2).selected_role)
-            active_books = [record for record in history if record[7] in ["Active", "Overdue"]]
-            if len(active_books) >= 5:
-                QMessageBox.warning(self, "Limit Reached", "You cannot borrow more than 5 books at a time.")
-                return
-
-            # Borrow the book
-            success, message = db.borrow_book(user_id, "student", book_id, datetime.now())
-            if success:
-                QMessageBox.information(self, "Success", f"Book '{title}' borrowed successfully!")
-                self.load_available_books()  # Refresh table
-            else:
-                QMessageBox.critical(self, "Error", f"Failed to borrow the book: {message}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error borrowing book: {str(e)}")
-        finally:
-            db.close_connection()
+        user_id, role = session.user_id, session.role
+
+        # borrow_book enforces the borrowing limit and availability itself,
+        # and the desk queues the borrow if the database is unreachable
+        self.loader.load(
+            f"borrow:{book_id}",
+            lambda: get_desk().borrow_book(user_id, role, book_id, datetime.now()),
+            lambda result: self._on_borrowed(title, result),
+            lambda e: QMessageBox.critical(self, "Error", f"Error borrowing book: {str(e)}")
+        )
+
+    def _on_borrowed(self, title, result):
+        success, message = result
+        if success:
+            # The BookBorrowed event removes the row, so the table is not reloaded
+            note = f"\n\n{message}" if message == QUEUED_MESSAGE else ""
+            QMessageBox.information(self, "Success", f"Book '{title}' borrowed successfully!{note}")
+        elif message.startswith("Cannot borrow more than"):
+            QMessageBox.warning(self, "Limit Reached", f"{message}.")
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to borrow the book: {message}")
 
     def _button_style(self, color):
         return f"""
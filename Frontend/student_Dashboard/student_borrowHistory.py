@@ -1,12 +1,12 @@
-import pymysql
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QFrame, QLabel, QSpacerItem, QSizePolicy, QTableWidget,
-    QTableWidgetItem, QHeaderView, QComboBox, QLineEdit
+    QPushButton, QFrame, QLabel, QSpacerItem, QSizePolicy, QTableView,
+    QHeaderView, QComboBox, QLineEdit
 )
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
-from db.db_operations import DatabaseOperations
+from PyQt6.QtGui import QColor, QFont
+from Frontend.loader import PageLoader
+from Frontend.table_models import ALL_ROWS, STATUS_COLORS, Column, RowFilterProxyModel, RowTableModel, bucket_rows
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -18,10 +18,15 @@ class ColorScheme:
     TEAL_GRADIENT = ("#14b8a6", "#0f766e")
     INDIGO_GRADIENT = ("#6366f1", "#4f46e5")
 
+FINE_COLOR = QColor(Qt.GlobalColor.darkRed)
+NO_FINE_COLOR = QColor(Qt.GlobalColor.darkGreen)
+
 class StudentBorrowHistory(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
+        self.buckets = {}  # category -> history rows, filled once per show
         self._setup_ui()
 
     def _setup_ui(self):
@@ -47,7 +52,7 @@ class StudentBorrowHistory(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout())
         header_layout.addWidget(logout_btn)
 
         layout.addWidget(header_frame)
@@ -58,17 +63,17 @@ class StudentBorrowHistory(QWidget):
         nav_layout.setSpacing(20)
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 4),
-            ("📖 BORROW BOOKS", ColorScheme.SUCCESS_GRADIENT, 5),
-            ("📚 MY BORROWED BOOKS", ColorScheme.WARNING_GRADIENT, 6),
-            ("📜 BORROWING HISTORY", ColorScheme.INFO_GRADIENT, 7),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "student_dashboard"),
+            ("📖 BORROW BOOKS", ColorScheme.SUCCESS_GRADIENT, "student_borrow"),
+            ("📚 MY BORROWED BOOKS", ColorScheme.WARNING_GRADIENT, "student_borrowed"),
+            ("📜 BORROWING HISTORY", ColorScheme.INFO_GRADIENT, "student_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet(self._button_style(ColorScheme.INFO_GRADIENT) if idx == 7 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+            btn.setStyleSheet(self._button_style(ColorScheme.INFO_GRADIENT) if route == "student_history" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         layout.addWidget(nav_frame)
@@ -81,25 +86,38 @@ class StudentBorrowHistory(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Search by book title...")
         self.search_input.setStyleSheet(self._input_style())
-        self.search_input.textChanged.connect(self.filter_history)
+        self.search_input.textChanged.connect(lambda text: self.proxy.set_search(text))
         filter_layout.addWidget(self.search_input)
 
         self.category_combo = QComboBox()
-        self.category_combo.addItems(["All Categories", "Fiction", "Science", "History", "Technology", "Arts", "Education"])
+        self.category_combo.addItems([ALL_ROWS, "Fiction", "Science", "History", "Technology", "Arts", "Education"])
         self.category_combo.setStyleSheet(self._combo_style())
-        self.category_combo.currentTextChanged.connect(self.filter_history)
+        self.category_combo.currentTextChanged.connect(self.apply_category)
         filter_layout.addWidget(self.category_combo)
 
         layout.addWidget(filter_frame)
 
         # History Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "No.", "Book Title", "Author", "Category", "Borrow Date", "Return Date", "Status", "Condition", "Fine"
-        ])
+        # Rows are history records with the book details joined in (author at 11)
+        self.model = RowTableModel([
+            Column("No.", lambda row, i: i + 1),
+            Column("Book Title", lambda row, i: row[4]),
+            Column("Author", lambda row, i: row[11]),
+            Column("Category", lambda row, i: row[10]),
+            Column("Borrow Date", lambda row, i: row[5]),
+            Column("Return Date", lambda row, i: row[6] if row[6] else "Not Yet Returned"),
+            Column("Status", lambda row, i: row[7], foreground=lambda row: STATUS_COLORS.get(row[7])),
+            Column("Condition", lambda row, i: row[8]),
+            Column("Fine", lambda row, i: f"₱{row[9]:.2f}",
+                   foreground=lambda row: FINE_COLOR if row[9] > 0 else NO_FINE_COLOR),
+        ], self)
+        # Title search runs on this proxy, so typing never goes back to the database
+        self.proxy = RowFilterProxyModel(lambda row: row[4], self, number_column=0)
+        self.proxy.setSourceModel(self.model)
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #E5E7EB;
                 border: 1px solid #D1D5DB;
@@ -114,12 +132,12 @@ class StudentBorrowHistory(QWidget):
                 font-weight: bold;
                 font-size: 12pt;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 color: #374151;
                 font-size: 11pt;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0.5,
                     stop:0 #DBEAFE, stop:1 #BFDBFE);
                 color: #1e40af;
@@ -128,9 +146,10 @@ class StudentBorrowHistory(QWidget):
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         layout.addWidget(self.table)
 
     def showEvent(self, event):
@@ -138,83 +157,24 @@ class StudentBorrowHistory(QWidget):
         self.load_student_data()
 
     def load_student_data(self):
-        db = DatabaseOperations()
-        try:
-            user_id = self.stacked_widget.widget(2).user_data['id']
-            role = self.stacked_widget.widget(2).selected_role
-            self.student_info.setText(f"👨‍🎓 {self.stacked_widget.widget(2).user_data['full_name']} - Grade 11 STEM")
-            self.fetch_and_populate_history()
-        finally:
-            db.close_connection()
-
-    def get_book_details(self, book_id):
-        db = DatabaseOperations()
-        try:
-            cursor = db.conn.cursor()
-            cursor.execute("SELECT id, category, title, author, edition, isbn, publication, status FROM books WHERE id = %s", (book_id,))
-            return cursor.fetchone()
-        finally:
-            cursor.close()
-            db.close_connection()
+        self.student_info.setText(f"👨‍🎓 {self.stacked_widget.session.profile_text}")
+        self.fetch_and_populate_history()
 
-    def filter_history(self):
-        search_text = self.search_input.text().strip().lower()
-        category = self.category_combo.currentText()
-        self.fetch_and_populate_history(search_text, category)
-
-    def fetch_and_populate_history(self, search_text="", category="All Categories"):
-        db = DatabaseOperations()
-        try:
-            user_id = self.stacked_widget.widget(2).user_data['id']
-            role = self.stacked_widget.widget(2).selected_role
-            history = db.get_borrowing_history(user_id, role)
-            filtered_history = []
-            for record in history:
-                title = record[4].lower()
-                cat = record[10]
-                if search_text and search_text not in title:
-                    continue
-                if category != "All Categories" and category and cat != category:
-                    continue
-                filtered_history.append(record)
-            self.populate_table(filtered_history)
-        finally:
-            db.close_connection()
+    def fetch_and_populate_history(self):
+        """Load the whole history once; searching and category changes filter it locally."""
+        session = self.stacked_widget.session
+        history = session.cached_history()
+        if history is not None:
+            self.populate_table(history)
+        else:
+            self.loader.load_db("history", session.history, self.populate_table)
 
     def populate_table(self, history):
-        self.table.setRowCount(len(history))
-        for row, record in enumerate(history):
-            book_details = self.get_book_details(record[3])
-            if not book_details:
-                continue
-            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-            self.table.setItem(row, 1, QTableWidgetItem(record[4]))
-            self.table.setItem(row, 2, QTableWidgetItem(book_details[3]))
-            self.table.setItem(row, 3, QTableWidgetItem(record[10]))
-            self.table.setItem(row, 4, QTableWidgetItem(str(record[5])))
-            self.table.setItem(row, 5, QTableWidgetItem(str(record[6]) if record[6] else "Not Yet Returned"))
-            status_item = QTableWidgetItem(record[7])
-            if record[7] == "Returned":
-                status_item.setForeground(Qt.GlobalColor.darkGreen)
-            elif record[7] == "Active":
-                status_item.setForeground(Qt.GlobalColor.darkBlue)
-            elif record[7] == "Overdue":
-                status_item.setForeground(Qt.GlobalColor.darkRed)
-            elif record[7] == "Returned Late":
-                status_item.setForeground(Qt.GlobalColor.darkYellow)
-            self.table.setItem(row, 6, status_item)
-            condition_item = QTableWidgetItem(record[8])
-            self.table.setItem(row, 7, condition_item)
-            fine_item = QTableWidgetItem(f"₱{record[9]:.2f}")
-            if record[9] > 0:
-                fine_item.setForeground(Qt.GlobalColor.darkRed)
-            else:
-                fine_item.setForeground(Qt.GlobalColor.darkGreen)
-            self.table.setItem(row, 8, fine_item)
-            for col in range(9):
-                item = self.table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.buckets = bucket_rows(history, lambda record: record[10])
+        self.apply_category(self.category_combo.currentText())
+
+    def apply_category(self, category):
+        self.model.set_rows(self.buckets.get(category or ALL_ROWS, []))
 
     def _button_style(self, color):
         return f"""
@@ -5,7 +5,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from db.db_operations import DatabaseOperations
+from Frontend.loader import PageLoader
+from Frontend.session import active_loans, loan_counts
 
 
 class ColorScheme:
@@ -22,6 +23,7 @@ class StudentDashboard(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
         self._setup_ui()
 
     def _setup_ui(self):
@@ -47,7 +49,7 @@ class StudentDashboard(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout())
         header_layout.addWidget(logout_btn)
 
         layout.addWidget(header_frame)
@@ -58,18 +60,18 @@ class StudentDashboard(QWidget):
         nav_layout.setSpacing(20)
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 4),
-            ("📖 BORROW BOOKS", ColorScheme.SUCCESS_GRADIENT, 5),
-            ("📚 MY BORROWED BOOKS", ColorScheme.WARNING_GRADIENT, 6),
-            ("📜 BORROWING HISTORY", ColorScheme.INFO_GRADIENT, 7),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "student_dashboard"),
+            ("📖 BORROW BOOKS", ColorScheme.SUCCESS_GRADIENT, "student_borrow"),
+            ("📚 MY BORROWED BOOKS", ColorScheme.WARNING_GRADIENT, "student_borrowed"),
+            ("📜 BORROWING HISTORY", ColorScheme.INFO_GRADIENT, "student_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
             btn.setStyleSheet(
-                self._button_style(ColorScheme.PRIMARY_GRADIENT) if idx == 4 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+                self._button_style(ColorScheme.PRIMARY_GRADIENT) if route == "student_dashboard" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         layout.addWidget(nav_frame)
@@ -132,49 +134,35 @@ class StudentDashboard(QWidget):
         self.load_student_data()
 
     def load_student_data(self):
-        db = DatabaseOperations()
-        try:
-            # Get user data from login page
-            login_page = self.stacked_widget.widget(2)
-            user_id = login_page.user_data['id']
-            role = login_page.selected_role
-
-            # Get student details for display
-            if role == "Student":
-                cursor = db.conn.cursor()
-                cursor.execute("SELECT full_name, grade_level, strand FROM students WHERE id = %s", (user_id,))
-                student_result = cursor.fetchone()
-                if student_result:
-                    full_name, grade_level, strand = student_result
-                    self.student_info.setText(f"👨‍🎓 {full_name} - {grade_level} {strand}")
-                cursor.close()
-
-            # Get borrowing history
-            history = db.get_borrowing_history(user_id, role)
-
-            # Filter for currently borrowed books (Active or Overdue)
-            current_books = [book for book in history if book[7] in ["Active", "Overdue"]]
-            total_borrowed = len(current_books)
-            books_due = sum(1 for book in current_books if book[7] == "Overdue")
-
-            # Calculate available slots (maximum 5 books)
-            available_slots_count = max(0, 5 - total_borrowed)
-
-            # Update info boxes
-            self.populate_table(current_books)
-            self.books_borrowed.layout().itemAt(1).widget().setText(str(total_borrowed))
-            self.books_due.layout().itemAt(1).widget().setText(str(books_due))
-            self.available_slots.layout().itemAt(1).widget().setText(str(available_slots_count))
-
-        except Exception as e:
-            print(f"Error loading student data: {e}")
-            # Set default values in case of error
-            self.books_borrowed.layout().itemAt(1).widget().setText("0")
-            self.books_due.layout().itemAt(1).widget().setText("0")
-            self.available_slots.layout().itemAt(1).widget().setText("5")
-            self.student_info.setText("👨‍🎓 Error loading user info")
-        finally:
-            db.close_connection()
+        # Identity and loans come from the login session
+        session = self.stacked_widget.session
+        if not session:
+            self._show_load_error("no user is logged in")
+            return
+        self.student_info.setText(f"👨‍🎓 {session.profile_text}")
+        history = session.cached_history()
+        if history is not None:
+            self._apply_student_data(active_loans(history))
+        else:
+            self.loader.load_db("student_data", session.active_loans, self._apply_student_data, self._show_load_error)
+
+    def _apply_student_data(self, current_books):
+        # current_books holds the currently borrowed books (Active or Overdue)
+        counts = loan_counts(current_books, self.stacked_widget.session.role)
+
+        # Update info boxes
+        self.populate_table(current_books)
+        self.books_borrowed.layout().itemAt(1).widget().setText(str(counts["borrowed"]))
+        self.books_due.layout().itemAt(1).widget().setText(str(counts["due"]))
+        self.available_slots.layout().itemAt(1).widget().setText(str(counts["available"]))
+
+    def _show_load_error(self, e):
+        print(f"Error loading student data: {e}")
+        # Set default values in case of error
+        self.books_borrowed.layout().itemAt(1).widget().setText("0")
+        self.books_due.layout().itemAt(1).widget().setText("0")
+        self.available_slots.layout().itemAt(1).widget().setText("5")
+        self.student_info.setText("👨‍🎓 Error loading user info")
 
     def populate_table(self, books):
         """Populate table with currently borrowed books (Active or Overdue)"""
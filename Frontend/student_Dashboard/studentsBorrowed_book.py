@@ -1,13 +1,14 @@
-import pymysql
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QFrame, QLabel, QSpacerItem, QSizePolicy, QTableWidget,
-    QTableWidgetItem, QHeaderView, QComboBox, QLineEdit, QMessageBox
+    QPushButton, QFrame, QLabel, QSpacerItem, QSizePolicy, QTableView,
+    QHeaderView, QComboBox, QLineEdit, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
-from datetime import datetime, timedelta
-from db.db_operations import DatabaseOperations
+from datetime import datetime
+from Frontend.loader import PageLoader
+from Frontend.session import loan_counts
+from Frontend.table_models import ALL_ROWS, Column, RowFilterProxyModel, RowTableModel, bucket_rows
 
 class ColorScheme:
     PRIMARY_GRADIENT = ("#667eea", "#764ba2")
@@ -23,6 +24,8 @@ class StudentsBorrowedBook(QWidget):
     def __init__(self, stacked_widget):
         super().__init__()
         self.stacked_widget = stacked_widget
+        self.loader = PageLoader(self)
+        self.buckets = {}  # category -> returned-book rows, filled once per show
         self._setup_ui()
 
     def _setup_ui(self):
@@ -55,7 +58,7 @@ class StudentsBorrowedBook(QWidget):
         logout_btn = QPushButton("🚪 LOGOUT")
         logout_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         logout_btn.setStyleSheet(self._button_style(ColorScheme.DANGER_GRADIENT))
-        logout_btn.clicked.connect(lambda: self.stacked_widget.setCurrentIndex(2))
+        logout_btn.clicked.connect(lambda: self.stacked_widget.logout())
         header_layout.addWidget(logout_btn)
 
         layout.addWidget(header_frame)
@@ -66,17 +69,17 @@ class StudentsBorrowedBook(QWidget):
         nav_layout.setSpacing(20)
 
         nav_items = [
-            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, 4),
-            ("📖 BORROW BOOKS", ColorScheme.SUCCESS_GRADIENT, 5),
-            ("📚 MY BORROWED BOOKS", ColorScheme.WARNING_GRADIENT, 6),
-            ("📜 BORROWING HISTORY", ColorScheme.INFO_GRADIENT, 7),
+            ("📊 DASHBOARD", ColorScheme.PRIMARY_GRADIENT, "student_dashboard"),
+            ("📖 BORROW BOOKS", ColorScheme.SUCCESS_GRADIENT, "student_borrow"),
+            ("📚 MY BORROWED BOOKS", ColorScheme.WARNING_GRADIENT, "student_borrowed"),
+            ("📜 BORROWING HISTORY", ColorScheme.INFO_GRADIENT, "student_history"),
         ]
 
-        for text, color, idx in nav_items:
+        for text, color, route in nav_items:
             btn = QPushButton(text)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            btn.setStyleSheet(self._button_style(ColorScheme.WARNING_GRADIENT) if idx == 6 else self._button_style(color))
-            btn.clicked.connect(lambda checked, i=idx: self.stacked_widget.setCurrentIndex(i))
+            btn.setStyleSheet(self._button_style(ColorScheme.WARNING_GRADIENT) if route == "student_borrowed" else self._button_style(color))
+            btn.clicked.connect(lambda checked, r=route: self.stacked_widget.navigate(r))
             nav_layout.addWidget(btn)
 
         layout.addWidget(nav_frame)
@@ -89,13 +92,13 @@ class StudentsBorrowedBook(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("🔍 Search by title...")
         self.search_input.setStyleSheet(self._input_style())
-        self.search_input.textChanged.connect(self.filter_books)
+        self.search_input.textChanged.connect(lambda text: self.proxy.set_search(text))
         filter_layout.addWidget(self.search_input)
 
         self.category_combo = QComboBox()
-        self.category_combo.addItems(["All Categories", "Fiction", "Science", "History", "Technology", "Arts", "Education"])
+        self.category_combo.addItems([ALL_ROWS, "Fiction", "Science", "History", "Technology", "Arts", "Education"])
         self.category_combo.setStyleSheet(self._combo_style())
-        self.category_combo.currentTextChanged.connect(self.filter_books)
+        self.category_combo.currentTextChanged.connect(self.apply_category)
         filter_layout.addWidget(self.category_combo)
 
         layout.addWidget(filter_frame)
@@ -115,19 +118,32 @@ class StudentsBorrowedBook(QWidget):
         layout.addWidget(info_frame)
 
         # Borrowed Books Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([
-            "No.", "Book Title", "Author", "Category", "ISBN",
-            "Borrow Date", "Borrow Time", "Return Date", "Return Time", "Days Left"
-        ])
+        # Rows are history records with the book details joined in (author at 11, isbn at 12, due date at 14)
+        self.model = RowTableModel([
+            Column("No.", lambda row, i: i + 1),
+            Column("Book Title", lambda row, i: row[4]),
+            Column("Author", lambda row, i: row[11]),
+            Column("Category", lambda row, i: row[10]),
+            Column("ISBN", lambda row, i: row[12]),
+            Column("Borrow Date", lambda row, i: row[5].strftime("%Y-%m-%d")),
+            Column("Borrow Time", lambda row, i: row[5].strftime("%H:%M:%S")),
+            Column("Return Date", lambda row, i: row[6].strftime("%Y-%m-%d") if row[6] else "Not Returned"),
+            Column("Return Time", lambda row, i: row[6].strftime("%H:%M:%S") if row[6] else "Not Returned"),
+            Column("Days Left", lambda row, i: self.calculate_days_left(row[14], row[7])),
+        ], self)
+        # Title search runs on this proxy, so typing never goes back to the database
+        self.proxy = RowFilterProxyModel(lambda row: row[4], self, number_column=0)
+        self.proxy.setSourceModel(self.model)
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
         self.table.setStyleSheet(self._table_style())
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         layout.addWidget(self.table)
 
     def showEvent(self, event):
@@ -135,88 +151,42 @@ class StudentsBorrowedBook(QWidget):
         self.load_student_data()
 
     def load_student_data(self):
-        db = DatabaseOperations()
-        try:
-            user_id = self.stacked_widget.widget(2).user_data['id']
-            role = self.stacked_widget.widget(2).selected_role
-            history = db.get_borrowing_history(user_id, role)
-            total_borrowed = sum(1 for record in history if record[7] in ["Active", "Overdue"])
-            books_due = sum(1 for record in history if record[7] == "Overdue")
-            self.books_borrowed.layout().itemAt(1).widget().setText(str(total_borrowed))
-            self.books_due.layout().itemAt(1).widget().setText(str(books_due))
-            self.available_slots.layout().itemAt(1).widget().setText(str(5 - total_borrowed))
-            self.student_info.setText(f"👨‍🎓 {self.stacked_widget.widget(2).user_data['full_name']} - Grade 11 STEM")
-            self.fetch_and_populate_books()
-        finally:
-            db.close_connection()
+        session = self.stacked_widget.session
+        self.student_info.setText(f"👨‍🎓 {session.profile_text}")
+        # The session's history snapshot feeds both the counters and the table
+        history = session.cached_history()
+        if history is not None:
+            self._apply_history(history)
+        else:
+            self.loader.load_db("history", session.history, self._apply_history)
+
+    def _apply_history(self, history):
+        self._apply_counts(history)
+        self.populate_table([record for record in history if record[7] in ["Returned", "Returned Late"]])  # Show only returned books
+
+    def _apply_counts(self, history):
+        counts = loan_counts(history, self.stacked_widget.session.role)
+        self.books_borrowed.layout().itemAt(1).widget().setText(str(counts["borrowed"]))
+        self.books_due.layout().itemAt(1).widget().setText(str(counts["due"]))
+        self.available_slots.layout().itemAt(1).widget().setText(str(counts["available"]))
 
     def go_back(self):
-        self.stacked_widget.setCurrentIndex(4)
-
-    def get_book_details(self, book_id):
-        db = DatabaseOperations()
-        try:
-            cursor = db.conn.cursor()
-            cursor.execute("SELECT id, category, title, author, edition, isbn, publication, status FROM books WHERE id = %s", (book_id,))
-            return cursor.fetchone()
-        finally:
-            cursor.close()
-            db.close_connection()
-
-    def calculate_days_left(self, borrow_date, return_date, return_status):
+        self.stacked_widget.navigate("student_dashboard")
+
+    def calculate_days_left(self, due_date, return_status):
         if return_status in ["Returned", "Returned Late"]:
             return "-"
-        due_date = borrow_date + timedelta(days=7)  # Assume 7-day borrowing period
-        days_left = (due_date - datetime.now()).days
-        return max(0, days_left) if days_left > 0 else "Overdue"
-
-    def filter_books(self):
-        search_text = self.search_input.text().strip().lower()
-        category = self.category_combo.currentText()
-        self.fetch_and_populate_books(search_text, category)
-
-    def fetch_and_populate_books(self, search_text="", category="All Categories"):
-        db = DatabaseOperations()
-        try:
-            user_id = self.stacked_widget.widget(2).user_data['id']
-            role = self.stacked_widget.widget(2).selected_role
-            history = db.get_borrowing_history(user_id, role)
-            filtered_books = []
-            for record in history:
-                if record[7] not in ["Returned", "Returned Late"]:  # Show only returned books
-                    continue
-                if search_text and search_text not in record[4].lower():
-                    continue
-                if category != "All Categories" and category and record[10] != category:
-                    continue
-                filtered_books.append(record)
-            self.populate_table(filtered_books)
-        finally:
-            db.close_connection()
+        if return_status == "Overdue":
+            return "Overdue"  # Set by the overdue sweeper (db/sweeper.py)
+        days_left = (due_date.date() - datetime.now().date()).days
+        return days_left if days_left >= 0 else "Overdue"
 
     def populate_table(self, books):
-        self.table.setRowCount(len(books))
-        for row, record in enumerate(books):
-            book_details = self.get_book_details(record[3])
-            if not book_details:
-                continue
-            self.table.setItem(row, 0, QTableWidgetItem(str(row + 1)))
-            self.table.setItem(row, 1, QTableWidgetItem(record[4]))
-            self.table.setItem(row, 2, QTableWidgetItem(book_details[3]))
-            self.table.setItem(row, 3, QTableWidgetItem(record[10]))
-            self.table.setItem(row, 4, QTableWidgetItem(book_details[5]))
-            borrow_date = record[5]
-            self.table.setItem(row, 5, QTableWidgetItem(borrow_date.strftime("%Y-%m-%d")))
-            self.table.setItem(row, 6, QTableWidgetItem(borrow_date.strftime("%H:%M:%S")))
-            return_date = record[6]
-            self.table.setItem(row, 7, QTableWidgetItem(return_date.strftime("%Y-%m-%d") if return_date else "Not Returned"))
-            self.table.setItem(row, 8, QTableWidgetItem(return_date.strftime("%H:%M:%S") if return_date else "Not Returned"))
-            days_left = self.calculate_days_left(record[5], record[6], record[7])
-            self.table.setItem(row, 9, QTableWidgetItem(str(days_left)))
-            for col in range(10):
-                item = self.table.item(row, col)
-                if item:
-                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.buckets = bucket_rows(books, lambda record: record[10])
+        self.apply_category(self.category_combo.currentText())
+
+    def apply_category(self, category):
+        self.model.set_rows(self.buckets.get(category or ALL_ROWS, []))
 
     def _button_style(self, color):
         return f"""
@@ -287,7 +257,7 @@ class StudentsBorrowedBook(QWidget):
 
     def _table_style(self):
         return """
-            QTableWidget {
+            QTableView {
                 background-color: white;
                 gridline-color: #E5E7EB;
                 border: 1px solid #D1D5DB;
@@ -302,12 +272,12 @@ class StudentsBorrowedBook(QWidget):
                 font-weight: bold;
                 font-size: 12pt;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px;
                 color: #374151;
                 font-size: 11pt;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: qlineargradient(x1:0, y1:0, x2:1, y2:0.5,
                     stop:0 #DBEAFE, stop:1 #BFDBFE);
                 color: #1e40af;
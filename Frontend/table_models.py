@@ -0,0 +1,219 @@
+import bisect
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+
+# Foreground colour for each borrowing status
+STATUS_COLORS = {
+    "Returned": QColor(Qt.GlobalColor.darkGreen),
+    "Active": QColor(Qt.GlobalColor.darkBlue),
+    "Overdue": QColor(Qt.GlobalColor.darkRed),
+    "Returned Late": QColor(Qt.GlobalColor.darkYellow),
+}
+
+# Role that returns the whole row tuple, whichever column is asked
+ROW_ROLE = Qt.ItemDataRole.UserRole
+
+SEARCH_DEBOUNCE_MS = 200  # Quiet time after the last keystroke before a search filter runs
+ALL_ROWS = "All Categories"  # Bucket key that holds every row
+
+
+class Column:
+    """Describes one table column.
+
+    value(row, index) returns the text to display; foreground(row) and
+    background(row) return a colour or None.
+    """
+
+    def __init__(self, header, value, foreground=None, background=None):
+        self.header = header
+        self.value = value
+        self.foreground = foreground
+        self.background = background
+
+
+class RowTableModel(QAbstractTableModel):
+    """Table model backed by a list of row tuples.
+
+    Nothing is built per cell up front: the view asks for the cells it is
+    about to paint, so refreshing costs the same for 50 rows or 50,000.
+    When has_more is set the view can ask for the next page by scrolling to
+    the bottom, which emits more_requested.
+    """
+
+    more_requested = pyqtSignal()
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._rows = []
+        self.has_more = False
+        self._fetching = False
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section].header
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        row = self._rows[index.row()]
+        if role == ROW_ROLE:
+            return row
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = column.value(row, index.row())
+            return None if value is None else str(value)
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.ForegroundRole and column.foreground:
+            return column.foreground(row)
+        if role == Qt.ItemDataRole.BackgroundRole and column.background:
+            return column.background(row)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetching = True
+            self.more_requested.emit()
+
+    # --- Row access ---
+    def set_rows(self, rows, has_more=False):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.has_more = has_more
+        self._fetching = False
+        self.endResetModel()
+
+    def append_rows(self, rows, has_more=False):
+        rows = list(rows)
+        if rows:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+        self.has_more = has_more
+        self._fetching = False
+
+    def fetch_failed(self):
+        """The requested page did not arrive; let the next scroll ask again."""
+        self._fetching = False
+
+    def patch_rows(self, changed, key=lambda row: row[0], accept=lambda row: True):
+        """Apply changed rows in place. Rows must be sorted by key.
+
+        A changed row replaces the loaded row with the same key, or removes it if
+        accept(row) is False. Unknown rows that are accepted are inserted in key
+        order, unless they lie beyond the pages loaded so far.
+        """
+        changed = list({key(row): row for row in changed}.values())  # Last version of each row wins
+        if not changed:
+            return
+        keys = [key(row) for row in self._rows]
+        positions = {k: i for i, k in enumerate(keys)}
+        removed = []
+        for row in changed:
+            i = positions.get(key(row))
+            if i is not None:
+                if accept(row):
+                    self._rows[i] = row
+                    self.dataChanged.emit(self.index(i, 0), self.index(i, len(self.columns) - 1))
+                else:
+                    removed.append(i)
+        for i in sorted(removed, reverse=True):
+            self.beginRemoveRows(QModelIndex(), i, i)
+            del self._rows[i]
+            del keys[i]
+            self.endRemoveRows()
+        for row in sorted((row for row in changed if key(row) not in positions and accept(row)), key=key):
+            k = key(row)
+            if self.has_more and (not keys or k > keys[-1]):
+                continue  # Will arrive with a later page
+            i = bisect.bisect_left(keys, k)
+            self.beginInsertRows(QModelIndex(), i, i)
+            self._rows.insert(i, row)
+            keys.insert(i, k)
+            self.endInsertRows()
+
+    def remove(self, value, key=lambda row: row[0]):
+        """Drop the loaded row whose key equals value, if there is one."""
+        for i, row in enumerate(self._rows):
+            if key(row) == value:
+                self.beginRemoveRows(QModelIndex(), i, i)
+                del self._rows[i]
+                self.endRemoveRows()
+                return
+
+    def find(self, value, key=lambda row: row[0]):
+        """The loaded row whose key equals value, or None."""
+        return next((row for row in self._rows if key(row) == value), None)
+
+    def row_at(self, row):
+        return self._rows[row]
+
+    def rows(self):
+        return self._rows
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """Filters a RowTableModel by a search string without touching the database.
+
+    search_text(row) returns the text a row is matched against. Searches are
+    debounced, so typing a word filters once rather than once per keystroke.
+    If number_column is set, that column shows the visible row number instead
+    of the source row number.
+    """
+
+    def __init__(self, search_text, parent=None, number_column=None, delay=SEARCH_DEBOUNCE_MS):
+        super().__init__(parent)
+        self.search_text = search_text
+        self.number_column = number_column
+        self._search = ""
+        self._pending = ""
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._apply_search)
+
+    def set_search(self, text, immediate=False):
+        self._pending = text.strip().lower()
+        if immediate:
+            self._timer.stop()
+            self._apply_search()
+        else:
+            self._timer.start()
+
+    def _apply_search(self):
+        if self._pending != self._search:
+            self._search = self._pending
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._search:
+            return True
+        row = self.sourceModel().row_at(source_row)
+        return self._search in (self.search_text(row) or "").lower()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.column() == self.number_column and role == Qt.ItemDataRole.DisplayRole:
+            return str(index.row() + 1)
+        return super().data(index, role)
+
+
+def bucket_rows(rows, key):
+    """Group rows by key(row), plus an ALL_ROWS bucket holding every row in order."""
+    buckets = {ALL_ROWS: list(rows)}
+    for row in buckets[ALL_ROWS]:
+        buckets.setdefault(key(row), []).append(row)
+    return buckets
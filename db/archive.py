@@ -0,0 +1,157 @@
+# db/archive.py
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+from db.db_operations import DatabaseOperations
+from db.engines import DB_ERRORS
+
+# Archiver settings (can be overridden with environment variables)
+ARCHIVE_AFTER_DAYS = int(os.environ.get("INFOCHAN_ARCHIVE_AFTER_DAYS", 365))   # Age of a returned loan before it moves
+ARCHIVE_BATCH = int(os.environ.get("INFOCHAN_ARCHIVE_BATCH", 1000))            # Loans moved per transaction
+
+ARCHIVE_COLUMNS = ("id, user_id, user_type, book_id, date_borrowed, due_date, date_returned, "
+                   "return_status, `condition`, fine")
+
+
+class HistoryArchiver:
+    """Moves returned loans out of borrowing_history into borrowing_history_archive.
+
+    Loans 'Returned' or 'Returned Late' more than after_days ago are moved in
+    batches of batch_size, each one transaction: the batch is picked (and
+    locked) through idx_history_status_returned, copied into the archive and
+    deleted from borrowing_history. Active and overdue loans never move, so the
+    circulation counters are unaffected.
+    """
+
+    def __init__(self, db, after_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH):
+        self.db = db
+        self.after_days = after_days
+        self.batch_size = batch_size
+
+    def archive(self, now=None):
+        """Move every loan past the cutoff. Returns {"archived", "seconds"}, or None if a batch failed."""
+        now = now or datetime.now()
+        cutoff = datetime.combine(now.date() - timedelta(days=self.after_days), datetime.min.time())
+        start = time.perf_counter()
+        result = {"archived": 0, "seconds": 0.0}
+        try:
+            while True:
+                moved = self._archive_batch(cutoff, now)
+                result["archived"] += moved
+                if moved < self.batch_size:
+                    break
+        except DB_ERRORS as e:
+            print(f"Database error during history archival: {e}")
+            self.db.conn.rollback()
+            return None
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def _archive_batch(self, cutoff, now):
+        cursor = self.db.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT id FROM borrowing_history WHERE return_status IN ('Returned', 'Returned Late') "
+                "AND date_returned < %s ORDER BY date_returned LIMIT %s FOR UPDATE",
+                (cutoff, self.batch_size)
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                self.db.conn.rollback()
+                return 0
+            in_ids = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"INSERT INTO borrowing_history_archive ({ARCHIVE_COLUMNS}, archived_at) "
+                f"SELECT {ARCHIVE_COLUMNS}, %s FROM borrowing_history WHERE id IN ({in_ids})",
+                (now, *ids)
+            )
+            cursor.execute(f"DELETE FROM borrowing_history WHERE id IN ({in_ids})", ids)
+            self.db.conn.commit()
+            return len(ids)
+        finally:
+            cursor.close()
+
+
+def partition_archive_by_year(db, through_year=None):
+    """Range-partition the MySQL archive by year of borrowing, up to through_year (default: next year).
+
+    The first call partitions the table from its oldest year; later calls split
+    new years off the catch-all partition. Returns the years added, or None if
+    the engine cannot partition.
+    """
+    if db.engine.name != "mysql":
+        print(f"Partitioning is not supported on the {db.engine.name} engine.")
+        return None
+    through_year = through_year or datetime.now().year + 1
+    cursor = db.conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'borrowing_history_archive' "
+            "AND PARTITION_NAME IS NOT NULL"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        last_year = max((int(name[1:]) for name in existing if name != "pmax"), default=None)
+        if last_year is not None:
+            first_year = last_year + 1
+        else:
+            # Not partitioned yet (or only into pmax): start from the oldest archived year
+            cursor.execute("SELECT MIN(YEAR(date_borrowed)) FROM borrowing_history_archive")
+            first_year = cursor.fetchone()[0] or datetime.now().year
+        years = list(range(first_year, through_year + 1))
+        if not years:
+            return []  # Never partition the table into pmax alone
+        partitions = [f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in years]
+        partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        if existing:
+            cursor.execute(f"ALTER TABLE borrowing_history_archive REORGANIZE PARTITION pmax "
+                           f"INTO ({', '.join(partitions)})")
+        else:
+            cursor.execute(f"ALTER TABLE borrowing_history_archive "
+                           f"PARTITION BY RANGE (YEAR(date_borrowed)) ({', '.join(partitions)})")
+        return years
+    except DB_ERRORS as e:
+        print(f"Database error during partitioning: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def archive_once(after_days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH):
+    db = DatabaseOperations()
+    try:
+        return HistoryArchiver(db, after_days, batch_size).archive()
+    finally:
+        db.close_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old returned loans into borrowing_history_archive.")
+    parser.add_argument("--after-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH)
+    parser.add_argument("--partition", action="store_true",
+                        help="(MySQL) range-partition the archive by year, adding partitions through next year")
+    args = parser.parse_args()
+
+    if args.partition:
+        db = DatabaseOperations()
+        try:
+            years = partition_archive_by_year(db)
+        finally:
+            db.close_connection()
+        if years is None:
+            raise SystemExit(1)
+        print(f"Added partitions for {', '.join(map(str, years))}." if years else "Partitions are up to date.")
+
+    result = archive_once(args.after_days, args.batch_size)
+    if result is None:
+        print("Archival failed.")
+        raise SystemExit(1)
+    rate = result["archived"] / result["seconds"] if result["seconds"] else 0
+    print(f"Archived {result['archived']} loans in {result['seconds']:.2f}s ({rate:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# db/cache.py
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Cache settings (can be overridden with environment variables)
+CATALOG_CACHE_ENTRIES = int(os.environ.get("INFOCHAN_CATALOG_CACHE_ENTRIES", 256))
+CATALOG_CACHE_BYTES = int(os.environ.get("INFOCHAN_CATALOG_CACHE_BYTES", 32 * 1024 * 1024))
+CATALOG_CACHE_TTL = float(os.environ.get("INFOCHAN_CATALOG_CACHE_TTL", 60))  # seconds; bounds staleness from other kiosks
+
+
+def estimate_size(value):
+    """Rough size in bytes of a query result (nested lists/tuples of scalars)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class CatalogCache:
+    """Read-through cache for catalog queries, keyed by query shape.
+
+    Entries are evicted least recently used first, when either the entry count or
+    the estimated memory goes over its limit. Every write to the catalog bumps a
+    global version, which makes all older entries misses. Writes from other
+    processes are not seen, so entries also expire after ttl seconds.
+    """
+
+    def __init__(self, max_entries=CATALOG_CACHE_ENTRIES, max_bytes=CATALOG_CACHE_BYTES, ttl=CATALOG_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (version, stored_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, load):
+        """Return the cached value for key, or call load() and cache what it returns.
+
+        Exceptions from load() propagate and nothing is cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == self.version and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+            version = self.version
+
+        value = load()
+
+        with self._lock:
+            # A write that landed while we were loading means this result may be stale
+            if version == self.version:
+                self._store(key, version, value)
+        return value
+
+    def bump_version(self):
+        """Invalidate every cached entry (called after each catalog write)."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def clear(self):
+        self.bump_version()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "version": self.version,
+            }
+
+    def _store(self, key, version, value):
+        # Caller holds the lock
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return  # Would evict everything else; not worth caching
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= old[2]
+        self._entries[key] = (version, time.monotonic(), size, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted[2]
+            self.evictions += 1
+
+
+catalog_cache = CatalogCache()
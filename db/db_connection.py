@@ -1,15 +1,230 @@
 # db/db_connection.py
-import pymysql
+import os
+import threading
+import time
+
+from db.engines import DB_ERRORS, MySQLEngine, SQLiteEngine
+
+DB_CONFIG = {
+    "host": "localhost",      # XAMPP default host
+    "user": "root",           # Default MySQL user in XAMPP
+    "password": "",           # Default empty password in XAMPP
+    "database": "library_db"  # Your database name
+}
+
+# Storage engine: "mysql" (shared server) or "sqlite" (embedded file, for small branches)
+DB_ENGINE = os.environ.get("INFOCHAN_DB_ENGINE", "mysql")
+SQLITE_PATH = os.environ.get(
+    "INFOCHAN_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "library_db.sqlite3")
+)
+
+# Pool settings (can be overridden with environment variables)
+POOL_SIZE = int(os.environ.get("INFOCHAN_POOL_SIZE", 5))
+POOL_IDLE_TIMEOUT = float(os.environ.get("INFOCHAN_POOL_IDLE_TIMEOUT", 300))  # seconds before an idle connection is closed
+POOL_PING_AFTER = float(os.environ.get("INFOCHAN_POOL_PING_AFTER", 30))       # seconds idle before checking the socket is still alive
+POOL_ACQUIRE_TIMEOUT = float(os.environ.get("INFOCHAN_POOL_ACQUIRE_TIMEOUT", 10))
+
+
+class DatabaseUnavailable(Exception):
+    """No connection could be opened (server down or network gone)."""
+
+
+class PoolExhausted(Exception):
+    """Every pooled connection stayed checked out; the database itself may be fine."""
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _build_engine(DB_ENGINE)
+        return _engine
+
+
+def _build_engine(name, **options):
+    if name == "mysql":
+        return MySQLEngine({**DB_CONFIG, **options})
+    if name == "sqlite":
+        return SQLiteEngine(options.pop("path", SQLITE_PATH), **options)
+    raise ValueError(f"Unknown database engine: {name}")
+
+
+def configure_engine(name, **options):
+    """Switch the storage engine (e.g. configure_engine("sqlite", path=...)).
+
+    Pooled connections of the previous engine are closed. Call this before the
+    app starts using the database.
+    """
+    global _engine
+    engine = _build_engine(name, **options)
+    with _engine_lock:
+        _engine = engine
+    get_pool().close_all()
+    return engine
+
 
 def create_connection():
+    engine = get_engine()
     try:
-        conn = pymysql.connect(
-            host='localhost',     # XAMPP default host
-            user='root',          # Default MySQL user in XAMPP
-            password='',          # Default empty password in XAMPP
-            database='library_db' # Your database name
-        )
-        return conn
-    except pymysql.Error as e:
-        print(f"Error connecting to MySQL: {e}")
-        return None
\ No newline at end of file
+        return engine.connect()
+    except DB_ERRORS as e:
+        print(f"Error connecting to {engine.name}: {e}")
+        return None
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections shared by the whole process."""
+
+    def __init__(self, size=POOL_SIZE, idle_timeout=POOL_IDLE_TIMEOUT, ping_after=POOL_PING_AFTER):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.ping_after = ping_after
+        self._idle = []  # list of (conn, last_used) - most recently used at the end
+        self._in_use = 0
+        self._checked_out = {}  # conn -> generation it was checked out under
+        self._generation = 0    # Bumped by close_all(), e.g. when the engine changes
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=POOL_ACQUIRE_TIMEOUT):
+        """Check out a live connection, or return None if one cannot be opened.
+
+        Raises PoolExhausted if every connection stays checked out for timeout seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    self._evict_idle()
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._in_use < self.size:
+                        conn, last_used = None, None
+                        self._in_use += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhausted(f"All {self.size} pooled connections are in use")
+                    self._cond.wait(remaining)
+                generation = self._generation
+
+            # Socket work happens outside the lock so other threads are not blocked
+            if conn is not None and time.monotonic() - last_used >= self.ping_after:
+                conn = self._revive(conn)
+            if conn is None:
+                conn = create_connection()
+            with self._cond:
+                if conn is not None and generation == self._generation:
+                    self._checked_out[conn] = generation
+                    return conn
+                self._in_use -= 1
+                self._cond.notify()
+            if conn is None:
+                return None
+            self._discard(conn)  # Opened for the engine that close_all() just replaced; try again
+
+    def release(self, conn):
+        """Return a connection to the pool; one from before the last close_all() is closed instead."""
+        with self._cond:
+            stale = self._checked_out.pop(conn, None) != self._generation
+        if stale:
+            self._discard(conn)
+            conn = None
+        else:
+            try:
+                # End any open transaction so the next user does not see a stale snapshot
+                conn.rollback()
+            except DB_ERRORS:
+                self._discard(conn)
+                conn = None
+        with self._cond:
+            self._in_use -= 1
+            if conn is not None:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def prewarm(self, count=None):
+        """Open connections ahead of time so the first pages do not pay the handshake."""
+        count = self.size if count is None else min(count, self.size)
+        conns = []
+        for _ in range(count):
+            try:
+                conn = self.acquire()
+            except PoolExhausted:
+                break
+            if conn is None:
+                break
+            conns.append(conn)
+        for conn in conns:
+            self.release(conn)
+
+    def close_all(self):
+        """Close the idle connections; those checked out now are closed when they are released."""
+        with self._cond:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def _revive(self, conn):
+        try:
+            conn.ping(reconnect=True)
+            return conn
+        except DB_ERRORS:
+            self._discard(conn)
+            return None
+
+    def _evict_idle(self):
+        # Caller holds the lock
+        now = time.monotonic()
+        keep = []
+        for conn, last_used in self._idle:
+            if now - last_used > self.idle_timeout:
+                self._discard(conn)
+            else:
+                keep.append((conn, last_used))
+        self._idle = keep
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+def configure_pool(size=None, idle_timeout=None, ping_after=None):
+    """Change the pool settings. Call this before the first connection is used."""
+    pool = get_pool()
+    if size is not None:
+        pool.size = size
+    if idle_timeout is not None:
+        pool.idle_timeout = idle_timeout
+    if ping_after is not None:
+        pool.ping_after = ping_after
+    return pool
+
+
+def prewarm_pool(count=None):
+    """Fill the pool in a background thread (used at app start)."""
+    thread = threading.Thread(target=get_pool().prewarm, args=(count,), daemon=True)
+    thread.start()
+    return thread
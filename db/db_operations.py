@@ -1,23 +1,72 @@
-import pymysql
-import bcrypt
-from datetime import datetime
-from db.db_connection import create_connection
+import random
+import time
+
+from decimal import Decimal
+from datetime import datetime, timedelta
+from db.cache import catalog_cache
+from db.db_connection import DatabaseUnavailable, get_engine, get_pool
+from db.engines import DB_ERRORS
+from db.events import BookAdded, BookBorrowed, BookReturned, BookUpdated, UserRegistered, publish
+from db.hashing import hash_password, needs_rehash, verify_password
+from db.policy import days_late, policy_for
+
+PAGE_SIZE = 100            # Rows per page for the paginated queries
+FETCH_ALL_PAGE_SIZE = 5000  # Page size used when a caller wants every row
+
+CHANGES_LIMIT = 500         # Changed rows per table returned by one get_changes_since call
+CHANGES_OVERLAP = 2         # Seconds re-read on every poll, for transactions that commit late
+
+DUE_SOON_DAYS = 2           # Days ahead get_loans_due_soon looks by default
+
+BORROW_RETRIES = 5          # Attempts before a deadlocked borrow gives up
+BORROW_BACKOFF = 0.02       # Seconds; doubled on every retry, plus jitter
+
+BOOK_COLUMNS = "id, category, title, author, edition, isbn, publication, status"
+HISTORY_COLUMNS = """bh.id, bh.user_id, bh.user_type, bh.book_id, b.title, bh.date_borrowed,
+                     bh.date_returned, bh.return_status, bh.`condition`, bh.fine, b.category"""
+HISTORY_DETAIL_COLUMNS = "b.author, b.isbn, b.edition, bh.due_date"  # Appended as columns 11-14 when asked for
+
+
+# Live dashboard counters, kept in step by the write operations below.
+# Each row is (counter, scope, value); scope is '' for totals, a book
+# category for per-category loans, or a role for user counts.
+COUNTERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS circulation_counters (
+        counter VARCHAR(32) NOT NULL,
+        scope VARCHAR(64) NOT NULL DEFAULT '',
+        value INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (counter, scope)
+    )
+"""
+
+
+def _split_page(rows, page_size, key):
+    """Trim the look-ahead row and build the continuation token for the next page."""
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, key(rows[-1])
+    return rows, None
+
 
 class DatabaseOperations:
     def __init__(self):
-        self.conn = create_connection()
+        # Borrow a connection from the shared pool instead of opening a new one
+        self.engine = get_engine()
+        self.conn = get_pool().acquire()
         if self.conn is None:
-            raise Exception("Failed to connect to database")
+            raise DatabaseUnavailable("Failed to connect to database")
 
     def close_connection(self):
+        """Give the connection back to the pool."""
         if self.conn:
-            self.conn.close()
+            get_pool().release(self.conn)
+            self.conn = None
 
     # --- User Operations ---
     def register_user(self, role, full_name, id_number, password, strand=None, grade_level=None):
         cursor = self.conn.cursor()
         try:
-            hashed_pw = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            hashed_pw = hash_password(password)
             if role == "Student":
                 query = """
                     INSERT INTO students (full_name, strand, grade_level, id_number, password)
@@ -36,32 +85,56 @@ class DatabaseOperations:
                     VALUES (%s, %s, %s)
                 """
                 cursor.execute(query, (full_name, id_number, hashed_pw))
+            self._bump_counter(cursor, "users", role, 1)
             self.conn.commit()
+            publish(UserRegistered(role, id_number))
             return True
-        except pymysql.Error as e:
+        except DB_ERRORS as e:
             print(f"Database error during registration: {e}")
+            self.conn.rollback()
             return False
         finally:
             cursor.close()
 
     def login_user(self, role, id_number, password):
+        """Check a login. Returns the user's profile dict, or None.
+
+        Students also get grade_level and strand, so pages need not query them again.
+        """
         cursor = self.conn.cursor()
         try:
             table = {"Student": "students", "Instructor": "instructors", "Admin": "admins"}[role]
-            query = f"SELECT password, full_name, id FROM {table} WHERE id_number = %s"
+            extra = ", grade_level, strand" if role == "Student" else ""
+            query = f"SELECT password, full_name, id{extra} FROM {table} WHERE id_number = %s"
             cursor.execute(query, (id_number,))
             result = cursor.fetchone()
-            if result:
-                stored_hash = result[0].encode('utf-8')
-                if bcrypt.checkpw(password.encode('utf-8'), stored_hash):
-                    return {"id": result[2], "full_name": result[1]}
+            if result and verify_password(password, result[0]):
+                if needs_rehash(result[0]):
+                    self._rehash_password(table, result[2], password)
+                user = {"id": result[2], "full_name": result[1]}
+                if role == "Student":
+                    user["grade_level"], user["strand"] = result[3], result[4]
+                return user
             return None
-        except pymysql.Error as e:
+        except DB_ERRORS as e:
             print(f"Database error during login: {e}")
             return None
         finally:
             cursor.close()
 
+    def _rehash_password(self, table, user_id, password):
+        """Store the password again with the configured bcrypt work factor."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"UPDATE {table} SET password = %s WHERE id = %s", (hash_password(password), user_id))
+            self.conn.commit()
+        except DB_ERRORS as e:
+            # The login itself still succeeds; the hash is upgraded on a later login
+            print(f"Database error during password rehash: {e}")
+            self.conn.rollback()
+        finally:
+            cursor.close()
+
     # --- Book Operations ---
     def add_book(self, category, title, edition, publication, author, isbn, reason_pdf_path=None):
         cursor = self.conn.cursor()
@@ -71,156 +144,648 @@ class DatabaseOperations:
                 VALUES (%s, %s, %s, %s, %s, %s, %s, 'Available')
             """
             cursor.execute(query, (category, title, edition, publication, author, isbn, reason_pdf_path))
+            book_id = cursor.lastrowid
+            self._bump_counter(cursor, "books", "", 1)
             self.conn.commit()
+            catalog_cache.bump_version()
+            publish(BookAdded((book_id, category, title, author, edition, isbn, publication, "Available")))
             return True
-        except pymysql.Error as e:
+        except DB_ERRORS as e:
             print(f"Database error during book addition: {e}")
+            self.conn.rollback()
             return False
         finally:
             cursor.close()
 
-    def get_all_books(self):
-        cursor = self.conn.cursor()
+    def get_books_page(self, after_id=None, page_size=PAGE_SIZE, category=None, status=None):
+        """Fetch one page of books ordered by id.
+
+        Returns (rows, next_token). Pass next_token back as after_id to get the
+        following page; it is None when there are no more rows. Pages are served
+        from the catalog cache until the catalog changes.
+        """
+        key = ("books_page", after_id, page_size, category, status)
         try:
-            query = "SELECT id, category, title, author, edition, isbn, publication, status FROM books"
-            cursor.execute(query)
-            return cursor.fetchall()
-        except pymysql.Error as e:
+            return catalog_cache.get_or_load(
+                key, lambda: self._query_books_page(after_id, page_size, category, status))
+        except DB_ERRORS as e:
             print(f"Database error during fetching books: {e}")
-            return []
-        finally:
-            cursor.close()
+            return [], None
 
-    def search_books_by_category(self, category):
+    def _query_books_page(self, after_id, page_size, category, status):
         cursor = self.conn.cursor()
         try:
-            query = "SELECT id, category, title, author, edition, isbn, publication, status FROM books WHERE category = %s"
-            cursor.execute(query, (category,))
-            return cursor.fetchall()
-        except pymysql.Error as e:
-            print(f"Database error during book search: {e}")
-            return []
+            conditions, params = [], []
+            if after_id is not None:
+                conditions.append("id > %s")
+                params.append(after_id)
+            if category:
+                conditions.append("category = %s")
+                params.append(category)
+            if status:
+                conditions.append("status = %s")
+                params.append(status)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            query = f"SELECT {BOOK_COLUMNS} FROM books {where} ORDER BY id LIMIT %s"
+            cursor.execute(query, (*params, page_size + 1))
+            rows, token = _split_page(list(cursor.fetchall()), page_size, lambda row: row[0])
+            return tuple(rows), token  # Cached, so keep it immutable
         finally:
             cursor.close()
 
+    def get_available_books(self):
+        """Books that can be borrowed right now: (id, title, author, category, isbn) rows."""
+        def load():
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute("SELECT id, title, author, category, isbn FROM books WHERE status = 'Available' ORDER BY id")
+                return tuple(cursor.fetchall())
+            finally:
+                cursor.close()
+        try:
+            return catalog_cache.get_or_load(("available_books",), load)
+        except DB_ERRORS as e:
+            print(f"Database error during fetching available books: {e}")
+            return ()
+
+    def get_all_books(self):
+        return self._fetch_all_pages(self.get_books_page)
+
+    def search_books_by_category(self, category):
+        return self._fetch_all_pages(self.get_books_page, category=category)
+
     def update_book(self, book_id, category, title, edition, publication, author, isbn, reason_pdf_path=None):
         cursor = self.conn.cursor()
         try:
+            # Lock the book so a borrow or return cannot run between reading its category and moving the counters
+            cursor.execute("SELECT category FROM books WHERE id = %s FOR UPDATE", (book_id,))
+            row = cursor.fetchone()
             query = """
                 UPDATE books
                 SET category = %s, title = %s, edition = %s, publication = %s, author = %s, isbn = %s, reason_pdf_path = %s
                 WHERE id = %s
             """
             cursor.execute(query, (category, title, edition, publication, author, isbn, reason_pdf_path, book_id))
+            updated = cursor.rowcount > 0
+            if row and row[0] != category:
+                # An open loan is taken off the book's category when it comes back, so move it along
+                cursor.execute(
+                    "SELECT COUNT(*) FROM borrowing_history WHERE book_id = %s AND return_status IN ('Active', 'Overdue')",
+                    (book_id,)
+                )
+                on_loan = cursor.fetchone()[0]
+                if on_loan:
+                    self._bump_counter(cursor, "active_loans", row[0], -on_loan)
+                    self._bump_counter(cursor, "active_loans", category, on_loan)
             self.conn.commit()
-            return cursor.rowcount > 0
-        except pymysql.Error as e:
+            catalog_cache.bump_version()
+            if updated:
+                publish(BookUpdated(book_id, category, title, edition, publication, author, isbn))
+            return updated
+        except DB_ERRORS as e:
             print(f"Database error during book update: {e}")
+            self.conn.rollback()
             return False
         finally:
             cursor.close()
 
     # --- Borrowing Operations ---
     def borrow_book(self, user_id, user_type, book_id, borrow_date):
-        cursor = self.conn.cursor()
-        try:
-            # Check borrowing limit
-            cursor.execute(
-                "SELECT COUNT(*) FROM borrowing_history WHERE user_id = %s AND user_type = %s AND return_status IN ('Active', 'Overdue')",
-                (user_id, user_type)
-            )
-            active_books = cursor.fetchone()[0]
-            if active_books >= 5:
-                return False, "Cannot borrow more than 5 books at a time"
-
-            # Check book availability
-            cursor.execute("SELECT status FROM books WHERE id = %s", (book_id,))
-            result = cursor.fetchone()
-            if not result or result[0] != "Available":
-                return False, "Book is not available"
+        """Borrow a book for a user.
 
-            # Update book status
-            cursor.execute("UPDATE books SET status = 'Borrowed' WHERE id = %s", (book_id,))
+        The availability check, the borrowing limit and the status change are one
+        conditional UPDATE, so two kiosks racing for the same copy cannot both
+        win: the loser's UPDATE matches no row. Deadlocks and lock wait timeouts
+        are retried with exponential backoff.
+        """
+        for attempt in range(BORROW_RETRIES):
+            try:
+                return self._try_borrow(user_id, user_type, book_id, borrow_date)
+            except DB_ERRORS as e:
+                self.conn.rollback()
+                if self.engine.is_retryable(e) and attempt < BORROW_RETRIES - 1:
+                    time.sleep(BORROW_BACKOFF * (2 ** attempt) * (1 + random.random()))
+                    continue
+                print(f"Database error during borrowing: {e}")
+                return False, str(e)
 
-            # Record borrowing
-            cursor.execute(
-                "INSERT INTO borrowing_history (user_id, user_type, book_id, date_borrowed, return_status) "
-                "VALUES (%s, %s, %s, %s, 'Active')",
-                (user_id, user_type, book_id, borrow_date)
-            )
+    def _try_borrow(self, user_id, user_type, book_id, borrow_date):
+        cursor = self.conn.cursor()
+        try:
+            record_id, refusal = self._apply_borrow(cursor, user_id, user_type, book_id, borrow_date)
+            if record_id is None:
+                self.conn.rollback()
+                return False, refusal
             self.conn.commit()
+            catalog_cache.bump_version()
+            publish(BookBorrowed(record_id, book_id, user_id, user_type, borrow_date))
             return True, "Book borrowed successfully"
-        except pymysql.Error as e:
-            print(f"Database error during borrowing: {e}")
-            self.conn.rollback()
-            return False, str(e)
         finally:
             cursor.close()
 
+    def _apply_borrow(self, cursor, user_id, user_type, book_id, borrow_date):
+        """Run the borrow statements inside the caller's transaction.
+
+        The loan period and the borrowing limit come from the loan policy of the
+        user's role and the book's category (db/policy.py). Returns
+        (record_id, None), or (None, reason) if the borrow was refused.
+        """
+        cursor.execute("SELECT category FROM books WHERE id = %s", (book_id,))
+        book = cursor.fetchone()
+        if not book:
+            return None, "Book is not available"
+        policy = policy_for(user_type, book[0])
+        cursor.execute(
+            """
+            UPDATE books SET status = 'Borrowed'
+            WHERE id = %s AND status = 'Available'
+              AND (SELECT COUNT(*) FROM borrowing_history
+                   WHERE user_id = %s AND user_type = %s AND return_status IN ('Active', 'Overdue')) < %s
+            """,
+            (book_id, user_id, user_type, policy.max_loans)
+        )
+        if cursor.rowcount != 1:
+            return None, self._borrow_refusal(cursor, user_id, user_type, policy.max_loans)
+
+        # Record borrowing
+        cursor.execute(
+            "INSERT INTO borrowing_history (user_id, user_type, book_id, date_borrowed, due_date, return_status) "
+            "VALUES (%s, %s, %s, %s, %s, 'Active')",
+            (user_id, user_type, book_id, borrow_date, policy.due_date(borrow_date))
+        )
+        record_id = cursor.lastrowid
+        self._bump_loan_counters(cursor, book_id, 1)
+        return record_id, None
+
+    @staticmethod
+    def _borrow_refusal(cursor, user_id, user_type, max_loans):
+        """Work out why a borrow matched no row (only runs on the failure path)."""
+        cursor.execute(
+            "SELECT COUNT(*) FROM borrowing_history WHERE user_id = %s AND user_type = %s AND return_status IN ('Active', 'Overdue')",
+            (user_id, user_type)
+        )
+        if cursor.fetchone()[0] >= max_loans:
+            return f"Cannot borrow more than {max_loans} books at a time"
+        return "Book is not available"
+
     def return_book(self, record_id, book_id):
         cursor = self.conn.cursor()
         try:
-            cursor.execute(
-                "UPDATE borrowing_history SET return_status = 'Returned', date_returned = %s WHERE id = %s",
-                (datetime.now(), record_id)
-            )
-            cursor.execute("UPDATE books SET status = 'Available' WHERE id = %s", (book_id,))
+            event, refusal = self._apply_return(cursor, record_id, book_id, datetime.now())
+            if refusal:
+                self.conn.rollback()
+                return False, refusal
             self.conn.commit()
+            catalog_cache.bump_version()
+            if event:
+                publish(event)
             return True, "Book returned successfully"
-        except pymysql.Error as e:
+        except DB_ERRORS as e:
             print(f"Database error during return: {e}")
             self.conn.rollback()
             return False, str(e)
         finally:
             cursor.close()
 
-    def get_borrowing_history(self, user_id=None, user_type=None):
+    def _apply_return(self, cursor, record_id, book_id, returned_at):
+        """Run the return statements inside the caller's transaction.
+
+        A book handed back after its due date is settled as 'Returned Late'
+        with the fine from the loan policy, otherwise as 'Returned' with no
+        fine. Returns (event, None) where event is the BookReturned to publish
+        after the commit; a loan that is missing or already returned is left
+        alone and gives (None, reason).
+        """
+        # Lock the loan so a double return only settles it once
+        cursor.execute(
+            "SELECT bh.return_status, b.category, bh.user_id, bh.user_type, "
+            "b.title, b.author, b.edition, b.isbn, b.publication, bh.due_date "
+            "FROM borrowing_history bh JOIN books b ON bh.book_id = b.id WHERE bh.id = %s FOR UPDATE",
+            (record_id,)
+        )
+        loan = cursor.fetchone()
+        if not (loan and loan[0] in ("Active", "Overdue")):
+            return None, "Loan was already returned" if loan else "Loan does not exist"
+        status, category, user_id, user_type, title, author, edition, isbn, publication, due_date = loan
+        if days_late(due_date, returned_at):
+            return_status, fine = "Returned Late", policy_for(user_type, category).fine(due_date, returned_at)
+        else:
+            return_status, fine = "Returned", Decimal("0.00")
+        cursor.execute(
+            "UPDATE borrowing_history SET return_status = %s, date_returned = %s, fine = %s WHERE id = %s",
+            (return_status, returned_at, fine, record_id)
+        )
+        cursor.execute("UPDATE books SET status = 'Available' WHERE id = %s", (book_id,))
+        self._bump_counter(cursor, "active_loans", "", -1)
+        self._bump_counter(cursor, "active_loans", category, -1)
+        if status == "Overdue":
+            self._bump_counter(cursor, "overdue", "", -1)
+        book = (book_id, category, title, author, edition, isbn, publication, "Available")
+        return BookReturned(record_id, user_id, user_type, status, returned_at, book, return_status, fine), None
+
+    # --- Offline Replay ---
+    def replay_offline(self, source, entries):
+        """Apply a batch of offline journal entries (see db/offline.py) in one transaction.
+
+        Entries at or below the source's last replayed seq are skipped and the
+        new last seq is stored in the same transaction, so a batch replayed again
+        after a crash is applied only once. A borrow that is no longer possible
+        or a return of a loan that is already closed is a conflict: it is left
+        out and reported. Returns a list of (seq, applied, conflict reason), or
+        None if the batch was rolled back.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT last_seq FROM offline_replay WHERE source = %s FOR UPDATE", (source,))
+            row = cursor.fetchone()
+            last_seq = row[0] if row else 0
+            outcomes, events = [], []
+            for entry in entries:
+                if entry["seq"] <= last_seq:
+                    continue
+                at = datetime.fromisoformat(entry["at"])
+                user_id, user_type, book_id = entry["user_id"], entry["user_type"], entry["book_id"]
+                if entry["op"] == "borrow":
+                    record_id, conflict = self._apply_borrow(cursor, user_id, user_type, book_id, at)
+                    if record_id is not None:
+                        events.append(BookBorrowed(record_id, book_id, user_id, user_type, at))
+                else:
+                    record_id = entry.get("record_id")
+                    if record_id is None:
+                        # Borrowed offline too, so the record id is only known now
+                        cursor.execute(
+                            "SELECT id FROM borrowing_history WHERE user_id = %s AND user_type = %s AND book_id = %s "
+                            "AND return_status IN ('Active', 'Overdue') ORDER BY id DESC LIMIT 1",
+                            (user_id, user_type, book_id)
+                        )
+                        found = cursor.fetchone()
+                        record_id = found[0] if found else None
+                    event, conflict = None, "Loan does not exist"
+                    if record_id is not None:
+                        event, conflict = self._apply_return(cursor, record_id, book_id, at)
+                    if event:
+                        events.append(event)
+                outcomes.append((entry["seq"], conflict is None, conflict))
+                last_seq = entry["seq"]
+
+            if row:
+                cursor.execute("UPDATE offline_replay SET last_seq = %s, replayed_at = %s WHERE source = %s",
+                               (last_seq, datetime.now(), source))
+            else:
+                cursor.execute("INSERT INTO offline_replay (source, last_seq, replayed_at) VALUES (%s, %s, %s)",
+                               (source, last_seq, datetime.now()))
+            self.conn.commit()
+            catalog_cache.bump_version()
+            for event in events:
+                publish(event)
+            return outcomes
+        except DB_ERRORS as e:
+            print(f"Database error during offline replay: {e}")
+            self.conn.rollback()
+            return None
+        finally:
+            cursor.close()
+
+    def get_borrowing_history_page(self, after_id=None, page_size=PAGE_SIZE, user_id=None, user_type=None,
+                                   return_status=None, with_book_details=False, include_archive=False):
+        """Fetch one page of borrowing history ordered by record id.
+
+        Returns (rows, next_token) like get_books_page. return_status may be a
+        single status or a list of them. With with_book_details each row also
+        carries the book's author, isbn, edition and the loan's due date
+        (columns 11-14). Loans moved to borrowing_history_archive (db/archive.py)
+        are only read with include_archive.
+        """
         cursor = self.conn.cursor()
         try:
+            conditions, params = [], []
+            if after_id is not None:
+                conditions.append("bh.id > %s")
+                params.append(after_id)
             if user_id and user_type:
-                query = """
-                    SELECT bh.id, bh.user_id, bh.user_type, bh.book_id, b.title, bh.date_borrowed, 
-                           bh.date_returned, bh.return_status, bh.`condition`, bh.fine, b.category
-                    FROM borrowing_history bh
-                    JOIN books b ON bh.book_id = b.id
-                    WHERE bh.user_id = %s AND bh.user_type = %s
-                """
-                cursor.execute(query, (user_id, user_type))
+                conditions.append("bh.user_id = %s AND bh.user_type = %s")
+                params.extend([user_id, user_type])
+            if return_status:
+                statuses = [return_status] if isinstance(return_status, str) else list(return_status)
+                conditions.append(f"bh.return_status IN ({', '.join(['%s'] * len(statuses))})")
+                params.extend(statuses)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            columns = f"{HISTORY_COLUMNS}, {HISTORY_DETAIL_COLUMNS}" if with_book_details else HISTORY_COLUMNS
+            query = f"""
+                SELECT {columns}
+                FROM {{table}} bh
+                JOIN books b ON bh.book_id = b.id
+                {where}
+                ORDER BY bh.id
+                LIMIT %s
+            """
+            params.append(page_size + 1)
+            if include_archive:
+                # Each table is paged on its own index, then the two pages are merged by id
+                query = (f"SELECT * FROM ({query.format(table='borrowing_history')}) hot "
+                         f"UNION ALL SELECT * FROM ({query.format(table='borrowing_history_archive')}) archived "
+                         f"ORDER BY 1 LIMIT %s")
+                params = [*params, *params, page_size + 1]
             else:
-                query = """
-                    SELECT bh.id, bh.user_id, bh.user_type, bh.book_id, b.title, bh.date_borrowed, 
-                           bh.date_returned, bh.return_status, bh.`condition`, bh.fine, b.category
-                    FROM borrowing_history bh
-                    JOIN books b ON bh.book_id = b.id
-                """
-                cursor.execute(query)
-            return cursor.fetchall()
-        except pymysql.Error as e:
+                query = query.format(table="borrowing_history")
+            cursor.execute(query, params)
+            return _split_page(list(cursor.fetchall()), page_size, lambda row: row[0])
+        except DB_ERRORS as e:
             print(f"Database error during fetching borrowing history: {e}")
+            return [], None
+        finally:
+            cursor.close()
+
+    def get_borrowing_history(self, user_id=None, user_type=None, with_book_details=False, include_archive=False):
+        return self._fetch_all_pages(self.get_borrowing_history_page, user_id=user_id, user_type=user_type,
+                                     with_book_details=with_book_details, include_archive=include_archive)
+
+    def get_overdue_loans(self, limit=PAGE_SIZE, now=None):
+        """Fetch open loans past their due date, oldest due date first (history rows with book details).
+
+        Includes loans the sweeper has not marked 'Overdue' yet. A range scan
+        on idx_history_status_due.
+        """
+        now = now or datetime.now()
+        today = datetime.combine(now.date(), datetime.min.time())
+        return self._query_due_loans(
+            "bh.return_status IN ('Active', 'Overdue') AND bh.due_date < %s", [today], limit
+        )
+
+    def get_loans_due_soon(self, within_days=DUE_SOON_DAYS, user_id=None, user_type=None, now=None, limit=PAGE_SIZE):
+        """Fetch active loans due within the next within_days days, soonest first."""
+        now = now or datetime.now()
+        today = datetime.combine(now.date(), datetime.min.time())
+        conditions = "bh.return_status = 'Active' AND bh.due_date >= %s AND bh.due_date < %s"
+        params = [today, today + timedelta(days=within_days + 1)]
+        if user_id and user_type:
+            conditions += " AND bh.user_id = %s AND bh.user_type = %s"
+            params.extend([user_id, user_type])
+        return self._query_due_loans(conditions, params, limit)
+
+    def _query_due_loans(self, conditions, params, limit):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                f"""
+                SELECT {HISTORY_COLUMNS}, {HISTORY_DETAIL_COLUMNS}
+                FROM borrowing_history bh
+                JOIN books b ON bh.book_id = b.id
+                WHERE {conditions}
+                ORDER BY bh.due_date, bh.id
+                LIMIT %s
+                """,
+                (*params, limit)
+            )
+            return list(cursor.fetchall())
+        except DB_ERRORS as e:
+            print(f"Database error during fetching due loans: {e}")
             return []
         finally:
             cursor.close()
 
-    def get_all_users(self, user_type=None):
+    def get_users_page(self, after=None, page_size=PAGE_SIZE, user_type=None):
+        """Fetch one page of users: students first, then instructors, each ordered by id.
+
+        The continuation token is a (user_type, id) pair. Rows are dicts in the
+        same shape as get_all_users() minus the running "no" column.
+        """
+        tables = [
+            ("Student", "SELECT id, full_name, strand AS course, grade_level AS year, id_number FROM students"),
+            ("Instructor", "SELECT id, full_name, '' AS course, 'Faculty' AS year, id_number FROM instructors"),
+        ]
+        if user_type in ("Student", "Instructor"):
+            tables = [table for table in tables if table[0] == user_type]
+        if after is not None:
+            # Skip the tables that were already fully read
+            names = [name for name, _ in tables]
+            tables = tables[names.index(after[0]):] if after[0] in names else []
+
         cursor = self.conn.cursor()
         try:
-            if user_type == "Student":
-                query = "SELECT id, full_name, strand AS course, grade_level AS year, id_number FROM students"
-                cursor.execute(query)
-            elif user_type == "Instructor":
-                query = "SELECT id, full_name, '' AS course, 'Faculty' AS year, id_number FROM instructors"
-                cursor.execute(query)
-            else:
-                query = """
-                    SELECT id, full_name, strand AS course, grade_level AS year, id_number FROM students
-                    UNION
-                    SELECT id, full_name, '' AS course, 'Faculty' AS year, id_number FROM instructors
-                """
-                cursor.execute(query)
-            users = cursor.fetchall()
-            return [{"no": i+1, "type": "STUDENT" if user[2] else "INSTRUCTOR", "name": user[1], "course": user[2], "year": user[3], "id": user[4]} for i, user in enumerate(users)]
-        except pymysql.Error as e:
+            users = []
+            for name, select in tables:
+                remaining = page_size + 1 - len(users)
+                if remaining <= 0:
+                    break
+                if after is not None and after[0] == name:
+                    cursor.execute(f"{select} WHERE id > %s ORDER BY id LIMIT %s", (after[1], remaining))
+                else:
+                    cursor.execute(f"{select} ORDER BY id LIMIT %s", (remaining,))
+                users.extend(
+                    {"type": name.upper(), "name": user[1], "course": user[2], "year": user[3], "id": user[4],
+                     "key": (name, user[0])}
+                    for user in cursor.fetchall()
+                )
+            users, token = _split_page(users, page_size, lambda user: user["key"])
+            for user in users:
+                del user["key"]
+            return users, token
+        except DB_ERRORS as e:
             print(f"Database error during fetching users: {e}")
-            return []
+            return [], None
+        finally:
+            cursor.close()
+
+    def get_all_users(self, user_type=None):
+        users = self._fetch_all_pages(self.get_users_page, user_type=user_type)
+        return [{"no": i + 1, **user} for i, user in enumerate(users)]
+
+    # --- Change Tracking ---
+    def get_changes_since(self, token=None):
+        """Fetch the books and borrowing history rows modified since token.
+
+        Returns a dict with "books" (BOOK_COLUMNS rows), "history" (history rows
+        with book details), "token" to pass to the next call, and "truncated",
+        which is set when more than CHANGES_LIMIT rows changed and the caller
+        should reload instead. With token None only a starting token is returned.
+        Rows changed within CHANGES_OVERLAP seconds of the token are returned
+        again, so callers must apply them idempotently. Returns None on error.
+        """
+        cursor = self.conn.cursor()
+        try:
+            # Tokens come from the server clock so kiosks with skewed clocks agree
+            now = self.engine.server_now(cursor)
+            changes = {"token": now, "books": [], "history": [], "truncated": False}
+            if token is None:
+                return changes
+            since = token - timedelta(seconds=CHANGES_OVERLAP)
+
+            cursor.execute(
+                f"SELECT {BOOK_COLUMNS} FROM books WHERE updated_at >= %s ORDER BY updated_at LIMIT %s",
+                (since, CHANGES_LIMIT + 1)
+            )
+            changes["books"] = list(cursor.fetchall())
+            cursor.execute(
+                f"""
+                SELECT {HISTORY_COLUMNS}, {HISTORY_DETAIL_COLUMNS}
+                FROM borrowing_history bh
+                JOIN books b ON bh.book_id = b.id
+                WHERE bh.updated_at >= %s
+                ORDER BY bh.updated_at
+                LIMIT %s
+                """,
+                (since, CHANGES_LIMIT + 1)
+            )
+            changes["history"] = list(cursor.fetchall())
+            if len(changes["books"]) > CHANGES_LIMIT or len(changes["history"]) > CHANGES_LIMIT:
+                changes.update(books=[], history=[], truncated=True)
+            if changes["books"] or changes["truncated"]:
+                catalog_cache.bump_version()  # Another kiosk may have changed the catalog
+            return changes
+        except DB_ERRORS as e:
+            print(f"Database error during fetching changes: {e}")
+            return None
+        finally:
+            cursor.close()
+
+    # --- Statistics ---
+    def get_dashboard_stats(self):
+        """Fetch the admin dashboard numbers from circulation_counters.
+
+        This reads a handful of counter rows however large borrowing_history
+        grows. Until reconcile_counters() has been run once it falls back to
+        counting the tables directly (see count_dashboard_stats).
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT counter, scope, value FROM circulation_counters")
+            rows = cursor.fetchall()
+        except DB_ERRORS as e:
+            print(f"Database error during reading circulation counters: {e}")
+            rows = ()
+        finally:
+            cursor.close()
+        counters = {(counter, scope): int(value) for counter, scope, value in rows}
+        if ("reconciled", "") not in counters:
+            return self.count_dashboard_stats()
+
+        users = {role: counters.get(("users", role), 0) for role in ("Student", "Instructor", "Admin")}
+        return {
+            "total_books": counters.get(("books", ""), 0),
+            "borrowed_books": counters.get(("active_loans", ""), 0),
+            "overdue": counters.get(("overdue", ""), 0),
+            "students": users["Student"],
+            "instructors": users["Instructor"],
+            "admins": users["Admin"],
+            "total_users": sum(users.values()),
+            "categories": {scope: value for (counter, scope), value in counters.items()
+                           if counter == "active_loans" and scope},
+        }
+
+    @staticmethod
+    def catalog_cache_stats():
+        """Hit/miss counters of the catalog cache (see db/cache.py)."""
+        return catalog_cache.stats()
+
+    def count_dashboard_stats(self):
+        """Count the dashboard numbers from the base tables in a single round trip.
+
+        Returns the same dict as get_dashboard_stats(). The categories part is
+        one grouped aggregate, so this is one query whatever the category count.
+        """
+        query = """
+            SELECT 'total_books', NULL, COUNT(*) FROM books
+            UNION ALL
+            SELECT 'borrowed_books', NULL, COUNT(*) FROM borrowing_history WHERE return_status IN ('Active', 'Overdue')
+            UNION ALL
+            SELECT 'overdue', NULL, COUNT(*) FROM borrowing_history WHERE return_status = 'Overdue'
+            UNION ALL
+            SELECT 'students', NULL, COUNT(*) FROM students
+            UNION ALL
+            SELECT 'instructors', NULL, COUNT(*) FROM instructors
+            UNION ALL
+            SELECT 'admins', NULL, COUNT(*) FROM admins
+            UNION ALL
+            SELECT 'category', b.category, COUNT(*)
+            FROM borrowing_history bh
+            JOIN books b ON bh.book_id = b.id
+            WHERE bh.return_status IN ('Active', 'Overdue')
+            GROUP BY b.category
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query)
+            stats = {"total_books": 0, "borrowed_books": 0, "overdue": 0, "students": 0, "instructors": 0,
+                     "admins": 0, "categories": {}}
+            for name, category, count in cursor.fetchall():
+                if name == "category":
+                    stats["categories"][category] = int(count)
+                else:
+                    stats[name] = int(count)
+            stats["total_users"] = stats["students"] + stats["instructors"] + stats["admins"]
+            return stats
+        except DB_ERRORS as e:
+            print(f"Database error during fetching dashboard stats: {e}")
+            return None
         finally:
-            cursor.close()
\ No newline at end of file
+            cursor.close()
+
+    def reconcile_counters(self):
+        """Rebuild circulation_counters from the base tables in one transaction.
+
+        Run this after importing data outside the app (e.g. the seeder) or if the
+        counters are ever suspected to have drifted. Returns the rebuilt stats,
+        or None on error.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(COUNTERS_TABLE)
+            cursor.execute("DELETE FROM circulation_counters")
+            cursor.execute("""
+                INSERT INTO circulation_counters (counter, scope, value)
+                SELECT 'reconciled', '', 1
+                UNION ALL
+                SELECT 'books', '', COUNT(*) FROM books
+                UNION ALL
+                SELECT 'active_loans', '', COUNT(*) FROM borrowing_history WHERE return_status IN ('Active', 'Overdue')
+                UNION ALL
+                SELECT 'overdue', '', COUNT(*) FROM borrowing_history WHERE return_status = 'Overdue'
+                UNION ALL
+                SELECT 'users', 'Student', COUNT(*) FROM students
+                UNION ALL
+                SELECT 'users', 'Instructor', COUNT(*) FROM instructors
+                UNION ALL
+                SELECT 'users', 'Admin', COUNT(*) FROM admins
+                UNION ALL
+                SELECT 'active_loans', b.category, COUNT(*)
+                FROM borrowing_history bh
+                JOIN books b ON bh.book_id = b.id
+                WHERE bh.return_status IN ('Active', 'Overdue')
+                GROUP BY b.category
+            """)
+            self.conn.commit()
+        except DB_ERRORS as e:
+            print(f"Database error during reconciling counters: {e}")
+            self.conn.rollback()
+            return None
+        finally:
+            cursor.close()
+        return self.get_dashboard_stats()
+
+    def _bump_counter(self, cursor, counter, scope, delta):
+        """Add delta to one counter row. Runs inside the caller's transaction."""
+        cursor.execute(
+            "INSERT INTO circulation_counters (counter, scope, value) VALUES (%s, %s, %s) "
+            f"{self.engine.upsert_counter}",
+            (counter, scope or "", delta)
+        )
+
+    def _bump_loan_counters(self, cursor, book_id, delta):
+        """Move the total and per-category active loan counters in one statement."""
+        cursor.execute(
+            "INSERT INTO circulation_counters (counter, scope, value) "
+            "SELECT 'active_loans', '', %s "
+            "UNION ALL SELECT 'active_loans', category, %s FROM books WHERE id = %s "
+            f"{self.engine.upsert_counter}",
+            (delta, delta, book_id)
+        )
+
+    def _fetch_all_pages(self, fetch_page, **filters):
+        """Read every page of a paginated query (backs the old unpaginated methods)."""
+        rows, token = [], None
+        while True:
+            page, token = fetch_page(token, page_size=FETCH_ALL_PAGE_SIZE, **filters)
+            rows.extend(page)
+            if token is None:
+                return rows
@@ -0,0 +1,252 @@
+# db/engines.py
+import sqlite3
+import threading
+from datetime import datetime
+from decimal import Decimal
+
+import pymysql
+
+# Catch these around database calls so either engine's errors are handled
+DB_ERRORS = (pymysql.Error, sqlite3.Error)
+
+
+# --- MySQL (the default; one server shared by every kiosk) ---
+class MySQLEngine:
+    name = "mysql"
+    now = "NOW(6)"
+    # Appended to INSERT INTO circulation_counters (counter, scope, value) ...
+    upsert_counter = "ON DUPLICATE KEY UPDATE value = value + VALUES(value)"
+    retryable_errors = (1213, 1205)  # ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        return pymysql.connect(**self.config)
+
+    def is_retryable(self, error):
+        code = error.args[0] if error.args else None
+        return code in self.retryable_errors
+
+    def server_now(self, cursor):
+        cursor.execute(f"SELECT {self.now}")
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def days_between(later, earlier):
+        """SQL for the number of calendar days from earlier to later (both SQL expressions)."""
+        return f"DATEDIFF({later}, {earlier})"
+
+
+# --- SQLite (embedded; one file per branch library) ---
+# Same tables as utils/db_schema.txt. ENUMs become CHECK constraints and the
+# declared types are kept so DATETIME/DECIMAL columns convert back to Python
+# types the way pymysql returns them. Later changes come from db/migrations.py.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS admins (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name VARCHAR(255) NOT NULL,
+    id_number VARCHAR(6) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS instructors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name VARCHAR(255) NOT NULL,
+    id_number VARCHAR(6) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name VARCHAR(255) NOT NULL,
+    strand VARCHAR(8) NOT NULL CHECK (strand IN ('STEM', 'ABM', 'HUMSS', 'GAS')),
+    grade_level VARCHAR(16) NOT NULL
+        CHECK (grade_level IN ('Grade 7', 'Grade 8', 'Grade 9', 'Grade 10', 'Grade 11', 'Grade 12')),
+    id_number VARCHAR(6) UNIQUE NOT NULL,
+    password VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category VARCHAR(16) NOT NULL
+        CHECK (category IN ('Fiction', 'Science', 'History', 'Technology', 'Arts', 'Education')),
+    title VARCHAR(255) NOT NULL,
+    edition VARCHAR(50) NOT NULL,
+    publication VARCHAR(255) NOT NULL,
+    author VARCHAR(255) NOT NULL,
+    isbn VARCHAR(13) UNIQUE NOT NULL,
+    status VARCHAR(16) DEFAULT 'Available' CHECK (status IN ('Available', 'Borrowed', 'Overdue')),
+    reason_pdf_path VARCHAR(255) DEFAULT NULL
+);
+
+CREATE TABLE IF NOT EXISTS borrowing_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INT NOT NULL,
+    user_type VARCHAR(16) NOT NULL CHECK (user_type IN ('Student', 'Instructor')),
+    book_id INT NOT NULL,
+    date_borrowed DATETIME NOT NULL,
+    date_returned DATETIME DEFAULT NULL,
+    return_status VARCHAR(16) DEFAULT 'Active'
+        CHECK (return_status IN ('Active', 'Returned', 'Returned Late', 'Overdue')),
+    `condition` VARCHAR(16) DEFAULT '-' CHECK (`condition` IN ('Excellent', 'Good', 'Fair', '-')),
+    fine DECIMAL(10, 2) DEFAULT 0.00,
+    FOREIGN KEY (book_id) REFERENCES books(id) ON DELETE CASCADE
+);
+"""
+
+# Settings applied to every SQLite connection
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",      # Readers never block the writer
+    "PRAGMA synchronous = NORMAL",    # Safe with WAL; skips an fsync per commit
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -{cache_kb}",
+    "PRAGMA mmap_size = {mmap_bytes}",
+    "PRAGMA busy_timeout = {busy_timeout_ms}",
+]
+
+_READ_STATEMENTS = ("SELECT", "WITH", "EXPLAIN", "PRAGMA", "BEGIN", "COMMIT", "ROLLBACK")
+
+
+def _to_datetime(value):
+    return datetime.fromisoformat(value.decode())
+
+
+def _to_decimal(value):
+    return Decimal(value.decode()).quantize(Decimal("0.01"))
+
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATETIME", _to_datetime)
+sqlite3.register_converter("TIMESTAMP", _to_datetime)
+sqlite3.register_converter("DECIMAL", _to_decimal)
+
+
+class SQLiteCursor:
+    """Runs the pymysql-style SQL used by DatabaseOperations on sqlite3.
+
+    %s placeholders become ?, and the first write of a transaction (or a
+    SELECT ... FOR UPDATE) opens it with BEGIN IMMEDIATE, which takes the
+    database write lock up front the way FOR UPDATE locks rows in MySQL.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._cursor = conn.cursor()
+
+    def execute(self, query, params=()):
+        query = self._prepare(query)
+        self._cursor.execute(query, tuple(params))
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_params):
+        query = self._prepare(query)
+        self._cursor.executemany(query, [tuple(params) for params in seq_of_params])
+        return self._cursor.rowcount
+
+    def _prepare(self, query):
+        locking = " FOR UPDATE" in query
+        if locking:
+            query = query.replace(" FOR UPDATE", "")
+        if not self._conn.in_transaction and (locking or not query.lstrip().upper().startswith(_READ_STATEMENTS)):
+            self._conn.execute("BEGIN IMMEDIATE")
+        return query.replace("%s", "?")
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return tuple(self._cursor.fetchall())
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """The subset of the pymysql connection API that the pool and DatabaseOperations use."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return SQLiteCursor(self._conn)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=True):
+        pass  # A local file cannot drop the connection
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLiteEngine:
+    name = "sqlite"
+    now = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+    upsert_counter = "ON CONFLICT (counter, scope) DO UPDATE SET value = value + excluded.value"
+
+    def __init__(self, path, cache_kb=64 * 1024, mmap_bytes=256 * 1024 * 1024, busy_timeout_ms=5000):
+        self.path = path
+        self.cache_kb = cache_kb
+        self.mmap_bytes = mmap_bytes
+        self.busy_timeout_ms = busy_timeout_ms
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def connect(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout_ms / 1000,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,     # Transactions are opened by SQLiteCursor
+            check_same_thread=False,  # Pooled connections move between worker threads
+        )
+        for pragma in SQLITE_PRAGMAS:
+            raw.execute(pragma.format(cache_kb=self.cache_kb, mmap_bytes=self.mmap_bytes,
+                                      busy_timeout_ms=self.busy_timeout_ms))
+        conn = SQLiteConnection(raw)
+        self._ensure_schema(conn)
+        return conn
+
+    def _ensure_schema(self, conn):
+        """Create the tables and apply the migrations the first time the file is opened."""
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            from db.migrations import upgrade  # db.migrations imports this module's users
+            conn._conn.executescript(SQLITE_SCHEMA)
+            if upgrade(conn) is None:
+                raise sqlite3.DatabaseError(f"Could not migrate {self.path}")
+            self._schema_ready = True
+
+    def is_retryable(self, error):
+        # busy_timeout already waited; one more try after backoff is still worth it
+        return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+    def server_now(self, cursor):
+        cursor.execute(f"SELECT {self.now}")
+        return _to_datetime(cursor.fetchone()[0].encode())
+
+    @staticmethod
+    def days_between(later, earlier):
+        """SQL for the number of calendar days from earlier to later (both SQL expressions)."""
+        return f"CAST(julianday(date({later})) - julianday(date({earlier})) AS INTEGER)"
+
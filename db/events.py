@@ -0,0 +1,108 @@
+# db/events.py
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+
+# --- Events (published by DatabaseOperations after a successful commit) ---
+class Event:
+    """Base class for everything published on the bus."""
+
+
+@dataclass(frozen=True)
+class BookAdded(Event):
+    book: tuple  # BOOK_COLUMNS row
+
+
+@dataclass(frozen=True)
+class BookUpdated(Event):
+    book_id: int
+    category: str
+    title: str
+    edition: str
+    publication: str
+    author: str
+    isbn: str
+
+
+# queued=True means the database was unreachable and the operation was saved
+# to the offline journal instead (db/offline.py). The record id of a queued
+# borrow, and the book row of a queued return, are not known until replay,
+# which publishes the events again with queued=False.
+@dataclass(frozen=True)
+class BookBorrowed(Event):
+    record_id: int
+    book_id: int
+    user_id: int
+    user_type: str
+    borrowed_at: datetime
+    queued: bool = False
+
+
+@dataclass(frozen=True)
+class BookReturned(Event):
+    record_id: int
+    user_id: int
+    user_type: str
+    previous_status: str
+    returned_at: datetime
+    book: tuple  # BOOK_COLUMNS row, as it is after the return
+    return_status: str = None  # 'Returned' or 'Returned Late' (None while queued)
+    fine: Decimal = None
+    queued: bool = False
+
+
+@dataclass(frozen=True)
+class UserRegistered(Event):
+    role: str
+    id_number: str
+
+
+class EventBus:
+    """In-process publish/subscribe.
+
+    Handlers run synchronously on the publishing thread, which for database
+    writes is usually a loader worker. GUI code should subscribe through
+    Frontend.event_bridge, which moves delivery onto the GUI thread.
+    """
+
+    def __init__(self):
+        self._handlers = []  # (event_type, handler)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type, handler):
+        """Call handler(event) for every published event of event_type (or a subclass).
+
+        Returns a function that removes the subscription.
+        """
+        entry = (event_type, handler)
+        with self._lock:
+            self._handlers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._handlers:
+                    self._handlers.remove(entry)
+        return unsubscribe
+
+    def publish(self, event):
+        with self._lock:
+            handlers = [handler for event_type, handler in self._handlers if isinstance(event, event_type)]
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                # One broken subscriber must not undo a write that already committed
+                print(f"Error handling {type(event).__name__}: {e}")
+
+
+bus = EventBus()
+
+
+def publish(event):
+    bus.publish(event)
+
+
+def subscribe(event_type, handler):
+    return bus.subscribe(event_type, handler)
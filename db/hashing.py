@@ -0,0 +1,178 @@
+# db/hashing.py
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+# Hashing settings (can be overridden with environment variables)
+BCRYPT_ROUNDS = int(os.environ.get("INFOCHAN_BCRYPT_ROUNDS", 12))  # bcrypt work factor for new hashes
+HASH_WORKERS = int(os.environ.get("INFOCHAN_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+# --- Worker functions (run in the pool processes, so they must stay top level) ---
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, stored_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+
+
+class HashingService:
+    """Runs bcrypt in a pool of worker processes.
+
+    bcrypt is deliberately slow, so hashing on the caller's thread would block the
+    GUI and serialise logins on one core. The sync methods wait for the result;
+    the *_async methods are coroutines for asyncio callers.
+    """
+
+    def __init__(self, rounds=BCRYPT_ROUNDS, workers=HASH_WORKERS):
+        self.rounds = rounds
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    # --- Sync API ---
+    def hash_password(self, password, rounds=None):
+        return self._run(_hash, password, rounds or self.rounds)
+
+    def verify_password(self, password, stored_hash):
+        try:
+            return self._run(_check, password, stored_hash)
+        except ValueError:
+            return False  # Not a bcrypt hash
+
+    # --- Async API ---
+    async def hash_password_async(self, password, rounds=None):
+        return await self._run_async(_hash, password, rounds or self.rounds)
+
+    async def verify_password_async(self, password, stored_hash):
+        try:
+            return await self._run_async(_check, password, stored_hash)
+        except ValueError:
+            return False
+
+    def needs_rehash(self, stored_hash):
+        """True when a stored hash was made with a different work factor than the configured one."""
+        return hash_rounds(stored_hash) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._executor is None:
+                # Spawn, not fork: forking the Qt process would copy locks held by other threads
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor.submit(fn, *args)
+
+    def _run(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result()
+        except (BrokenProcessPool, OSError) as e:
+            # A worker died or processes cannot be started here; hash in-process instead
+            print(f"Hashing pool unavailable, hashing in-process: {e}")
+            self.shutdown()
+            return fn(*args)
+
+    async def _run_async(self, fn, *args):
+        try:
+            return await asyncio.wrap_future(self._submit(fn, *args))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Hashing pool unavailable, hashing in-process: {e}")
+            self.shutdown()
+            return await asyncio.to_thread(fn, *args)
+
+
+def hash_rounds(stored_hash):
+    """Work factor of a bcrypt hash ("$2b$12$..." -> 12), or None if it is not one."""
+    try:
+        return int(stored_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_hasher():
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = HashingService()
+        return _service
+
+
+def configure_hasher(rounds=None, workers=None):
+    """Change the hashing settings. workers only applies before the first hash."""
+    service = get_hasher()
+    if rounds is not None:
+        service.rounds = rounds
+    if workers is not None:
+        service.workers = workers
+    return service
+
+
+def hash_password(password, rounds=None):
+    return get_hasher().hash_password(password, rounds)
+
+
+def verify_password(password, stored_hash):
+    return get_hasher().verify_password(password, stored_hash)
+
+
+def needs_rehash(stored_hash):
+    return get_hasher().needs_rehash(stored_hash)
+
+
+def autotune(target_ms=250.0, min_rounds=10, max_rounds=16, samples=3):
+    """Pick the highest work factor whose median hash time stays within target_ms.
+
+    Returns (rounds, {rounds: median_ms}). Timing runs in this process because one
+    hash per login is what a user waits for.
+    """
+    timings = {}
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        durations = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            _hash("autotune-password", rounds)
+            durations.append((time.perf_counter() - start) * 1000)
+        timings[rounds] = statistics.median(durations)
+        if timings[rounds] > target_ms:
+            break
+        best = rounds
+    return best, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bcrypt settings for InfoChan.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tune = commands.add_parser("autotune", help="pick the bcrypt rounds for a target login latency")
+    tune.add_argument("--target-ms", type=float, default=250.0)
+    tune.add_argument("--min-rounds", type=int, default=10)
+    tune.add_argument("--max-rounds", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.command == "autotune":
+        rounds, timings = autotune(args.target_ms, args.min_rounds, args.max_rounds)
+        for tried, ms in timings.items():
+            print(f"rounds {tried}: {ms:.0f} ms")
+        print(f"Recommended: INFOCHAN_BCRYPT_ROUNDS={rounds} (currently {BCRYPT_ROUNDS})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# db/journal.py
+import json
+import os
+import threading
+import time
+import uuid
+
+
+class Journal:
+    """Append-only, fsynced log of JSON entries, one per line.
+
+    The first line is a header holding the journal's source id (stable for the
+    life of the file) and the seq the entries continue from. append() returns
+    only once the entry is on disk. Callers that append at the same time share
+    one fsync: whoever finds no fsync running performs it for every entry
+    written so far, and the others wait for it (group commit). commit_delay
+    holds that fsync back briefly so a burst of appends can join it.
+    """
+
+    def __init__(self, path, commit_delay=0.0):
+        self.path = path
+        self.commit_delay = commit_delay
+        self.fsyncs = 0
+        self._cond = threading.Condition()
+        self._syncing = False
+        self._open()
+
+    def _open(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb+") as f:
+                self.header = json.loads(f.readline())
+                last_seq = self.header["base_seq"]
+                end = f.tell()
+                for line in f:
+                    try:
+                        last_seq = json.loads(line)["seq"]
+                    except ValueError:
+                        break
+                    end += len(line)
+                # A torn last line is an append that crashed before it was acknowledged
+                f.truncate(end)
+        else:
+            self.header = {"source": uuid.uuid4().hex, "base_seq": 0}
+            self._rewrite([])
+            last_seq = 0
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._last_seq = last_seq
+        self._synced_seq = last_seq
+
+    @property
+    def source(self):
+        return self.header["source"]
+
+    @property
+    def is_empty(self):
+        """True when every entry has been compacted away."""
+        with self._cond:
+            return self._last_seq == self.header["base_seq"]
+
+    @property
+    def last_seq(self):
+        with self._cond:
+            return self._last_seq
+
+    def append(self, entry):
+        """Write entry durably and return its seq."""
+        with self._cond:
+            seq = self._last_seq + 1
+            self._file.write(json.dumps({"seq": seq, **entry}) + "\n")
+            self._file.flush()
+            self._last_seq = seq
+            while self._synced_seq < seq:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                self._cond.release()
+                try:
+                    if self.commit_delay:
+                        time.sleep(self.commit_delay)
+                    with self._cond:
+                        target = self._last_seq
+                    os.fsync(self._file.fileno())
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._synced_seq = max(self._synced_seq, target)
+                self.fsyncs += 1
+        return seq
+
+    def entries(self, after_seq=0):
+        """Every entry with a seq above after_seq, oldest first."""
+        with self._cond:
+            self._file.flush()
+            last_seq = self._last_seq
+        entries = []
+        with open(self.path, encoding="utf-8") as f:
+            f.readline()  # Header
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                if after_seq < entry["seq"] <= last_seq:
+                    entries.append(entry)
+        return entries
+
+    def compact(self, applied_seq):
+        """Drop the entries up to applied_seq, keeping any appended after them."""
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()  # append() is fsyncing the current file outside the lock
+            keep = self.entries(applied_seq)
+            self._file.close()
+            self.header = {"source": self.source, "base_seq": applied_seq}
+            self._rewrite(keep)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rewrite(self, entries):
+        # Write a new file beside the old one and swap it in, so a crash leaves one or the other
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.header) + "\n")
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def close(self):
+        with self._cond:
+            self._file.close()
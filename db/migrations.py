@@ -0,0 +1,312 @@
+# db/migrations.py
+import argparse
+import sys
+
+from db.db_connection import create_connection, get_engine
+from db.db_operations import COUNTERS_TABLE
+from db.engines import DB_ERRORS, SQLiteEngine
+
+SQLITE_NOW = SQLiteEngine.now
+
+# Versioned schema changes, applied in order by `python -m db.migrations upgrade`.
+# Never edit a migration that has shipped; add a new one instead.
+# Each entry is (version, description, [statements]); where the engines need
+# different SQL, statements is a dict of lists keyed by engine name.
+MIGRATIONS = [
+    (1, "Create circulation_counters", [COUNTERS_TABLE]),
+    (2, "Index borrowing_history access paths", [
+        # Student pages and the borrow limit check: WHERE user_id = ? AND user_type = ? AND return_status IN (...)
+        "CREATE INDEX idx_history_user ON borrowing_history (user_id, user_type, return_status)",
+        # Dashboard / reconcile: active loans joined to books, grouped by category
+        "CREATE INDEX idx_history_status_book ON borrowing_history (return_status, book_id)",
+    ]),
+    (3, "Index books access paths", [
+        # Borrow page and status filters, paged by id
+        "CREATE INDEX idx_books_status ON books (status, id)",
+        # Category filter (optionally with status), paged by id
+        "CREATE INDEX idx_books_category_status ON books (category, status, id)",
+    ]),
+    (4, "Track row changes with updated_at", {
+        "mysql": [
+            # Maintained by MySQL itself, so every writer (other kiosks, scripts) is covered
+            "ALTER TABLE books ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+            "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+            "CREATE INDEX idx_books_updated ON books (updated_at)",
+            "ALTER TABLE borrowing_history ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+            "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)",
+            "CREATE INDEX idx_history_updated ON borrowing_history (updated_at)",
+        ],
+        # SQLite has no ON UPDATE and no non-constant column defaults, so triggers keep it current
+        "sqlite": [
+            statement
+            for table, index in (("books", "idx_books_updated"), ("borrowing_history", "idx_history_updated"))
+            for statement in (
+                f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP NOT NULL DEFAULT '1970-01-01 00:00:00'",
+                f"UPDATE {table} SET updated_at = {SQLITE_NOW}",
+                f"CREATE INDEX {index} ON {table} (updated_at)",
+                f"CREATE TRIGGER {table}_inserted AFTER INSERT ON {table} BEGIN "
+                f"UPDATE {table} SET updated_at = {SQLITE_NOW} WHERE id = NEW.id; END",
+                f"CREATE TRIGGER {table}_updated AFTER UPDATE ON {table} "
+                f"WHEN NEW.updated_at = OLD.updated_at BEGIN "
+                f"UPDATE {table} SET updated_at = {SQLITE_NOW} WHERE id = NEW.id; END",
+            )
+        ],
+    }),
+    (5, "Track offline journal replay", [
+        # Last journal seq applied per kiosk, updated in the replay transaction (see db/offline.py)
+        """
+        CREATE TABLE IF NOT EXISTS offline_replay (
+            source VARCHAR(64) NOT NULL PRIMARY KEY,
+            last_seq INT NOT NULL,
+            replayed_at DATETIME NOT NULL
+        )
+        """,
+    ]),
+    (6, "Index loans by status and borrow date", [
+        # Overdue sweeper: WHERE return_status = ? AND date_borrowed < ? ORDER BY date_borrowed
+        "CREATE INDEX idx_history_status_borrowed ON borrowing_history (return_status, date_borrowed)",
+    ]),
+    (7, "Store loan due dates", {
+        # Existing loans get the loan periods in force when due dates were introduced
+        # (Student 7 days, Instructor 14); new loans take theirs from db/policy.py.
+        # The sweeper and the overdue / due-soon lookups range-scan (return_status, due_date),
+        # which replaces the date_borrowed index.
+        "mysql": [
+            "ALTER TABLE borrowing_history ADD COLUMN due_date DATETIME NULL AFTER date_borrowed",
+            "UPDATE borrowing_history SET due_date = DATE_ADD(date_borrowed, "
+            "INTERVAL CASE user_type WHEN 'Instructor' THEN 14 ELSE 7 END DAY)",
+            "CREATE INDEX idx_history_status_due ON borrowing_history (return_status, due_date)",
+            "DROP INDEX idx_history_status_borrowed ON borrowing_history",
+        ],
+        "sqlite": [
+            "ALTER TABLE borrowing_history ADD COLUMN due_date DATETIME NULL",
+            "UPDATE borrowing_history SET due_date = datetime(date_borrowed, "
+            "CASE user_type WHEN 'Instructor' THEN '+14 days' ELSE '+7 days' END)",
+            "CREATE INDEX idx_history_status_due ON borrowing_history (return_status, due_date)",
+            "DROP INDEX idx_history_status_borrowed",
+        ],
+    }),
+    (8, "Archive old returned loans", {
+        # Returned loans older than INFOCHAN_ARCHIVE_AFTER_DAYS are moved here by db/archive.py.
+        # Ids are kept, so a loan has the same id in either table. The key includes date_borrowed
+        # so the MySQL table can be range-partitioned by year (python -m db.archive --partition);
+        # it has no foreign keys for the same reason.
+        "mysql": [
+            """
+            CREATE TABLE IF NOT EXISTS borrowing_history_archive (
+                id INT NOT NULL,
+                user_id INT NOT NULL,
+                user_type ENUM('Student', 'Instructor') NOT NULL,
+                book_id INT NOT NULL,
+                date_borrowed DATETIME NOT NULL,
+                due_date DATETIME NULL,
+                date_returned DATETIME NULL,
+                return_status ENUM('Active', 'Returned', 'Returned Late', 'Overdue') NOT NULL,
+                `condition` ENUM('Excellent', 'Good', 'Fair', '-') DEFAULT '-',
+                fine DECIMAL(10, 2) DEFAULT 0.00,
+                archived_at DATETIME NOT NULL,
+                PRIMARY KEY (id, date_borrowed),
+                KEY idx_archive_user (user_id, user_type, id)
+            )
+            """,
+            # Archiver: WHERE return_status IN (...) AND date_returned < ? ORDER BY date_returned
+            "CREATE INDEX idx_history_status_returned ON borrowing_history (return_status, date_returned)",
+        ],
+        "sqlite": [
+            """
+            CREATE TABLE IF NOT EXISTS borrowing_history_archive (
+                id INTEGER NOT NULL,
+                user_id INT NOT NULL,
+                user_type VARCHAR(16) NOT NULL,
+                book_id INT NOT NULL,
+                date_borrowed DATETIME NOT NULL,
+                due_date DATETIME NULL,
+                date_returned DATETIME NULL,
+                return_status VARCHAR(16) NOT NULL,
+                `condition` VARCHAR(16) DEFAULT '-',
+                fine DECIMAL(10, 2) DEFAULT 0.00,
+                archived_at DATETIME NOT NULL,
+                PRIMARY KEY (id, date_borrowed)
+            )
+            """,
+            "CREATE INDEX idx_archive_user ON borrowing_history_archive (user_id, user_type, id)",
+            "CREATE INDEX idx_history_status_returned ON borrowing_history (return_status, date_returned)",
+        ],
+    }),
+]
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Hot queries that must be served by an index: (name, table, query)
+HOT_QUERIES = [
+    ("borrow limit check", "borrowing_history",
+     "SELECT COUNT(*) FROM borrowing_history WHERE user_id = 1 AND user_type = 'Student' "
+     "AND return_status IN ('Active', 'Overdue')"),
+    ("student borrowing history", "bh",
+     "SELECT bh.id FROM borrowing_history bh JOIN books b ON bh.book_id = b.id "
+     "WHERE bh.user_id = 1 AND bh.user_type = 'Student' ORDER BY bh.id LIMIT 101"),
+    ("active loans", "borrowing_history",
+     "SELECT COUNT(*) FROM borrowing_history WHERE return_status IN ('Active', 'Overdue')"),
+    ("available books", "books",
+     "SELECT id, title, author, category, isbn FROM books WHERE status = 'Available' ORDER BY id LIMIT 101"),
+    ("books by category", "books",
+     "SELECT id FROM books WHERE category = 'Fiction' ORDER BY id LIMIT 101"),
+    ("books by category and status", "books",
+     "SELECT id FROM books WHERE category = 'Fiction' AND status = 'Available' ORDER BY id LIMIT 101"),
+    ("overdue sweep", "borrowing_history",
+     "SELECT id FROM borrowing_history WHERE return_status = 'Active' AND due_date < '2024-01-01 00:00:00' "
+     "ORDER BY due_date LIMIT 1000"),
+    ("overdue loans", "bh",
+     "SELECT bh.id FROM borrowing_history bh JOIN books b ON bh.book_id = b.id "
+     "WHERE bh.return_status IN ('Active', 'Overdue') AND bh.due_date < '2024-01-01 00:00:00' "
+     "ORDER BY bh.due_date, bh.id LIMIT 100"),
+    ("loans due soon", "bh",
+     "SELECT bh.id FROM borrowing_history bh JOIN books b ON bh.book_id = b.id "
+     "WHERE bh.return_status = 'Active' AND bh.due_date >= '2024-01-01 00:00:00' "
+     "AND bh.due_date < '2024-01-04 00:00:00' ORDER BY bh.due_date, bh.id LIMIT 100"),
+    ("archive batch", "borrowing_history",
+     "SELECT id FROM borrowing_history WHERE return_status IN ('Returned', 'Returned Late') "
+     "AND date_returned < '2024-01-01 00:00:00' ORDER BY date_returned LIMIT 1000"),
+    ("archived history of student", "borrowing_history_archive",
+     "SELECT id FROM borrowing_history_archive WHERE user_id = 1 AND user_type = 'Student' ORDER BY id LIMIT 101"),
+    ("changed books", "books",
+     "SELECT id FROM books WHERE updated_at >= '2024-01-01 00:00:00' ORDER BY updated_at LIMIT 501"),
+    ("changed history", "bh",
+     "SELECT bh.id FROM borrowing_history bh JOIN books b ON bh.book_id = b.id "
+     "WHERE bh.updated_at >= '2024-01-01 00:00:00' ORDER BY bh.updated_at LIMIT 501"),
+]
+
+
+def current_version(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SCHEMA_VERSION_TABLE)
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def pending_migrations(conn):
+    version = current_version(conn)
+    return [migration for migration in MIGRATIONS if migration[0] > version]
+
+
+def upgrade(conn, target=None, engine=None):
+    """Apply every pending migration up to target (default: latest). Returns the new version."""
+    engine = engine or get_engine()
+    version = current_version(conn)
+    cursor = conn.cursor()
+    try:
+        for number, description, statements in pending_migrations(conn):
+            if target is not None and number > target:
+                break
+            print(f"Applying migration {number}: {description}")
+            if isinstance(statements, dict):
+                statements = statements[engine.name]
+            # MySQL commits DDL implicitly, so each migration is recorded as soon as it has run
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                (number, description)
+            )
+            conn.commit()
+            version = number
+        return version
+    except DB_ERRORS as e:
+        conn.rollback()
+        print(f"Migration failed at version {version + 1}: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def explain(conn, query, engine=None):
+    """Return the EXPLAIN output of a query as a list of dicts."""
+    engine = engine or get_engine()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}" if engine.name == "sqlite" else f"EXPLAIN {query}")
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def check_indexes(conn, engine=None):
+    """EXPLAIN every hot query and report whether it uses an index. Returns True if all do.
+
+    engine is the engine conn belongs to (e.g. db.engine of a DatabaseOperations); default: get_engine().
+    """
+    engine = engine or get_engine()
+    all_ok = True
+    for name, table, query in HOT_QUERIES:
+        rows = explain(conn, query, engine)
+        if engine.name == "sqlite":
+            plan = _sqlite_plan(rows, table)
+        else:
+            plan = [row for row in rows if row.get("table") == table]
+        uses_index = bool(plan) and all(row.get("key") and row.get("type") != "ALL" for row in plan)
+        keys = ", ".join(str(row.get("key")) for row in plan) or "-"
+        print(f"{'ok  ' if uses_index else 'SCAN'} {name}: key={keys}")
+        all_ok = all_ok and uses_index
+    return all_ok
+
+
+def _sqlite_plan(rows, table):
+    """Turn EXPLAIN QUERY PLAN rows into the table/type/key shape MySQL's EXPLAIN has."""
+    plan = []
+    for row in rows:
+        words = row["detail"].split()
+        if len(words) < 2 or words[0] not in ("SCAN", "SEARCH") or words[1] != table:
+            continue
+        key = None
+        if "INDEX" in words:
+            key = words[words.index("INDEX") + 1]
+        elif "PRIMARY" in words:
+            key = "PRIMARY"
+        plan.append({"table": table, "type": "ALL" if key is None else "ref", "key": key})
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the library_db schema.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, default=None, help="stop at this version")
+    commands.add_parser("status", help="show the applied and pending migrations")
+    commands.add_parser("explain", help="check that the hot queries use an index")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    if not conn:
+        print("Failed to connect to the database.")
+        sys.exit(1)
+    try:
+        if args.command == "upgrade":
+            version = upgrade(conn, args.to)
+            if version is None:
+                sys.exit(1)
+            print(f"Schema is at version {version}.")
+        elif args.command == "status":
+            print(f"Schema is at version {current_version(conn)} (latest {MIGRATIONS[-1][0]}).")
+            for number, description, _ in pending_migrations(conn):
+                print(f"  pending {number}: {description}")
+        elif args.command == "explain":
+            if not check_indexes(conn):
+                print("Some hot queries are not using an index.")
+                sys.exit(1)
+            print("All hot queries use an index.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+# db/offline.py
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from db.db_connection import DatabaseUnavailable
+from db.db_operations import DatabaseOperations
+from db.engines import DB_ERRORS
+from db.events import BookAdded, BookBorrowed, BookReturned, publish, subscribe
+from db.journal import Journal
+from db.policy import policy_for
+
+# Offline journal settings (can be overridden with environment variables)
+DATA_DIR = os.environ.get("INFOCHAN_DATA_DIR", os.path.join(os.path.expanduser("~"), ".infochan"))  # per-user, not the source tree
+JOURNAL_PATH = os.environ.get("INFOCHAN_JOURNAL_PATH", os.path.join(DATA_DIR, "offline_journal.jsonl"))
+JOURNAL_COMMIT_DELAY = float(os.environ.get("INFOCHAN_JOURNAL_COMMIT_DELAY", 0))   # seconds an fsync waits for company
+REPLAY_BATCH = int(os.environ.get("INFOCHAN_REPLAY_BATCH", 500))                    # journal entries per replay transaction
+VIEW_MAX_AGE = float(os.environ.get("INFOCHAN_OFFLINE_VIEW_MAX_AGE", 300))          # seconds before the view is re-read
+
+REJECTED_CONFLICT = "Rejected by the database on replay"
+QUEUED_MESSAGE = "The database is unreachable, so this was saved offline and will be sent when it is back."
+
+
+class AvailabilityView:
+    """What the desk knows about availability while the database is down.
+
+    A snapshot of the available book ids and of every user's active loan count,
+    taken from the database by refresh() and saved beside the journal so it
+    survives a restart. Borrows and returns made since (online or queued) are
+    applied on top, so offline borrows are checked against the same rules as
+    borrow_book. It can still be out of date; replay catches what it misses.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.books = set()
+        self.loans = {}  # (user_id, user_type) -> active loans
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._load(snapshot)
+
+    def _load(self, snapshot):
+        self.books = set(snapshot["books"])
+        self.loans = {(user_id, user_type): count for user_id, user_type, count in snapshot["loans"]}
+        self.refreshed_at = snapshot["refreshed_at"]
+
+    def refresh(self, db, pending=()):
+        """Re-read the snapshot from the database, then re-apply the entries not replayed yet."""
+        cursor = db.conn.cursor()
+        try:
+            cursor.execute("SELECT id FROM books WHERE status = 'Available'")
+            books = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                "SELECT user_id, user_type, COUNT(*) FROM borrowing_history "
+                "WHERE return_status IN ('Active', 'Overdue') GROUP BY user_id, user_type"
+            )
+            loans = [[user_id, user_type, int(count)] for user_id, user_type, count in cursor.fetchall()]
+        finally:
+            cursor.close()
+        snapshot = {"books": books, "loans": loans, "refreshed_at": time.time()}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(temp_path, self.path)
+        with self._lock:
+            self._load(snapshot)
+        for entry in pending:
+            self.apply(entry)
+
+    def is_stale(self, max_age=VIEW_MAX_AGE):
+        return self.refreshed_at is None or time.time() - self.refreshed_at > max_age
+
+    def borrow_refusal(self, user_id, user_type, book_id):
+        """Why a borrow must be refused, or None if the view allows it."""
+        with self._lock:
+            if self.refreshed_at is None:
+                return "The database is unreachable and no availability has been saved yet"
+            # Checked against the role's limit; a category override is applied on replay
+            max_loans = policy_for(user_type).max_loans
+            if self.loans.get((user_id, user_type), 0) >= max_loans:
+                return f"Cannot borrow more than {max_loans} books at a time"
+            if book_id not in self.books:
+                return "Book is not available"
+            return None
+
+    def apply(self, entry):
+        key = (entry["user_id"], entry["user_type"])
+        with self._lock:
+            if entry["op"] == "borrow":
+                self.books.discard(entry["book_id"])
+                self.loans[key] = self.loans.get(key, 0) + 1
+            else:
+                self.books.add(entry["book_id"])
+                self.loans[key] = max(0, self.loans.get(key, 0) - 1)
+
+    def add_book(self, book_id):
+        with self._lock:
+            self.books.add(book_id)
+
+
+class OfflineDesk:
+    """Borrow and return that keep working while the database is unreachable.
+
+    While the database answers, operations go straight to DatabaseOperations.
+    When no connection can be opened they are checked against the availability
+    view and appended to the journal, and the caller gets (True, QUEUED_MESSAGE).
+    sync() replays the journal in order, REPLAY_BATCH entries per transaction;
+    entries that conflict with what happened on the server meanwhile are
+    skipped and written to the conflicts file for the staff to resolve.
+    """
+
+    def __init__(self, journal_path=JOURNAL_PATH, commit_delay=JOURNAL_COMMIT_DELAY, batch_size=REPLAY_BATCH):
+        os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+        self.journal = Journal(journal_path, commit_delay)
+        self.view = AvailabilityView(f"{journal_path}.view.json")
+        self.conflicts_path = f"{journal_path}.conflicts.jsonl"
+        self.batch_size = batch_size
+        self._replay_lock = threading.Lock()
+        for entry in self.journal.entries():
+            self.view.apply(entry)
+        self._unsubscribe = subscribe(BookAdded, lambda event: self.view.add_book(event.book[0]))
+
+    def pending(self):
+        return self.journal.entries()
+
+    # --- Circulation ---
+    def borrow_book(self, user_id, user_type, book_id, borrow_date):
+        entry = {"op": "borrow", "user_id": user_id, "user_type": user_type, "book_id": book_id,
+                 "at": borrow_date.isoformat(" ")}
+        try:
+            db = self._connect()
+        except DatabaseUnavailable:
+            refusal = self.view.borrow_refusal(user_id, user_type, book_id)
+            if refusal:
+                return False, refusal
+            self._queue(entry)
+            publish(BookBorrowed(None, book_id, user_id, user_type, borrow_date, queued=True))
+            return True, QUEUED_MESSAGE
+        try:
+            success, message = db.borrow_book(user_id, user_type, book_id, borrow_date)
+        finally:
+            db.close_connection()
+        if success:
+            self.view.apply(entry)
+        return success, message
+
+    def return_book(self, record_id, book_id, user_id, user_type):
+        returned_at = datetime.now()
+        entry = {"op": "return", "record_id": record_id, "user_id": user_id, "user_type": user_type,
+                 "book_id": book_id, "at": returned_at.isoformat(" ")}
+        try:
+            db = self._connect()
+        except DatabaseUnavailable:
+            self._queue(entry)
+            publish(BookReturned(record_id, user_id, user_type, None, returned_at, None, queued=True))
+            return True, QUEUED_MESSAGE
+        try:
+            success, message = db.return_book(record_id, book_id)
+        finally:
+            db.close_connection()
+        if success:
+            self.view.apply(entry)
+        return success, message
+
+    def _connect(self):
+        """Open a connection, first replaying anything queued so operations reach the server in order."""
+        if not self.journal.is_empty:
+            self.replay()
+        return DatabaseOperations()
+
+    def _queue(self, entry):
+        self.journal.append(entry)
+        self.view.apply(entry)
+
+    # --- Replay ---
+    def replay(self):
+        """Send the queued operations to the database in order.
+
+        A batch the database rolls back is applied again one entry at a time,
+        and an entry that still fails is moved to the conflicts file, so one
+        bad entry cannot hold up the rest. Returns {"applied", "conflicts",
+        "pending", "seconds"}. Raises DatabaseUnavailable if the database is
+        unreachable or goes away during the replay.
+        """
+        with self._replay_lock:
+            entries = self.journal.entries()
+            result = {"applied": 0, "conflicts": 0, "pending": len(entries), "seconds": 0.0}
+            if not entries:
+                return result
+            start = time.perf_counter()
+            db = DatabaseOperations()
+            try:
+                for i in range(0, len(entries), self.batch_size):
+                    batch = entries[i:i + self.batch_size]
+                    outcomes = db.replay_offline(self.journal.source, batch)
+                    if outcomes is None:
+                        self._replay_singly(db, batch, result)
+                        continue
+                    self._tally(batch, outcomes, result)
+                    self.journal.compact(batch[-1]["seq"])
+                result["pending"] = len(self.journal.entries())
+                if result["pending"] == 0:
+                    self.view.refresh(db)
+            finally:
+                db.close_connection()
+            result["seconds"] = time.perf_counter() - start
+            return result
+
+    def _replay_singly(self, db, batch, result):
+        """Replay a rolled-back batch entry by entry, setting aside the entries the database rejects."""
+        for entry in batch:
+            outcomes = db.replay_offline(self.journal.source, [entry])
+            if outcomes is None:
+                try:
+                    db.conn.ping(reconnect=True)
+                except DB_ERRORS:
+                    raise DatabaseUnavailable("Database went away during offline replay")
+                outcomes = [(entry["seq"], False, REJECTED_CONFLICT)]
+            self._tally([entry], outcomes, result)
+            self.journal.compact(entry["seq"])
+
+    def _tally(self, batch, outcomes, result):
+        by_seq = {entry["seq"]: entry for entry in batch}
+        for seq, applied, conflict in outcomes:
+            if applied:
+                result["applied"] += 1
+            else:
+                result["conflicts"] += 1
+                self._record_conflict(by_seq[seq], conflict)
+
+    def sync(self):
+        """Replay the journal and refresh a stale view. Returns replay()'s result, or None while offline."""
+        try:
+            result = self.replay()
+            if self.view.is_stale():
+                db = DatabaseOperations()
+                try:
+                    self.view.refresh(db, self.journal.entries())
+                finally:
+                    db.close_connection()
+            return result
+        except DatabaseUnavailable:
+            return None
+
+    def _record_conflict(self, entry, reason):
+        with open(self.conflicts_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({**entry, "conflict": reason, "replayed_at": datetime.now().isoformat(" ")}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def conflicts(self):
+        if not os.path.exists(self.conflicts_path):
+            return []
+        with open(self.conflicts_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+_desk = None
+_desk_lock = threading.Lock()
+
+
+def get_desk():
+    global _desk
+    with _desk_lock:
+        if _desk is None:
+            _desk = OfflineDesk()
+        return _desk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay the offline borrow/return journal.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="show what is waiting to be replayed")
+    commands.add_parser("replay", help="send the queued operations to the database now")
+    commands.add_parser("conflicts", help="list operations the database rejected on replay")
+    args = parser.parse_args()
+
+    desk = get_desk()
+    if args.command == "status":
+        pending = desk.pending()
+        print(f"Journal: {desk.journal.path} (source {desk.journal.source})")
+        print(f"Queued operations: {len(pending)}")
+        if pending:
+            print(f"  oldest: {pending[0]['at']}, newest: {pending[-1]['at']}")
+        age = "never" if desk.view.refreshed_at is None else f"{time.time() - desk.view.refreshed_at:.0f}s ago"
+        print(f"Availability view: {len(desk.view.books)} available books, refreshed {age}")
+        print(f"Conflicts recorded: {len(desk.conflicts())}")
+    elif args.command == "replay":
+        result = desk.sync()
+        if result is None:
+            print("The database is still unreachable.")
+            raise SystemExit(1)
+        replayed = result["applied"] + result["conflicts"]
+        rate = replayed / result["seconds"] if result["seconds"] else 0
+        print(f"Replayed {replayed} operations in {result['seconds']:.2f}s ({rate:.0f} ops/s): "
+              f"{result['applied']} applied, {result['conflicts']} conflicts, {result['pending']} still queued.")
+    elif args.command == "conflicts":
+        for conflict in desk.conflicts():
+            print(f"#{conflict['seq']} {conflict['op']} book {conflict['book_id']} "
+                  f"for {conflict['user_type']} {conflict['user_id']} at {conflict['at']}: {conflict['conflict']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# db/sweeper.py
+import argparse
+import os
+import time
+from datetime import datetime
+
+from db.cache import catalog_cache
+from db.db_operations import DatabaseOperations
+from db.engines import DB_ERRORS
+from db.policy import fine_rate_sql
+
+# Sweeper settings (can be overridden with environment variables)
+SWEEP_BATCH = int(os.environ.get("INFOCHAN_SWEEP_BATCH", 1000))             # Loans per UPDATE / transaction
+
+
+class OverdueSweeper:
+    """Moves loans past their due date from 'Active' to 'Overdue' and keeps their fines current.
+
+    Work is done in batches of batch_size loans, each one transaction: the
+    batch is picked (and locked) through idx_history_status_due, then changed
+    with one UPDATE over its ids. A loan due on day D is overdue from day D + 1
+    and owes its policy's fine_per_day for every day after D (db/policy.py).
+    The books of newly overdue loans are set to 'Overdue' and the overdue
+    counter is moved in the same transaction.
+    """
+
+    def __init__(self, db, batch_size=SWEEP_BATCH):
+        self.db = db
+        self.batch_size = batch_size
+
+    def sweep(self, now=None):
+        """Run both passes. Returns {"overdue", "fines", "seconds"}, or None if a batch failed."""
+        now = now or datetime.now()
+        cutoff = datetime.combine(now.date(), datetime.min.time())
+        start = time.perf_counter()
+        result = {"overdue": 0, "fines": 0, "seconds": 0.0}
+        try:
+            while True:
+                picked, marked = self._mark_overdue_batch(cutoff, now)
+                result["overdue"] += marked
+                if picked < self.batch_size:
+                    break
+            result["fines"] = self._refresh_fines(now)
+        except DB_ERRORS as e:
+            print(f"Database error during overdue sweep: {e}")
+            self.db.conn.rollback()
+            return None
+        finally:
+            if result["overdue"]:
+                catalog_cache.bump_version()  # Book statuses changed
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    def _fine_sql(self):
+        days = self.db.engine.days_between("%s", "due_date")
+        rate = fine_rate_sql("user_type", "(SELECT category FROM books WHERE books.id = borrowing_history.book_id)")
+        return f"{days} * {rate}"
+
+    def _mark_overdue_batch(self, cutoff, now):
+        """Mark one batch. Returns (loans picked, loans marked)."""
+        cursor = self.db.conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT id FROM borrowing_history WHERE return_status = 'Active' AND due_date < %s "
+                "ORDER BY due_date LIMIT %s FOR UPDATE",
+                (cutoff, self.batch_size)
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                self.db.conn.rollback()
+                return 0, 0
+            in_ids = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"UPDATE borrowing_history SET return_status = 'Overdue', fine = {self._fine_sql()} "
+                f"WHERE id IN ({in_ids}) AND return_status = 'Active'",
+                (now, *ids)
+            )
+            marked = cursor.rowcount
+            cursor.execute(
+                "UPDATE books SET status = 'Overdue' WHERE status = 'Borrowed' AND id IN "
+                f"(SELECT book_id FROM borrowing_history WHERE id IN ({in_ids}) AND return_status = 'Overdue')",
+                ids
+            )
+            self.db._bump_counter(cursor, "overdue", "", marked)
+            self.db.conn.commit()
+            return len(ids), marked
+        finally:
+            cursor.close()
+
+    def _refresh_fines(self, now):
+        """Recompute the fine of every overdue loan, walking them in (due_date, id) order."""
+        updated, after = 0, None
+        cursor = self.db.conn.cursor()
+        try:
+            while True:
+                if after is None:
+                    cursor.execute(
+                        "SELECT id, due_date FROM borrowing_history WHERE return_status = 'Overdue' "
+                        "ORDER BY due_date, id LIMIT %s",
+                        (self.batch_size,)
+                    )
+                else:
+                    # The >= bound drives the index range; the OR only drops ties already done
+                    cursor.execute(
+                        "SELECT id, due_date FROM borrowing_history WHERE return_status = 'Overdue' "
+                        "AND due_date >= %s AND (due_date > %s OR id > %s) "
+                        "ORDER BY due_date, id LIMIT %s",
+                        (after[0], after[0], after[1], self.batch_size)
+                    )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                ids = [row[0] for row in rows]
+                cursor.execute(
+                    f"UPDATE borrowing_history SET fine = {self._fine_sql()} "
+                    f"WHERE id IN ({', '.join(['%s'] * len(ids))}) AND return_status = 'Overdue'",
+                    (now, *ids)
+                )
+                updated += cursor.rowcount
+                self.db.conn.commit()
+                if len(rows) < self.batch_size:
+                    break
+                after = (rows[-1][1], rows[-1][0])
+            return updated
+        finally:
+            cursor.close()
+
+
+def sweep_once(batch_size=SWEEP_BATCH):
+    db = DatabaseOperations()
+    try:
+        return OverdueSweeper(db, batch_size).sweep()
+    finally:
+        db.close_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark overdue loans and update their fines.")
+    parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH)
+    parser.add_argument("--every", type=float, default=None, metavar="SECONDS",
+                        help="keep running, sweeping again every SECONDS")
+    args = parser.parse_args()
+
+    while True:
+        result = sweep_once(args.batch_size)
+        if result is None:
+            print("Sweep failed.")
+            if args.every is None:
+                raise SystemExit(1)
+        else:
+            rows = result["overdue"] + result["fines"]
+            rate = rows / result["seconds"] if result["seconds"] else 0
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} marked {result['overdue']} overdue, "
+                  f"updated {result['fines']} fines in {result['seconds']:.2f}s ({rate:.0f} rows/s)")
+        if args.every is None:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from db import db_connection
+from db.cache import catalog_cache
+from db.db_connection import configure_engine, create_connection
+from db.db_operations import DatabaseOperations
+from db.events import BookBorrowed, subscribe
+from db.hashing import configure_hasher
+from utils.engine_parity import setup_mysql, teardown_mysql
+from utils.seeder import CATEGORIES, DEFAULT_PASSWORD, BulkSeeder
+
+# Microbenchmarks for DatabaseOperations.
+# Seeds a dataset at each scale factor (utils/seeder.py scale mode), times the
+# core operations and writes p50/p95/p99 latencies and rows/s to a JSON file.
+# With --baseline the run is compared against an earlier results file, and the
+# exit code is 1 if an operation got slower than --threshold.
+#
+#   python -m utils.benchmark                                   # embedded SQLite, scales 0.1 and 1
+#   python -m utils.benchmark --output baseline.json            # save a baseline
+#   python -m utils.benchmark --baseline baseline.json          # compare a change against it
+#   python -m utils.benchmark --engine mysql --scales 1 10      # scratch database on the DB_CONFIG server
+
+BENCHMARK_FILE = os.environ.get(
+    "INFOCHAN_BENCHMARK_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark_results.json")
+)
+BENCHMARK_DATABASE = os.environ.get("INFOCHAN_BENCHMARK_DATABASE", "library_db_bench")
+ITERATIONS = 100
+WARMUP = 5
+REGRESSION_THRESHOLD = 20.0  # Percent slower at p95 before a change counts as a regression
+REGRESSION_MIN_MS = 0.5      # ... and by at least this much, so sub-millisecond jitter is not flagged
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(samples):
+    """Turn [(seconds, rows)] into the reported numbers (latencies in ms)."""
+    latencies = sorted(seconds for seconds, _ in samples)
+    total_seconds = sum(latencies)
+    total_rows = sum(rows for _, rows in samples)
+    return {
+        "iterations": len(samples),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(total_seconds / len(samples) * 1000, 3),
+        "rows_per_call": round(total_rows / len(samples), 1),
+        "rows_per_s": round(total_rows / total_seconds, 1) if total_seconds else 0.0,
+    }
+
+
+def timed(call, iterations, warmup=WARMUP, before=None):
+    """Run call(i) warmup + iterations times. Returns [(seconds, rows)] for the timed runs.
+
+    before() runs untimed ahead of every call.
+    """
+    samples = []
+    for i in range(warmup + iterations):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = call(i)
+        seconds = time.perf_counter() - start
+        if i >= warmup:
+            samples.append((seconds, _row_count(result)))
+    return samples
+
+
+def _row_count(result):
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple):
+        return 1 if result and result[0] is True else 0  # (success, message)
+    return 1 if result else 0
+
+
+def _ids(db, query):
+    cursor = db.conn.cursor()
+    try:
+        cursor.execute(query)
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def run_operations(db, rng, iterations):
+    """Time every benchmarked operation. Returns {name: samples}."""
+    students = _ids(db, "SELECT id_number FROM students ORDER BY id")
+    student_ids = _ids(db, "SELECT id FROM students ORDER BY id")
+    results = {}
+
+    logins = [rng.choice(students) for _ in range(WARMUP + iterations)]
+    results["login_user"] = timed(lambda i: db.login_user("Student", logins[i], DEFAULT_PASSWORD), iterations)
+    # Catalog reads are timed against the database, then once more served by the catalog cache
+    results["get_all_books"] = timed(lambda i: db.get_all_books(), iterations, before=catalog_cache.clear)
+    results["get_all_books (cached)"] = timed(lambda i: db.get_all_books(), iterations)
+    categories = [rng.choice(CATEGORIES) for _ in range(WARMUP + iterations)]
+    results["search_books_by_category"] = timed(lambda i: db.search_books_by_category(categories[i]), iterations,
+                                                before=catalog_cache.clear)
+    histories = [rng.choice(student_ids) for _ in range(WARMUP + iterations)]
+    results["get_borrowing_history"] = timed(
+        lambda i: db.get_borrowing_history(histories[i], "Student", with_book_details=True), iterations
+    )
+    results["get_all_users"] = timed(lambda i: db.get_all_users(), iterations)
+
+    # Borrows go to students without open loans, one book each, so none is refused;
+    # the returns then close exactly those loans and leave the dataset as it was
+    free_students = _ids(db, """
+        SELECT id FROM students WHERE id NOT IN
+            (SELECT user_id FROM borrowing_history WHERE user_type = 'Student' AND return_status IN ('Active', 'Overdue'))
+        ORDER BY id
+    """)
+    available = _ids(db, "SELECT id FROM books WHERE status = 'Available' ORDER BY id")
+    count = min(WARMUP + iterations, len(free_students), len(available))
+    if count <= WARMUP:
+        print("  not enough free students or available books to time borrow_book/return_book")
+        return results
+    borrowers = rng.sample(free_students, count)
+    books = rng.sample(available, count)
+    loans = []
+    unsubscribe = subscribe(BookBorrowed, lambda event: loans.append((event.record_id, event.book_id)))
+    try:
+        results["borrow_book"] = timed(
+            lambda i: db.borrow_book(borrowers[i], "Student", books[i], datetime.now()), count - WARMUP
+        )
+    finally:
+        unsubscribe()
+    results["return_book"] = timed(lambda i: db.return_book(*loans[i]), len(loans) - WARMUP)
+    return results
+
+
+def provision(engine_name, scale, seed, directory):
+    """Create and seed a fresh database for one scale. Returns the seeding report, or None."""
+    if engine_name == "sqlite":
+        configure_engine("sqlite", path=os.path.join(directory, f"bench_{scale}.sqlite3"))
+    elif not setup_mysql(BENCHMARK_DATABASE):
+        return None
+    conn = create_connection()
+    try:
+        report = BulkSeeder(conn, scale, seed).run()
+    finally:
+        conn.close()
+    db = DatabaseOperations()
+    try:
+        db.reconcile_counters()
+    finally:
+        db.close_connection()
+    return {table: {"rows": rows, "rows_per_s": round(rows / seconds, 1) if seconds else 0.0}
+            for table, rows, seconds in report}
+
+
+def run_scale(engine_name, scale, seed, iterations, directory):
+    print(f"Scale {scale}: seeding...")
+    seeding = provision(engine_name, scale, seed, directory)
+    if seeding is None:
+        return None
+    print(f"  seeded {sum(table['rows'] for table in seeding.values()):,} rows")
+    db = DatabaseOperations()
+    try:
+        results = run_operations(db, random.Random(seed), iterations)
+    finally:
+        db.close_connection()
+        db_connection.get_pool().close_all()
+        if engine_name == "mysql":
+            teardown_mysql(BENCHMARK_DATABASE)
+    operations = {name: summarize(samples) for name, samples in results.items()}
+    for name, stats in operations.items():
+        print(f"  {name:<26} p50 {stats['p50_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms  "
+              f"p99 {stats['p99_ms']:>9.3f} ms  {stats['rows_per_s']:>12,.0f} rows/s")
+    return {"seeding": seeding, "operations": operations}
+
+
+def compare(results, baseline, threshold):
+    """Print p50/p95 changes against the baseline. Returns the number of regressions."""
+    regressions = 0
+    print(f"\nCompared with the baseline from {baseline['meta']['created_at']} (threshold {threshold:.0f}%):")
+    for scale, scale_results in results["scales"].items():
+        base_scale = baseline["scales"].get(scale)
+        if not base_scale:
+            print(f"  scale {scale}: not in the baseline")
+            continue
+        for name, stats in scale_results["operations"].items():
+            base = base_scale["operations"].get(name)
+            if not base:
+                continue
+            change50 = (stats["p50_ms"] / base["p50_ms"] - 1) * 100 if base["p50_ms"] else 0.0
+            change95 = (stats["p95_ms"] / base["p95_ms"] - 1) * 100 if base["p95_ms"] else 0.0
+            delta95 = stats["p95_ms"] - base["p95_ms"]
+            verdict = ""
+            if change95 > threshold and delta95 >= REGRESSION_MIN_MS:
+                verdict = "SLOWER"
+                regressions += 1
+            elif change95 < -threshold and -delta95 >= REGRESSION_MIN_MS:
+                verdict = "faster"
+            print(f"  scale {scale} {name:<26} p50 {base['p50_ms']:.3f} -> {stats['p50_ms']:.3f} ms "
+                  f"({change50:+.0f}%)  p95 {base['p95_ms']:.3f} -> {stats['p95_ms']:.3f} ms ({change95:+.0f}%)  {verdict}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time DatabaseOperations at several dataset sizes.")
+    parser.add_argument("--engine", choices=["sqlite", "mysql"], default="sqlite",
+                        help="sqlite runs on a temp file with no server; mysql uses a scratch database")
+    parser.add_argument("--scales", nargs="+", type=float, default=[0.1, 1.0], help="seeder scale factors")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS, help="timed calls per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bcrypt-rounds", type=int, default=4,
+                        help="work factor of the seeded passwords, so login_user times the database more than bcrypt")
+    parser.add_argument("--output", default=BENCHMARK_FILE, help="where to write the results")
+    parser.add_argument("--baseline", default=None, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="percent p95 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    configure_hasher(rounds=args.bcrypt_rounds)
+    results = {
+        "meta": {
+            "created_at": datetime.now().isoformat(" ", "seconds"),
+            "engine": args.engine,
+            "iterations": args.iterations,
+            "seed": args.seed,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            scale_results = run_scale(args.engine, scale, args.seed, args.iterations, directory)
+            if scale_results is None:
+                sys.exit(1)
+            results["scales"][str(scale)] = scale_results
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["meta"]["engine"] != args.engine:
+            print(f"Note: the baseline ran on {baseline['meta']['engine']}, this run on {args.engine}.")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{regressions} operation(s) slower than the baseline.")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import threading
+import time
+from datetime import datetime
+
+from db.db_connection import configure_pool
+from db.db_operations import DatabaseOperations
+from db.policy import policy_for
+
+# Concurrency check for DatabaseOperations.borrow_book.
+# Every round adds a fresh book, lets N threads (one per student) try to borrow
+# it at the same instant and asserts that exactly one of them wins. The test
+# book and its loan are deleted afterwards.
+#
+#   python -m utils.borrow_stress --threads 20 --rounds 10
+
+TEST_CATEGORY = "Education"
+
+
+def create_test_book(db, round_no):
+    isbn = f"9{int(time.time() * 1000) % 10 ** 9:09d}{round_no:03d}"
+    if not db.add_book(TEST_CATEGORY, f"Borrow stress test {round_no}", "1st Edition", "InfoChan", "Stress Test", isbn):
+        raise RuntimeError("could not create the test book")
+    cursor = db.conn.cursor()
+    try:
+        cursor.execute("SELECT id FROM books WHERE isbn = %s", (isbn,))
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def delete_test_book(db, book_id):
+    cursor = db.conn.cursor()
+    try:
+        cursor.execute("SELECT id FROM borrowing_history WHERE book_id = %s AND return_status = 'Active'", (book_id,))
+        for (record_id,) in cursor.fetchall():
+            db.return_book(record_id, book_id)  # Keeps the circulation counters straight
+        cursor.execute("DELETE FROM borrowing_history WHERE book_id = %s", (book_id,))
+        cursor.execute("DELETE FROM books WHERE id = %s", (book_id,))
+        db._bump_counter(cursor, "books", "", -1)
+        db.conn.commit()
+    finally:
+        cursor.close()
+
+
+def pick_students(db, count):
+    """Students with room under the borrowing limit, so only availability decides the winner."""
+    cursor = db.conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT s.id FROM students s
+            WHERE (SELECT COUNT(*) FROM borrowing_history bh
+                   WHERE bh.user_id = s.id AND bh.user_type = 'Student'
+                     AND bh.return_status IN ('Active', 'Overdue')) < %s
+            ORDER BY s.id LIMIT %s
+        """, (policy_for("Student", TEST_CATEGORY).max_loans, count))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def run_round(book_id, students):
+    """Returns ([(success, message)], seconds); success is None for an attempt that raised."""
+    barrier = threading.Barrier(len(students))
+    results = [None] * len(students)
+
+    def attempt(i, user_id):
+        db = None
+        try:
+            db = DatabaseOperations()
+            barrier.wait()
+            results[i] = db.borrow_book(user_id, "Student", book_id, datetime.now())
+        except Exception as e:
+            barrier.abort()  # Release the threads still waiting for this one
+            results[i] = (None, f"{type(e).__name__}: {e}")
+        finally:
+            if db:
+                db.close_connection()
+
+    threads = [threading.Thread(target=attempt, args=(i, user_id)) for i, user_id in enumerate(students)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Race many threads to borrow the same book.")
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    configure_pool(size=args.threads + 1)
+    db = DatabaseOperations()
+    try:
+        students = pick_students(db, args.threads)
+        if len(students) < 2:
+            print("Need at least 2 students with free borrowing slots. Run the seeder first.")
+            return
+        if len(students) < args.threads:
+            print(f"Only {len(students)} eligible students, using {len(students)} threads.")
+
+        attempts, elapsed_total, failures = 0, 0.0, 0
+        for round_no in range(args.rounds):
+            book_id = create_test_book(db, round_no)
+            try:
+                results, elapsed = run_round(book_id, students)
+            finally:
+                delete_test_book(db, book_id)
+            winners = sum(1 for success, _ in results if success)
+            errors = [message for success, message in results if success is None]
+            attempts += len(results)
+            elapsed_total += elapsed
+            status = "ok" if winners == 1 and not errors else "FAILED"
+            if status != "ok":
+                failures += 1
+            print(f"Round {round_no + 1}: {winners} winner(s) out of {len(results)} in {elapsed * 1000:.1f} ms [{status}]")
+            for message in errors:
+                print(f"  attempt raised {message}")
+
+        print(f"Borrow attempts: {attempts} in {elapsed_total:.2f}s ({attempts / elapsed_total:.0f} attempts/s)")
+        assert failures == 0, f"{failures} round(s) did not have exactly one winner or had attempts that raised"
+        print("Exactly one winner in every round.")
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import argparse
+import heapq
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from db import db_connection
+from db.archive import HistoryArchiver
+from db.cache import catalog_cache
+from db.db_connection import configure_engine, create_connection
+from db.db_operations import DatabaseOperations
+from db.engines import DB_ERRORS
+from db.hashing import configure_hasher
+from db.migrations import upgrade
+from db.policy import policy_for
+from utils.seeder import CATEGORIES, generate_history
+
+# Parity check for the storage engines.
+# Runs the same DatabaseOperations scenario against a scratch database on each
+# engine and compares the results step by step. MySQL uses a throwaway database
+# (dropped afterwards) on the server in DB_CONFIG; SQLite uses a temp file.
+# The seeder's history generator is checked too, against the same loan rules.
+#
+#   python -m utils.engine_parity                    # sqlite, plus mysql if reachable
+#   python -m utils.engine_parity --engines sqlite   # check one engine on its own
+
+PARITY_DATABASE = os.environ.get("INFOCHAN_PARITY_DATABASE", "library_db_parity")
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_schema.txt")
+
+BOOKS = [
+    ("Fiction", "Noli Me Tangere", "1st Edition", "Berliner", "Jose Rizal", "9780000000001"),
+    ("Fiction", "El Filibusterismo", "1st Edition", "Ghent", "Jose Rizal", "9780000000002"),
+    ("Science", "Cosmos", "2nd Edition", "Random House", "Carl Sagan", "9780000000003"),
+    ("History", "A People's History", "3rd Edition", "Harper", "Howard Zinn", "9780000000004"),
+    ("Technology", "The Pragmatic Programmer", "2nd Edition", "Addison-Wesley", "Hunt", "9780000000005"),
+    ("Arts", "The Story of Art", "16th Edition", "Phaidon", "E. H. Gombrich", "9780000000006"),
+    ("Education", "Pedagogy of the Oppressed", "1st Edition", "Continuum", "Paulo Freire", "9780000000007"),
+]
+BORROWED_AT = datetime(2024, 6, 3, 9, 30)
+
+
+def normalize(value, started):
+    """Make results comparable: Decimals as text, times taken from the clock as <now>."""
+    if isinstance(value, dict):
+        return {key: normalize(item, started) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item, started) for item in value]
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    if isinstance(value, datetime):
+        return "<now>" if value >= started else value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def scenario(db):
+    """Every public operation, in an order that exercises the success and failure paths."""
+    steps = []
+
+    def step(name, result):
+        steps.append((name, result))
+        return result
+
+    step("register student", db.register_user("Student", "Ana Santos", "100001", "secret", "STEM", "Grade 11"))
+    step("register student 2", db.register_user("Student", "Ben Cruz", "100002", "secret", "ABM", "Grade 12"))
+    step("register instructor", db.register_user("Instructor", "Carla Reyes", "200001", "secret"))
+    step("register admin", db.register_user("Admin", "Dan Lim", "300001", "secret"))
+    step("register duplicate id", db.register_user("Student", "Ana Again", "100001", "secret", "GAS", "Grade 7"))
+    step("login ok", db.login_user("Student", "100001", "secret"))
+    step("login wrong password", db.login_user("Student", "100001", "wrong"))
+    step("login unknown user", db.login_user("Admin", "999999", "secret"))
+
+    for category, title, edition, publication, author, isbn in BOOKS:
+        step(f"add {isbn}", db.add_book(category, title, edition, publication, author, isbn))
+    step("add duplicate isbn", db.add_book("Arts", "Copy", "1st", "X", "Y", BOOKS[0][5]))
+    step("update book", db.update_book(3, "Science", "Cosmos (Revised)", "3rd Edition", "Ballantine", "Carl Sagan",
+                                       "9780000000003"))
+    step("update missing book", db.update_book(999, "Arts", "None", "1", "X", "Y", "9789999999999"))
+
+    token = db.get_changes_since()["token"]
+    step("books page 1", db.get_books_page(page_size=3))
+    step("books page 2", db.get_books_page(after_id=3, page_size=3))
+    step("books by category", db.search_books_by_category("Fiction"))
+    step("books by status", db.get_books_page(status="Available"))
+    step("all books", db.get_all_books())
+
+    step("borrow", db.borrow_book(1, "Student", 1, BORROWED_AT))
+    step("borrow taken book", db.borrow_book(2, "Student", 1, BORROWED_AT))
+    for book_id in range(2, 6):
+        step(f"borrow {book_id}", db.borrow_book(1, "Student", book_id, BORROWED_AT))
+    step("borrow over limit", db.borrow_book(1, "Student", 6, BORROWED_AT))
+    step("instructor borrow", db.borrow_book(1, "Instructor", 6, BORROWED_AT))
+    step("available books", db.get_available_books())
+    step("due soon", db.get_loans_due_soon(now=BORROWED_AT + timedelta(days=5)))
+    step("due soon for student", db.get_loans_due_soon(3, 1, "Student", now=BORROWED_AT + timedelta(days=5)))
+    step("overdue loans", db.get_overdue_loans(now=BORROWED_AT + timedelta(days=9)))
+    step("stats after borrows", db.get_dashboard_stats())
+
+    step("return", db.return_book(1, 1))
+    step("return again", db.return_book(1, 1))
+    step("late return settled", db.get_borrowing_history_page(0, page_size=1)[0][0][7])
+    step("stats after return", db.get_dashboard_stats())
+
+    changes = db.get_changes_since(token)
+    step("changed books", sorted(changes["books"]))
+    step("changed history", sorted(changes["history"]))
+    step("changes truncated", changes["truncated"])
+
+    step("history", db.get_borrowing_history())
+    step("history of student", db.get_borrowing_history(1, "Student", with_book_details=True))
+    step("history page", db.get_borrowing_history_page(page_size=2))
+    step("history by status", db.get_borrowing_history_page(return_status=["Active", "Overdue"]))
+    step("users page", db.get_users_page(page_size=2))
+    step("users page 2", db.get_users_page(after=("Student", 2), page_size=2))
+    step("all users", db.get_all_users())
+    step("instructors", db.get_all_users("Instructor"))
+    # after_days=-1 moves everything returned before tomorrow, i.e. the loan returned above
+    step("archive", HistoryArchiver(db, after_days=-1).archive()["archived"])
+    step("hot history", db.get_borrowing_history())
+    step("history with archive", db.get_borrowing_history(1, "Student", with_book_details=True, include_archive=True))
+    step("counted stats", db.count_dashboard_stats())
+    step("reconciled stats", db.reconcile_counters())
+    step("stats after reconcile", db.get_dashboard_stats())
+    return steps
+
+
+def setup_sqlite(directory):
+    configure_engine("sqlite", path=os.path.join(directory, "parity.sqlite3"))
+    return True
+
+
+def setup_mysql(database=PARITY_DATABASE):
+    """Create an empty scratch database with the base schema and every migration."""
+    engine = configure_engine("mysql", database=None)
+    try:
+        conn = engine.connect()
+    except DB_ERRORS as e:
+        print(f"mysql: not reachable ({e})")
+        return False
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+        cursor.execute(f"CREATE DATABASE {database}")
+        cursor.execute(f"USE {database}")
+        with open(SCHEMA_FILE) as schema:
+            lines = [line.split("--")[0] for line in schema]
+        for statement in "\n".join(lines).split(";"):
+            if statement.strip():
+                cursor.execute(statement)
+        conn.commit()
+        upgrade(conn, engine=engine)
+    finally:
+        cursor.close()
+        conn.close()
+    configure_engine("mysql", database=database)
+    return True
+
+
+def teardown_mysql(database=PARITY_DATABASE):
+    conn = create_connection()
+    if conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+        cursor.close()
+        conn.close()
+
+
+def run(engine_name, directory):
+    if engine_name == "sqlite":
+        ready = setup_sqlite(directory)
+    else:
+        ready = setup_mysql()
+    if not ready:
+        return None
+    catalog_cache.clear()
+    started = datetime.now().replace(microsecond=0)
+    db = DatabaseOperations()
+    try:
+        return [(name, normalize(result, started)) for name, result in scenario(db)]
+    finally:
+        db.close_connection()
+        db_connection.get_pool().close_all()
+        if engine_name == "mysql":
+            teardown_mysql()
+
+
+def check_invariants(engine_name, steps):
+    """Results that must hold on any engine, so a single engine is still checked."""
+    results = dict(steps)
+    expected = {
+        "register duplicate id": False,
+        "login wrong password": None,
+        "add duplicate isbn": False,
+        "update missing book": False,
+        "borrow": [True, "Book borrowed successfully"],
+        "borrow taken book": [False, "Book is not available"],
+        "borrow over limit": [False, "Cannot borrow more than 5 books at a time"],
+        "return again": [False, "Loan was already returned"],
+        "late return settled": "Returned Late",
+        "archive": 1,
+        "changes truncated": False,
+    }
+    failures = [name for name, value in expected.items() if results[name] != value]
+    if results["counted stats"] != results["stats after reconcile"]:
+        failures.append("counted stats")
+    # Students' loans fall due after 7 days, the instructor's after 14
+    if len(results["due soon"]) != 5 or len(results["overdue loans"]) != 5:
+        failures.append("overdue loans")
+    # Archived loans read back unchanged
+    if results["history with archive"] != results["history of student"]:
+        failures.append("history with archive")
+    for name in failures:
+        print(f"{engine_name}: unexpected result for '{name}': {results[name]!r}")
+    return not failures
+
+
+def check_generated_history(count=50000, seed=42):
+    """Seeded loans must obey the rules borrow_book enforces: one loan per book at a time, max_loans per user."""
+    users = [(n, "Instructor" if n % 20 == 0 else "Student") for n in range(1, 1001)]
+    books = [(n, CATEGORIES[n % len(CATEGORIES)]) for n in range(1, 5001)]
+    categories = dict(books)
+    rows = list(generate_history(count, users, books, datetime(2024, 6, 3, 12), np.random.default_rng(seed)))
+    book_back, user_loans = {}, {}
+    failures = 0
+    for user_id, user_type, book_id, borrowed, _, returned, _, _, _ in rows:
+        back = returned or datetime.max
+        if book_back.get(book_id, datetime.min) > borrowed:
+            failures += 1
+            print(f"history generator: book {book_id} lent again at {borrowed} while still out")
+        book_back[book_id] = back
+        loans = user_loans.setdefault((user_id, user_type), [])
+        while loans and loans[0] <= borrowed:
+            heapq.heappop(loans)
+        max_loans = policy_for(user_type, categories[book_id]).max_loans
+        if len(loans) >= max_loans:
+            failures += 1
+            print(f"history generator: {user_type} {user_id} borrowed past {max_loans} loans at {borrowed}")
+        heapq.heappush(loans, back)
+    print(f"history generator: {len(rows)} loans")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check DatabaseOperations gives the same results on every engine.")
+    parser.add_argument("--engines", nargs="+", choices=["sqlite", "mysql"], default=None,
+                        help="engines to check (default: sqlite, and mysql when reachable)")
+    args = parser.parse_args()
+    engines = args.engines or ["sqlite", "mysql"]
+
+    configure_hasher(rounds=4)  # Hash cost is irrelevant here
+    if not check_generated_history():
+        sys.exit(1)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for engine_name in engines:
+            steps = run(engine_name, directory)
+            if steps is None:
+                if args.engines:
+                    sys.exit(1)
+                continue
+            print(f"{engine_name}: {len(steps)} steps")
+            if not check_invariants(engine_name, steps):
+                sys.exit(1)
+            results[engine_name] = steps
+
+    names = list(results)
+    mismatches = 0
+    for other in names[1:]:
+        for (step, expected), (_, actual) in zip(results[names[0]], results[other]):
+            if expected != actual:
+                mismatches += 1
+                print(f"MISMATCH {step}:\n  {names[0]}: {expected!r}\n  {other}: {actual!r}")
+    if mismatches:
+        print(f"{mismatches} step(s) differ between engines.")
+        sys.exit(1)
+    if len(names) > 1:
+        print(f"All steps match across {', '.join(names)}.")
+    else:
+        print(f"Only {names[0]} was checked.")
+
+
+if __name__ == "__main__":
+    main()
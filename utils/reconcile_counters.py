@@ -0,0 +1,28 @@
+from db.db_operations import DatabaseOperations
+
+
+def main():
+    """Rebuild the circulation_counters table from the base tables."""
+    try:
+        db = DatabaseOperations()
+    except Exception as e:
+        print(f"Failed to connect to the database: {e}")
+        return
+    try:
+        print("Reconciling circulation counters...")
+        stats = db.reconcile_counters()
+        if stats is None:
+            print("Reconcile failed.")
+            return
+        print(f"Books: {stats['total_books']}")
+        print(f"Active loans: {stats['borrowed_books']} ({stats['overdue']} overdue)")
+        for category, count in sorted(stats["categories"].items()):
+            print(f"  {category}: {count}")
+        print(f"Users: {stats['students']} students, {stats['instructors']} instructors, {stats['admins']} admins")
+        print("Reconcile completed.")
+    finally:
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
-import pymysql
+import argparse
+import os
+import tempfile
+import time
+from functools import lru_cache
 from faker import Faker
-import bcrypt
+import numpy as np
 import random
-from datetime import datetime, timedelta
-from db.db_connection import create_connection
+from datetime import datetime
+from db.db_connection import configure_engine, create_connection, get_engine
+from db.engines import DB_ERRORS
+from db.hashing import hash_password as bcrypt_hash
+from db.policy import policy_for
+from utils.reconcile_counters import main as reconcile_counters
 
 fake = Faker()
 
+DEFAULT_PASSWORD = 'password123'  # Default password for dummy users
 
+
+@lru_cache(maxsize=None)
 def hash_password(password):
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    # Every dummy user shares the default password, so bcrypt runs once per seeding run
+    return bcrypt_hash(password)
 
 
 def generate_unique_id_number(existing_ids, length=6):
@@ -26,7 +38,7 @@ def seed_admins(conn, count=5):
     for _ in range(count):
         full_name = fake.name()
         id_number = generate_unique_id_number(existing_ids)
-        password = hash_password('password123')  # Default password for dummy users
+        password = hash_password(DEFAULT_PASSWORD)
         cursor.execute(
             "INSERT INTO admins (full_name, id_number, password) VALUES (%s, %s, %s)",
             (full_name, id_number, password)
@@ -41,7 +53,7 @@ def seed_instructors(conn, count=10):
     for _ in range(count):
         full_name = fake.name()
         id_number = generate_unique_id_number(existing_ids)
-        password = hash_password('password123')
+        password = hash_password(DEFAULT_PASSWORD)
         cursor.execute(
             "INSERT INTO instructors (full_name, id_number, password) VALUES (%s, %s, %s)",
             (full_name, id_number, password)
@@ -58,7 +70,7 @@ def seed_students(conn, count=30):
     for _ in range(count):
         full_name = fake.name()
         id_number = generate_unique_id_number(existing_ids)
-        password = hash_password('password123')
+        password = hash_password(DEFAULT_PASSWORD)
         strand = random.choice(strands)
         grade_level = random.choice(grade_levels)
         cursor.execute(
@@ -94,51 +106,454 @@ def seed_books(conn, count=40):
     cursor.close()
 
 
-def seed_borrowing_history(conn, count=15):
+# --- Workload shape ---
+# Borrowing is not uniform: a few titles account for most loans, some users
+# borrow far more than others, and activity follows the school calendar.
+# generate_history draws that with NumPy and hands out the books (one copy
+# each) in a single pass, so 10M loans take about a minute.
+BOOK_SKEW = 0.8            # Zipf exponent of book popularity (0 = every book equally likely)
+USER_SKEW = 1.0            # Sigma of the lognormal per-user activity level (0 = every user equally active)
+HISTORY_DAYS = 730         # History spans the last two years
+OPEN_WINDOW_DAYS = 30      # Loans borrowed this recently may still be out
+HISTORY_CHUNK = 1000000    # Loans generated per vectorised step
+RESAMPLE_TRIES = 8         # Other books (users) tried, by weight and then uniformly, when one is out (at its limit)
+
+# Relative borrowing per month (Jan..Dec): the June-March school year with
+# exam peaks in October and March, and the April-May break
+MONTH_WEIGHTS = (1.0, 1.1, 1.5, 0.3, 0.2, 0.9, 1.0, 1.1, 1.2, 1.6, 1.1, 0.6)
+# Relative borrowing per weekday (Mon..Sun); the library is closed on Sunday
+WEEKDAY_WEIGHTS = (1.2, 1.1, 1.1, 1.0, 0.9, 0.3, 0.0)
+OPENING_HOURS = (7, 17)
+
+ROLES = ('Student', 'Instructor')
+CATEGORIES = ['Fiction', 'Science', 'History', 'Technology', 'Arts', 'Education']
+CONDITIONS = ['Excellent', 'Good', 'Fair']
+
+
+def popularity(count, skew, rng):
+    """Zipf weights over count items, with the ranks shuffled so popular items are spread over the ids."""
+    ranks = rng.permutation(count) + 1
+    weights = ranks.astype(float) ** -skew
+    return weights / weights.sum()
+
+
+def activity(count, skew, rng):
+    """Lognormal activity weights over count users."""
+    weights = rng.lognormal(0.0, skew, count) if skew else np.ones(count)
+    return weights / weights.sum()
+
+
+def day_weights(first_day, days, seasonal):
+    """Weights of days first_day .. first_day + days - 1 (numpy datetime64[D])."""
+    dates = first_day + np.arange(days)
+    if not seasonal:
+        return np.full(days, 1.0 / days)
+    months = dates.astype("datetime64[M]").astype(int) % 12
+    weekdays = (dates.astype(int) + 3) % 7  # 1970-01-01 was a Thursday
+    weights = np.array(MONTH_WEIGHTS)[months] * np.array(WEEKDAY_WEIGHTS)[weekdays]
+    return weights / weights.sum()
+
+
+def _draws(rng, count, p=None, block=4096):
+    """Endless stream of indices below count, drawn with weights p (uniform if None)."""
+    while True:
+        yield from rng.choice(count, size=block, p=p).tolist()
+
+
+def generate_history(count, users, books, now, rng, book_skew=BOOK_SKEW, user_skew=USER_SKEW, seasonal=True,
+                     days=HISTORY_DAYS, chunk_size=HISTORY_CHUNK):
+    """Yield up to count borrowing_history rows in borrowing order, ending at now.
+
+    users are (id, user_type) pairs and books (id, category) pairs. Borrowers
+    and books are drawn with the activity and popularity weights, borrow days
+    with the seasonal weights (during OPENING_HOURS). Due dates, statuses and
+    fines follow the loan policy. Every book is a single copy, so a loan whose
+    book is still out is given another book, drawn by popularity and then
+    uniformly (RESAMPLE_TRIES each). Likewise a loan whose borrower already
+    holds the policy's max_loans goes to another borrower. If no free book or
+    borrower turns up the loan is left out. A recent loan may stay out
+    (Active, or Overdue past its due date), after which its book is not lent
+    again and it keeps counting against its borrower. Values come only from
+    rng, now and the arguments.
+    """
+    if not count or not users or not books:
+        return
+    user_ids = np.array([user[0] for user in users])
+    user_roles = np.array([ROLES.index(user[1]) for user in users])
+    book_ids = np.array([book[0] for book in books])
+    book_categories = np.array([CATEGORIES.index(book[1]) for book in books])
+    # Loan days and fine rate of every (role, category) pair
+    policies = [[policy_for(role, category) for category in CATEGORIES] for role in ROLES]
+    loan_days = np.array([[policy.loan_days for policy in row] for row in policies])
+    max_loans_of = [[policy.max_loans for policy in row] for row in policies]
+    fine_rates = np.array([[float(policy.fine_per_day) for policy in row] for row in policies])
+    user_p = activity(len(users), user_skew, rng)
+    book_p = popularity(len(books), book_skew, rng)
+
+    # Borrow times in seconds since the epoch, sorted so ids follow borrowing order
+    now_s = int(np.datetime64(now, "s").astype(np.int64))
+    today = now_s // 86400
+    first_day = np.datetime64(now.date(), "D") - (days - 1)
+    day = rng.choice(days, size=count, p=day_weights(first_day, days, seasonal)) + first_day.astype(np.int64)
+    borrowed = day * 86400 + rng.integers(OPENING_HOURS[0] * 3600, OPENING_HOURS[1] * 3600, count)
+    borrowed = np.sort(np.where(borrowed > now_s, borrowed - 86400, borrowed))  # Today only up to now
+    open_from = now_s - OPEN_WINDOW_DAYS * 86400
+
+    # When each book is back on the shelf, and when each user's loans come back;
+    # a loan still out keeps its book (and its place in the user's limit) forever
+    never = now_s + 1
+    free_at = [0] * len(books)
+    out_until = [[] for _ in users]
+    popular, anywhere = _draws(rng, len(books), book_p), _draws(rng, len(books))
+    active, anyone = _draws(rng, len(users), user_p), _draws(rng, len(users))
+    category_of = book_categories.tolist()
+    role_of = user_roles.tolist()
+    loan_days_of = loan_days.tolist()
+    role_names = np.array(ROLES, dtype=object)
+    conditions = np.array(CONDITIONS, dtype=object)
+    for start in range(0, count, chunk_size):
+        borrowed_at = borrowed[start:start + chunk_size]
+        size = len(borrowed_at)
+        wanted_user = rng.choice(len(users), size=size, p=user_p)
+        wanted = rng.choice(len(books), size=size, p=book_p)
+        days_out = rng.random(size)  # Position in the 1 .. loan days + 3 return window
+        second = rng.integers(0, 86400, size)
+        stays_out = rng.random(size) < 0.5
+
+        # Books are handed out in borrowing order, so each loan sees the returns before it
+        user = np.empty(size, dtype=np.int64)
+        book = np.empty(size, dtype=np.int64)
+        returned = np.empty(size, dtype=np.int64)
+        is_open = np.zeros(size, dtype=bool)
+        kept = np.ones(size, dtype=bool)
+        for i, (at, u, b, d, sec, out) in enumerate(zip(borrowed_at.tolist(), wanted_user.tolist(), wanted.tolist(),
+                                                        days_out.tolist(), second.tolist(), stays_out.tolist())):
+            if free_at[b] > at:
+                b = _redraw(lambda b: free_at[b] <= at, popular, anywhere)
+                if b is None:
+                    kept[i] = False
+                    continue
+            category = category_of[b]
+            if not _has_room(out_until, u, at, max_loans_of[role_of[u]][category]):
+                u = _redraw(lambda u: _has_room(out_until, u, at, max_loans_of[role_of[u]][category]), active, anyone)
+                if u is None:
+                    kept[i] = False
+                    continue
+            period = loan_days_of[role_of[u]][category]
+            back = at + (1 + int(d * (period + 3))) * 86400 + sec
+            user[i], book[i] = u, b
+            if back > now_s or (out and at >= open_from):
+                is_open[i] = True
+                returned[i] = now_s
+                back = never
+            else:
+                returned[i] = back
+            free_at[b] = back
+            out_until[u].append(back)
+
+        borrowed_at, user, book = borrowed_at[kept], user[kept], book[kept]
+        role = user_roles[user]
+        returned, is_open = returned[kept], is_open[kept]
+        size = len(borrowed_at)
+        period, rate = loan_days[role, book_categories[book]], fine_rates[role, book_categories[book]]
+        due = borrowed_at + period * 86400
+        late_days = np.maximum(0, np.where(is_open, today, returned // 86400) - due // 86400)
+        status = np.where(is_open, np.where(late_days > 0, "Overdue", "Active"),
+                          np.where(late_days > 0, "Returned Late", "Returned")).astype(object)
+        condition = np.where(is_open, "-", conditions[rng.integers(0, len(CONDITIONS), size)]).astype(object)
+        fine = np.round(late_days * rate, 2)
+        returned_at = returned.astype("datetime64[s]").astype(object)
+        returned_at[is_open] = None
+
+        yield from zip(user_ids[user].tolist(), role_names[role].tolist(), book_ids[book].tolist(),
+                       borrowed_at.astype("datetime64[s]").tolist(), due.astype("datetime64[s]").tolist(),
+                       returned_at.tolist(), status.tolist(), condition.tolist(), fine.tolist())
+
+
+def _redraw(fits, weighted, uniform):
+    """The first index for which fits() holds, drawn from weighted and then uniform; None if none turns up."""
+    for draws in (weighted, uniform):
+        for _ in range(RESAMPLE_TRIES):
+            index = next(draws)
+            if fits(index):
+                return index
+    return None
+
+
+def _has_room(out_until, user, at, max_loans):
+    """Whether user holds fewer than max_loans loans at time at (dropping the ones back by then)."""
+    loans = out_until[user]
+    if len(loans) >= max_loans:
+        loans[:] = [back for back in loans if back > at]
+    return len(loans) < max_loans
+
+
+def seed_borrowing_history(conn, count=15, book_skew=BOOK_SKEW, user_skew=USER_SKEW, seasonal=True, seed=None):
+    """Add count loans over the last HISTORY_DAYS, shaped by the workload options (see generate_history)."""
     cursor = conn.cursor()
     cursor.execute(
         "SELECT id, user_type FROM (SELECT id, 'Student' AS user_type FROM students UNION SELECT id, 'Instructor' AS user_type FROM instructors) AS users")
     users = cursor.fetchall()
-    cursor.execute("SELECT id FROM books")
-    book_ids = [row[0] for row in cursor.fetchall()]
-
-    conditions = ['Excellent', 'Good', 'Fair', '-']
-    statuses = ['Active', 'Returned', 'Returned Late', 'Overdue']
+    cursor.execute("SELECT id, category FROM books")
+    books = cursor.fetchall()
 
-    for _ in range(count):
-        user = random.choice(users)
-        user_id, user_type = user
-        book_id = random.choice(book_ids)
-        date_borrowed = fake.date_time_between(start_date='-1y', end_date='now')
-        date_returned = None
-        return_status = 'Active'
-        condition = '-'
-        fine = 0.00
-
-        if random.random() < 0.6:  # 60% chance of having returned
-            date_returned = date_borrowed + timedelta(days=random.randint(1, 30))
-            return_status = random.choice(['Returned', 'Returned Late'])
-            condition = random.choice(conditions)
-            if return_status == 'Returned Late':
-                fine = round(random.uniform(5.00, 50.00), 2)
-            elif random.random() < 0.2:  # 20% chance of fine even if returned
-                fine = round(random.uniform(5.00, 20.00), 2)
-        elif random.random() < 0.2:  # 20% chance of overdue for active loans
-            return_status = 'Overdue'
-            fine = round(random.uniform(10.00, 100.00), 2)
-
-        cursor.execute(
-            """
-            INSERT INTO borrowing_history (user_id, user_type, book_id, date_borrowed, date_returned, return_status, `condition`, fine)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-            (user_id, user_type, book_id, date_borrowed, date_returned, return_status, condition, fine)
-        )
+    rows = generate_history(count, users, books, datetime.now().replace(microsecond=0), np.random.default_rng(seed),
+                            book_skew, user_skew, seasonal)
+    cursor.executemany(
+        """
+        INSERT INTO borrowing_history (user_id, user_type, book_id, date_borrowed, due_date, date_returned, return_status, `condition`, fine)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        list(rows)
+    )
     conn.commit()
     cursor.close()
 
 
+# --- Scale-factor mode ---
+# python -m utils.seeder --scale N fills an empty database with N times the rows
+# below, for benchmarks. Rows are streamed in batches (executemany, or LOAD DATA
+# LOCAL INFILE on MySQL with --load-data) and everything derives from --seed and
+# --as-of, so the same arguments give the same data.
+SCALE_ROWS = {
+    "admins": 10,
+    "instructors": 100,
+    "students": 2000,
+    "books": 10000,
+    "borrowing_history": 100000,
+}
+SEED_BATCH = 5000          # Rows per executemany call
+NAME_POOL = 2000           # Distinct generated names/titles mixed into the rows
+
+STRANDS = ['STEM', 'ABM', 'HUMSS', 'GAS']
+GRADE_LEVELS = ['Grade 7', 'Grade 8', 'Grade 9', 'Grade 10', 'Grade 11', 'Grade 12']
+
+TABLE_COLUMNS = {
+    "admins": ("full_name", "id_number", "password"),
+    "instructors": ("full_name", "id_number", "password"),
+    "students": ("full_name", "strand", "grade_level", "id_number", "password"),
+    "books": ("category", "title", "edition", "publication", "author", "isbn", "status"),
+    "borrowing_history": ("user_id", "user_type", "book_id", "date_borrowed", "due_date", "date_returned",
+                          "return_status", "`condition`", "fine"),
+}
+
+
+class BulkSeeder:
+    """Generates and inserts a benchmark dataset of a given scale factor."""
+
+    def __init__(self, conn, scale, seed=42, batch_size=SEED_BATCH, load_data=False, now=None,
+                 book_skew=BOOK_SKEW, user_skew=USER_SKEW, seasonal=True):
+        self.conn = conn
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.history_rng = np.random.default_rng(seed)
+        self.book_skew = book_skew
+        self.user_skew = user_skew
+        self.seasonal = seasonal
+        self.batch_size = batch_size
+        self.load_data = load_data
+        self.now = now or datetime.now().replace(microsecond=0)
+        self.counts = {table: int(rows * scale) for table, rows in SCALE_ROWS.items()}
+        if max(self.counts["admins"], self.counts["instructors"], self.counts["students"]) > 10 ** 6:
+            raise ValueError("id_number holds 6 digits, so a role cannot have more than 1,000,000 users")
+        faker = Faker()
+        faker.seed_instance(seed)
+        self.names = [faker.name() for _ in range(NAME_POOL)]
+        self.titles = [faker.catch_phrase() for _ in range(NAME_POOL)]
+        self.publishers = [faker.company() for _ in range(NAME_POOL // 10)]
+
+    def run(self):
+        """Seed every table. Returns [(table, rows, seconds)]."""
+        if not self._is_empty():
+            raise ValueError("Scale mode expects an empty database (run it against a fresh schema)")
+        password = hash_password(DEFAULT_PASSWORD)
+        report = [
+            self._timed("admins", self._users(self.counts["admins"], password)),
+            self._timed("instructors", self._users(self.counts["instructors"], password)),
+            self._timed("students", self._students(self.counts["students"], password)),
+            self._timed("books", self._books(self.counts["books"])),
+        ]
+        users = self._ids("SELECT id, 'Student' FROM students UNION ALL SELECT id, 'Instructor' FROM instructors")
+        books = self._ids("SELECT id, category FROM books")
+        history = generate_history(self.counts["borrowing_history"], users, books, self.now, self.history_rng,
+                                   self.book_skew, self.user_skew, self.seasonal)
+        report.append(self._timed("borrowing_history", history))
+        self._mark_borrowed_books()
+        return report
+
+    # --- Row generators ---
+    def _users(self, count, password):
+        for n in range(count):
+            yield (self.rng.choice(self.names), f"{n:06d}", password)
+
+    def _students(self, count, password):
+        for n in range(count):
+            yield (self.rng.choice(self.names), self.rng.choice(STRANDS), self.rng.choice(GRADE_LEVELS),
+                   f"{n:06d}", password)
+
+    def _books(self, count):
+        for n in range(count):
+            yield (self.rng.choice(CATEGORIES), self.rng.choice(self.titles), f"{self.rng.randint(1, 10)}th Edition",
+                   self.rng.choice(self.publishers), self.rng.choice(self.names), _isbn13(n), "Available")
+
+    # --- Loading ---
+    def _timed(self, table, rows):
+        start = time.perf_counter()
+        if self.load_data:
+            count = self._load_data(table, rows)
+        else:
+            count = self._insert_batches(table, rows)
+        return table, count, time.perf_counter() - start
+
+    def _insert_batches(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        count, batch = 0, []
+        cursor = self.conn.cursor()
+        try:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    cursor.executemany(query, batch)
+                    self.conn.commit()
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(query, batch)
+                self.conn.commit()
+                count += len(batch)
+            return count
+        finally:
+            cursor.close()
+
+    def _load_data(self, table, rows):
+        """Stream the rows to a temp file and bulk load it (MySQL, needs local_infile on the server)."""
+        count = 0
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", newline="", delete=False, encoding="utf-8") as f:
+            path = f.name
+            for row in rows:
+                f.write("\t".join(_tsv_field(value) for value in row) + "\n")
+                count += 1
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(TABLE_COLUMNS[table])})",
+                (path,)
+            )
+            self.conn.commit()
+            return count
+        finally:
+            cursor.close()
+            os.remove(path)
+
+    # --- Helpers ---
+    def _is_empty(self):
+        cursor = self.conn.cursor()
+        try:
+            for table in TABLE_COLUMNS:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                if cursor.fetchone()[0]:
+                    return False
+            return True
+        finally:
+            cursor.close()
+
+    def _ids(self, query):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query)
+            return [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def _mark_borrowed_books(self):
+        cursor = self.conn.cursor()
+        try:
+            for status in ("Borrowed", "Overdue"):
+                loan_status = "Active" if status == "Borrowed" else "Overdue"
+                cursor.execute(
+                    "UPDATE books SET status = %s WHERE id IN "
+                    "(SELECT book_id FROM borrowing_history WHERE return_status = %s)",
+                    (status, loan_status)
+                )
+            self.conn.commit()
+        finally:
+            cursor.close()
+
+
+def _tsv_field(value):
+    """One LOAD DATA field: NULL as \\N, backslash, tab and newline escaped."""
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _isbn13(n):
+    """A valid, unique ISBN-13 for the n-th generated book."""
+    digits = f"979{n:09d}"
+    check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    return f"{digits}{check}"
+
+
+def seed_scale(scale, seed=42, batch_size=SEED_BATCH, load_data=False, now=None, **shape):
+    previous = get_engine()
+    if load_data:
+        if previous.name != "mysql":
+            print("--load-data needs the MySQL engine.")
+            return False
+        # Same server and database as the current engine, only with LOCAL INFILE allowed
+        configure_engine("mysql", **{**previous.config, "local_infile": True})
+    try:
+        conn = create_connection()
+        if not conn:
+            print("Failed to connect to the database.")
+            return False
+        try:
+            print(f"Seeding scale factor {scale} (seed {seed})...")
+            report = BulkSeeder(conn, scale, seed, batch_size, load_data, now, **shape).run()
+        except (ValueError, *DB_ERRORS) as e:
+            print(f"Seeding failed: {e}")
+            return False
+        finally:
+            conn.close()
+    finally:
+        if load_data:
+            configure_engine("mysql", **previous.config)
+    for table, rows, seconds in report:
+        rate = rows / seconds if seconds else 0
+        print(f"  {table}: {rows:,} rows in {seconds:.2f}s ({rate:,.0f} rows/s)")
+    total_rows = sum(rows for _, rows, _ in report)
+    total_seconds = sum(seconds for _, _, seconds in report)
+    print(f"Seeded {total_rows:,} rows in {total_seconds:.2f}s.")
+    reconcile_counters()
+    return True
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Fill the database with dummy data.")
+    parser.add_argument("--scale", type=float, default=None,
+                        help="benchmark mode: seed an empty database with SCALE x "
+                             f"{SCALE_ROWS['books']:,} books and {SCALE_ROWS['borrowing_history']:,} loans")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (scale mode)")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH, help="rows per executemany (scale mode)")
+    parser.add_argument("--load-data", action="store_true", help="use LOAD DATA LOCAL INFILE (scale mode, MySQL)")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, default=None,
+                        help="date the history ends at (scale mode; default now). Fix it to reproduce a dataset exactly")
+    parser.add_argument("--book-skew", type=float, default=BOOK_SKEW,
+                        help="Zipf exponent of book popularity (0 for uniform)")
+    parser.add_argument("--user-skew", type=float, default=USER_SKEW,
+                        help="spread of per-user activity, lognormal sigma (0 for uniform)")
+    parser.add_argument("--no-seasonal", dest="seasonal", action="store_false",
+                        help="spread loans evenly over the days instead of following the school calendar")
+    args = parser.parse_args()
+    shape = {"book_skew": args.book_skew, "user_skew": args.user_skew, "seasonal": args.seasonal}
+    if args.scale is not None:
+        if not seed_scale(args.scale, args.seed, args.batch_size, args.load_data, args.as_of, **shape):
+            raise SystemExit(1)
+        return
+
     conn = create_connection()
     if conn:
         print("Seeding database...")
@@ -146,9 +561,10 @@ def main():
         seed_instructors(conn, count=10)
         seed_students(conn, count=30)
         seed_books(conn, count=40)
-        seed_borrowing_history(conn, count=15)
+        seed_borrowing_history(conn, count=15, **shape)
         print("Seeding completed.")
         conn.close()
+        reconcile_counters()
     else:
         print("Failed to connect to the database.")
 